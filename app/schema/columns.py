@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module handles a selection of records stored by column.
+"""
+
+import numpy
+
+from logger.loggerobject import DSLoggerObject
+
+class DSColumns(DSLoggerObject):
+    """
+    This class converts batches of rows into one NumPy array by field.
+    The type of each array is given by the field (see DSField.dtype),
+    a masked array is retrieved if the field contains null values.
+    A string column is widened if a value is longer than the length of the field (values are never truncated).
+    """
+
+    @staticmethod
+    def item(array, index):
+        """Retrieve a value of an array as a Python value (None if the value is null)"""
+        value = array[index]
+        if value is numpy.ma.masked:
+            return None
+        return value.item() if isinstance(value, numpy.generic) else value
+
+    @property
+    def fields(self):
+        """List of field names"""
+        return self.__fields
+
+    @property
+    def size(self):
+        """Number of rows"""
+        return self.__size
+
+    def append(self, rows):
+        """Convert a batch of rows and add it at the end of the columns"""
+        if len(rows) == 0:
+            return self
+        for index, values in enumerate(zip(*rows)):
+            dtype = self.__dtypes[index]
+            mask = [value is None for value in values]
+            if any(mask):
+                nullvalue = dtype.type()
+                values = [nullvalue if value is None else value for value in values]
+                self.__masked[index] = True
+            if dtype.kind == 'U':
+                length = max((len(value) for value in values if isinstance(value, str)), default=0)
+                if length > dtype.itemsize // 4:
+                    dtype = numpy.dtype(f"U{length}")
+            self.__chunks[index].append(numpy.array(values, dtype=dtype))
+            self.__masks[index].append(numpy.array(mask, dtype=bool))
+        self.__size += len(rows)
+        return self
+
+    @property
+    def arrays(self):
+        """Retrieve the dictionary of NumPy arrays (one by field)"""
+        arrays = {}
+        for index, fieldname in enumerate(self.__fields):
+            if len(self.__chunks[index]) == 0:
+                array = numpy.empty(0, dtype=self.__dtypes[index])
+            else:
+                array = numpy.concatenate(self.__chunks[index])
+            if self.__masked[index]:
+                array = numpy.ma.MaskedArray(array, mask=numpy.concatenate(self.__masks[index]))
+            arrays[fieldname] = array
+        self.info(f"{self.__size} rows converted into {len(self.__fields)} columns")
+        return arrays
+
+    def __init__(self, table, fields):
+        super().__init__()
+        self.__fields = tuple(fields)
+        self.__dtypes = [numpy.dtype(table[fieldname].dtype) for fieldname in self.__fields]
+        self.__chunks = [[] for _ in self.__fields]
+        self.__masks = [[] for _ in self.__fields]
+        self.__masked = [False for _ in self.__fields]
+        self.__size = 0
@@ -52,3 +52,7 @@ class DSCriteria:
     def tomysql(self):
         """Convert the criteria to a SQL String compatible to MySQL Database"""
         return str(self)
+
+    def tomysqlquery(self):
+        """Convert the criteria to a SQL template (values replaced by '%s') and its list of parameters"""
+        return self.tomysql(), []
@@ -18,12 +18,18 @@ class DSCriteriaComparable(DSCriteria):
         """field to compare"""
         return self._field.name
 
+    @staticmethod
+    def literal(value):
+        """Convert a value to a SQL literal (a string is quoted and its backslashes and quotes are escaped)"""
+        if isinstance(value, str):
+            value = value.replace("\\", "\\\\").replace("'", "\\'")
+            return f"'{value}'"
+        return value
+
     @property
     def fieldvalue(self):
         """Value to compare"""
-        if isinstance(self._value, str):
-            return f"'{self._value}'"
-        return self._value
+        return self.literal(self._value)
 
     def __init__(self, field, value):
         self._field = field
@@ -27,3 +27,9 @@ class DSCriteriaComparableEqual(DSCriteriaComparable):
         if self.fieldvalue is None:
             return f"`{self.fieldname}` is null"
         return f"`{self.fieldname}` = {self.fieldvalue}"
+
+    def tomysqlquery(self):
+        """Convert the criteria to a SQL template (values replaced by '%s') and its list of parameters"""
+        if self._value is None:
+            return f"`{self.fieldname}` is null", []
+        return f"`{self.fieldname}` = %s", [self._value]
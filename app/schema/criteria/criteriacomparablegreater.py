@@ -25,3 +25,7 @@ class DSCriteriaComparableGreater(DSCriteriaComparable):
     def tomysql(self):
         """Convert the criteria to a SQL String compatible to MySQL Database"""
         return f"`{self.fieldname}` > {self.fieldvalue}"
+
+    def tomysqlquery(self):
+        """Convert the criteria to a SQL template (values replaced by '%s') and its list of parameters"""
+        return f"`{self.fieldname}` > %s", [self._value]
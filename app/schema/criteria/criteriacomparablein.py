@@ -22,18 +22,7 @@ class DSCriteriaComparableIn(DSCriteriaComparable):
     @property
     def fieldvalue(self):
         """one of the list of values to compare"""
-        values = ""
-        first = True
-        for value in self._value:
-            if not first:
-                values += ", "
-            else:
-                first = False
-            if isinstance(value, str):
-                values += "'" + value + "'"
-            else:
-                values += str(value)
-        return "(" + values + ")"
+        return "(" + ", ".join([str(self.literal(value)) for value in self._value]) + ")"
 
     def __str__(self):
         return f"{self.fieldname} in {self.fieldvalue}"
@@ -41,3 +30,9 @@ class DSCriteriaComparableIn(DSCriteriaComparable):
     def tomysql(self):
         """Convert the criteria to a SQL String compatible to MySQL Database"""
         return f"`{self.fieldname}` in {self.fieldvalue}"
+
+    def tomysqlquery(self):
+        """Convert the criteria to a SQL template (values replaced by '%s') and its list of parameters"""
+        if len(self._value) == 0:
+            return "false", []
+        return f"`{self.fieldname}` in (" + ", ".join(["%s" for _ in self._value]) + ")", list(self._value)
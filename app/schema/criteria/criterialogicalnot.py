@@ -19,3 +19,12 @@ class DSCriteriaLogicalNot(DSCriteriaLogical):
 
     def __str__(self):
         return "Not (" + str(self._criterias[0]) + ")"
+
+    def tomysql(self):
+        """Convert the criteria to a SQL String compatible to MySQL Database"""
+        return "not (" + self._criterias[0].tomysql() + ")"
+
+    def tomysqlquery(self):
+        """Convert the criteria to a SQL template (values replaced by '%s') and its list of parameters"""
+        template, parameters = self._criterias[0].tomysqlquery()
+        return "not (" + template + ")", parameters
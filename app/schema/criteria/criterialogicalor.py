@@ -26,3 +26,17 @@ class DSCriteriaLogicalOr(DSCriteriaLogical):
             first = False
             values += "(" + str(criteria) + ")"
         return values
+
+    def tomysql(self):
+        """Convert the criteria to a SQL String compatible to MySQL Database"""
+        return " or ".join(["(" + criteria.tomysql() + ")" for criteria in self._criterias])
+
+    def tomysqlquery(self):
+        """Convert the criteria to a SQL template (values replaced by '%s') and its list of parameters"""
+        templates = []
+        parameters = []
+        for criteria in self._criterias:
+            template, values = criteria.tomysqlquery()
+            templates.append("(" + template + ")")
+            parameters.extend(values)
+        return " or ".join(templates), parameters
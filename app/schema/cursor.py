@@ -7,17 +7,37 @@ This module handles a cursor on the table.
 from logger.loggerobject import DSLoggerObject
 
 class DSCursor(DSLoggerObject):
-    """This class handles a cursor on selection from the database"""
+    """This class handles a cursor on selection from the database (only the given fields are read if defined)"""
+
+    def close(self):
+        """Close the cursor before reading all records (awaitable if the database is asynchronous)"""
+        return self.__cursor.close()
 
     def __iter__(self):
         self.__iterator = iter(self.__cursor)
         return self
 
     def __next__(self):
-        return self.__table.new(next(self.__iterator))
+        return self.__recordclass.decode(next(self.__iterator))
+
+    def __aiter__(self):
+        if hasattr(self.__cursor, '__aiter__'):
+            self.__asynciterator = self.__cursor.__aiter__()
+        else:
+            self.__iterator = iter(self.__cursor)
+        return self
+
+    async def __anext__(self):
+        if self.__asynciterator is not None:
+            return self.__recordclass.decode(await self.__asynciterator.__anext__())
+        try:
+            return self.__recordclass.decode(next(self.__iterator))
+        except StopIteration as exc:
+            raise StopAsyncIteration from exc
 
-    def __init__(self, table, cursor):
+    def __init__(self, table, cursor, fields = None):
         super().__init__()
         self.__cursor = cursor
         self.__iterator = None
-        self.__table = table
+        self.__asynciterator = None
+        self.__recordclass = table.recordclass(fields)
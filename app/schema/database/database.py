@@ -23,12 +23,17 @@ class DSDatabase(DSLoggerObject):
         """Return if the connection is done"""
         return False
 
+    @property
+    def isasync(self):
+        """Return if the requests have to be awaited (asyncio)"""
+        return False
+
     @property
     def schema(self):
         """Retrieve a JSON description of the tables from a given schema"""
         return {}
 
-    def migrate(self, schema, database, allprivileges):
+    def migrate(self, schema, database, allprivileges, allowcopy = False):
         """Create or upgrade a schema from the json description"""
         return False
 
@@ -36,11 +41,23 @@ class DSDatabase(DSLoggerObject):
         """Return the list of values inserted into a table"""
         return None
 
-    def select(self, tablename, fields, clause = None):
+    def bulk_insert(self, tablename, fields, values, infile = None):
+        """Return the number of records inserted into a table"""
+        return 0
+
+    def select(self, tablename, fields, clause = None, stream = False, orderby = None, limit = None):
         """Return a cursor to the selection of the dstable"""
         return None
 
-    def update(self, tablename, fields, oldvalues, newvalues):
+    def aggregate(self, tablename, groupby, metrics, clause = None):
+        """Return the list of rows of an aggregation"""
+        return []
+
+    def upsert(self, tablename, fields, values, key, rowversion = None):
+        """Return the list of values inserted or updated into a table"""
+        return None
+
+    def update(self, tablename, fields, oldvalues, newvalues, key = None, rowversion = None):
         """Return the new value"""
         return None
 
@@ -48,6 +65,14 @@ class DSDatabase(DSLoggerObject):
         """Return the list of values removed"""
         return None
 
+    def update_where(self, tablename, assignments, clause = None, rowversion = None):
+        """Return the number of records updated"""
+        return 0
+
+    def delete_where(self, tablename, clause = None, chunk = None):
+        """Return the number of records deleted"""
+        return 0
+
     def commit(self):
         """Commit the current transaction"""
         return self
@@ -65,3 +90,9 @@ class DSDatabase(DSLoggerObject):
 
     def __exit__(self, *args):
         self.disconnect()
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, *args):
+        self.__exit__(*args)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module handles an asynchronous cursor on the database.
+"""
+
+from logger.loggerobject import DSLoggerObject
+
+from .databasecursor import DSDatabaseCursor
+
+class DSDatabaseAsyncCursor(DSLoggerObject):
+    """
+    This class handles an asynchronous cursor on selection from the database.
+    The request is executed on the first iteration and the records are fetched by batch of 'batchsize' rows.
+    Each record is a tuple of values in the order of 'fields'.
+    """
+
+    @property
+    def fields(self):
+        """List of field names of the records"""
+        return self.__fields
+
+    async def close(self):
+        """Close and release the cursor"""
+        if self.__closed:
+            return
+        self.info(f"{self._nbrecords} records selected from {self.__tablename}")
+        self.__closed = True
+        self.__rows = []
+        if self.__cursor is not None:
+            cursor = self.__cursor
+            self.__cursor = None
+            await cursor.close()
+
+    async def fetch(self):
+        """Retrieve the next batch of rows not read yet (an empty list at the end of the selection)"""
+        if self.__index < len(self.__rows):
+            rows = self.__rows[self.__index:]
+        elif not self.__closed:
+            if self.__cursor is None:
+                self.__cursor = await self.__execute()
+            rows = await self.__cursor.fetchmany(self.__batchsize)
+        else:
+            return []
+        self.__rows = []
+        self.__index = 0
+        if len(rows) == 0:
+            await self.close()
+        self._nbrecords += len(rows)
+        return rows
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.__index >= len(self.__rows):
+            if self.__closed:
+                raise StopAsyncIteration
+            if self.__cursor is None:
+                self.__cursor = await self.__execute()
+            self.__rows = await self.__cursor.fetchmany(self.__batchsize)
+            self.__index = 0
+            if len(self.__rows) == 0:
+                await self.close()
+                raise StopAsyncIteration
+        record = self.__rows[self.__index]
+        self.__index += 1
+        self._nbrecords += 1
+        return record
+
+    def __init__(self, execute, tablename, fields, batchsize = DSDatabaseCursor.BATCHSIZE):
+        super().__init__()
+        self.__execute = execute
+        self.__cursor = None
+        self.__closed = False
+        self.__rows = []
+        self.__index = 0
+        self.__batchsize = batchsize
+        self.__tablename = tablename
+        self.__fields = fields
+        self._nbrecords = 0
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=bare-except
+# The calls to the connexion are overridden by coroutines (the callers await the requests if 'isasync' is set)
+# pylint: disable=invalid-overridden-method
+
+"""
+This module handles the asynchronous database connexion (asyncio) for MySQL instance.
+"""
+
+import os
+import re
+import asyncio
+import inspect
+from cryptography.fernet import Fernet
+
+import aiomysql
+
+from exception.exceptiondatabase import DSExceptionDatabase
+from exception.exceptiondatabaserequest import DSExceptionDatabaseRequest
+
+from .databaseasynccursor import DSDatabaseAsyncCursor
+from .databasemysqlbase import DSDatabaseMySQLBase
+from .databasemysqlpool import DSDatabaseMySQLPool
+
+class DSDatabaseAsyncMySQL(DSDatabaseMySQLBase):
+    """
+    This class implements an asynchronous connexion to a MySQL Database (the requests are described by
+    DSDatabaseMySQLBase and executed by awaiting the calls to the connexion).
+    All requests are coroutines and have to be awaited, the cursor has to be read within 'async for'.
+    The connexions are shared by a pool (aiomysql) for each database target and each event loop,
+    see DSDatabaseMySQLPool for the settings of the pool, except :
+      * recycle : number of seconds of inactivity after which a free connexion is replaced on check out
+        (-1 to keep them), 'idle' and 'ping' aren't used
+    """
+
+    RECYCLE = 3600
+
+    __pools = {}
+    __locks = {}
+
+    async def __get_pool(self):
+        """
+        Retrieve the pool of connexions attached to the database target, its settings and the current event loop
+        (created once by the first call)
+        """
+        localinfile = self.bulk.get('infile', None) is not None
+        key = (asyncio.get_running_loop(), self.hostname, self.username, self.password, localinfile,
+               tuple(sorted(self.parameters.items())))
+        pool = DSDatabaseAsyncMySQL.__pools.get(key, None)
+        if pool is not None:
+            return pool
+        async with DSDatabaseAsyncMySQL.__locks.setdefault(key, asyncio.Lock()):
+            pool = DSDatabaseAsyncMySQL.__pools.get(key, None)
+            if pool is None:
+                cipher_suite = Fernet(bytes(os.getenv("PSPASSWORD_KEY"), 'utf-8'))
+                password = cipher_suite.decrypt(bytes(self.password, 'utf-8')).decode('utf-8')
+                pool = await aiomysql.create_pool(host=self.hostname,
+                                                  user=self.username,
+                                                  password=password,
+                                                  autocommit=False,
+                                                  local_infile=localinfile,
+                                                  minsize=self.parameters.get('minsize', DSDatabaseMySQLPool.MINSIZE),
+                                                  maxsize=max(1, self.parameters.get('maxsize', DSDatabaseMySQLPool.MAXSIZE)),
+                                                  pool_recycle=self.parameters.get('recycle', self.RECYCLE))
+                DSDatabaseAsyncMySQL.__pools[key] = pool
+        return pool
+
+    @classmethod
+    async def close_all(cls):
+        """Close the pools of connexions created into the current event loop (waiting for the connexions in use)"""
+        loop = asyncio.get_running_loop()
+        keys = [key for key in cls.__pools if key[0] is loop]
+        for key in keys:
+            pool = cls.__pools.pop(key)
+            cls.__locks.pop(key, None)
+            pool.close()
+            await pool.wait_closed()
+
+    @staticmethod
+    def __pyformat(query, parameters):
+        """
+        Adapt a request built with a SQL clause (e.g. "`Name` like 'A%'") to PyMySQL, which formats the request by '%' :
+        no parameters are given if the list is empty, else the '%' out of the placeholders are escaped
+        """
+        if not parameters:
+            return query, None
+        return re.sub(r"%(?!s)", "%%", query), parameters
+
+    async def _run(self, generator):
+        """Execute a request by awaiting the calls to the connexion (see DSDatabaseMySQLBase)"""
+        done, value = self._resume(generator)
+        while not done:
+            done, value = self._resume(generator, *(await self.__call(value)))
+        return value
+
+    @staticmethod
+    async def __call(call):
+        """Call the connexion (function, arguments...), await the result if needed and retrieve (result, exception)"""
+        try:
+            result = call[0](*call[1:])
+            if inspect.isawaitable(result):
+                result = await result
+            return result, None
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            return None, exc
+
+    async def _execute(self, query, parameters):
+        """Execute a request and retrieve the number of rows"""
+        await self.__transaction.execute(*self.__pyformat(query, parameters))
+        return self.__transaction.rowcount
+
+    async def _executemany(self, query, items):
+        """Execute a request for each item and retrieve the number of rows"""
+        await self.__transaction.executemany(query, items)
+        return self.__transaction.rowcount
+
+    async def _fetchall(self):
+        """Retrieve the rows of the last request"""
+        return await self.__transaction.fetchall()
+
+    async def _tsv(self, query, fields, values):
+        """Write the records into a temporary file (by a thread, see DSDatabaseMySQLBase._tsv)"""
+        return await asyncio.get_running_loop().run_in_executor(None, super()._tsv, query, fields, values)
+
+    async def connect(self):
+        """This method describes the connection to MySQL (a connexion is checked out from the pool)"""
+        self.debug(f"Connecting to the database '{self.hostname}' with user '{self.username}' ...")
+        try:
+            pool = await self.__get_pool()
+            self.__database = await asyncio.wait_for(pool.acquire(),
+                                                     self.parameters.get('timeout', DSDatabaseMySQLPool.TIMEOUT))
+            await self.__database.begin()
+            self.__transaction = await self.__database.cursor()
+            self.info(f"Database '{self.hostname}' with user '{self.username}' connected")
+        except:
+            self.exception(f"Error on connection to the database '{self.hostname}' with user '{self.username}'")
+            await self.disconnect()
+        return self
+
+    @property
+    def isconnected(self):
+        """Return if the connection is done"""
+        try:
+            return self.__database is not None and not self.__database.closed
+        except:
+            return False
+
+    @property
+    def isasync(self):
+        """Return if the requests have to be awaited"""
+        return True
+
+    def select(self, tablename, fields, clause = None, stream = False, orderby = None, limit = None):
+        """
+        Return an asynchronous cursor to the selection of the dstable :
+        * stream = False : the records are buffered on the client side on executing the request
+        * stream = True : the records are read from the server while the cursor is read
+          (the connexion can't execute another request until the cursor is closed)
+        * orderby : list of (fieldname, descending) sorting the records
+        * limit : maximum number of records returned
+        """
+
+        async def execute():
+            query, parameters = self._select(tablename, fields, clause, orderby, limit)
+            try:
+                if stream:
+                    cursor = await self.__database.cursor(aiomysql.SSCursor)
+                else:
+                    cursor = await self.__database.cursor()
+                await cursor.execute(*self.__pyformat(query, parameters))
+
+                self.info(f"Selecting data from '{tablename}' where '{query}') ...")
+                return cursor
+            except Exception as exc:
+                self.exception(f"Error on executing the request '{query}'")
+                raise DSExceptionDatabaseRequest(f"Error on executing the request '{query}'") from exc
+
+        return DSDatabaseAsyncCursor(execute, tablename, fields).set_user(self.user)
+
+    async def _commit(self):
+        """Commit the current transaction and start a new one"""
+        await self.__database.commit()
+        await self.__database.begin()
+
+    async def _rollback(self):
+        """Rollback the current transaction and start a new one"""
+        await self.__database.rollback()
+        await self.__database.begin()
+
+    async def disconnect(self):
+        """This method describes the disconnection to MySQL (the connexion is checked in the pool)"""
+        self.debug(f"Disconnecting to the database '{self.hostname}' with user '{self.username}' ...")
+
+        if self.__transaction is not None:
+            try:
+                await self.__transaction.close()
+            except:
+                self.exception("Error on closing the transaction")
+            self.__transaction = None
+
+        if self.__database is not None:
+            try:
+                await self.__database.rollback()
+            except:
+                self.exception("Error on disconnecting the database")
+                self.__database.close()
+            (await self.__get_pool()).release(self.__database)
+            self.__database = None
+
+        self.info(f"Database '{self.hostname}' with user '{self.username}' disconnected")
+        return self
+
+    def __enter__(self):
+        raise DSExceptionDatabase("An asynchronous database has to be opened within 'async with'")
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, *args):
+        await self.disconnect()
+
+    def __init__(self, hostname, username, password, schema, pool = None, bulk = None):
+        super().__init__(hostname, username, password, schema, pool, bulk)
+        self.__database = None
+        self.__transaction = None
@@ -7,36 +7,94 @@ This module handles a cursor on the database.
 from logger.loggerobject import DSLoggerObject
 
 class DSDatabaseCursor(DSLoggerObject):
-    """This class handles a cursor on selection from the database"""
+    """
+    This class handles a cursor on selection from the database.
+    The records are fetched by batch of 'batchsize' rows.
+    Each record is a tuple of values in the order of 'fields'.
+    """
+
+    BATCHSIZE = 1000
+
+    class Rows:
+        """This class handles a list of rows already fetched as a cursor"""
+
+        def fetchmany(self, size):
+            """Retrieve the next rows"""
+            rows = self.__rows[self.__index:self.__index + size]
+            self.__index += len(rows)
+            return rows
+
+        def close(self):
+            """Release the rows"""
+            self.__rows = []
+
+        def __init__(self, rows):
+            self.__rows = rows
+            self.__index = 0
+
+    @property
+    def fields(self):
+        """List of field names of the records"""
+        return self.__fields
 
     def close(self):
-        """Close and release the cursor"""
+        """
+        Close and release the cursor, the rows not read yet are consumed
+        (a connexion streaming a selection can't execute another request until all rows are read)
+        """
+        if self.__cursor is None:
+            return
         self.info(f"{self._nbrecords} records selected from {self.__tablename}")
-        self.__cursor.close()
+        cursor = self.__cursor
         self.__cursor = None
+        self.__rows = []
+        try:
+            while not self.__eof and len(cursor.fetchmany(self.__batchsize)) > 0:
+                pass
+        finally:
+            cursor.close()
+
+    def fetch(self):
+        """Retrieve the next batch of rows not read yet (an empty list at the end of the selection)"""
+        if self.__index < len(self.__rows):
+            rows = self.__rows[self.__index:]
+        elif self.__cursor is not None:
+            rows = self.__cursor.fetchmany(self.__batchsize)
+        else:
+            return []
+        self.__rows = []
+        self.__index = 0
+        if len(rows) == 0:
+            self.__eof = True
+            self.close()
+        self._nbrecords += len(rows)
+        return rows
 
     def __iter__(self):
-        self.__iterator = iter(self.__cursor)
         return self
 
     def __next__(self):
-        try:
-            record = next(self.__iterator)
-        except StopIteration:
-            self.close()
-            raise
-        for i, name in enumerate(self.__fields):
-            self.__record[name] = record[i]
+        if self.__index >= len(self.__rows):
+            if self.__cursor is None:
+                raise StopIteration
+            self.__rows = self.__cursor.fetchmany(self.__batchsize)
+            self.__index = 0
+            if len(self.__rows) == 0:
+                self.__eof = True
+                self.close()
+                raise StopIteration
+        record = self.__rows[self.__index]
+        self.__index += 1
         self._nbrecords += 1
-        return self.__record
+        return record
 
-    def __init__(self, cursor, tablename, fields):
+    def __init__(self, cursor, tablename, fields, batchsize = BATCHSIZE):
         super().__init__()
         self.__cursor = cursor
-        self.__iterator = None
+        self.__rows = []
+        self.__index = 0
+        self.__eof = False
+        self.__batchsize = batchsize
         self.__tablename = tablename
         self.__fields = fields
-        self.__record = {}
-        for name in fields:
-            self.__record[name] = None
         self._nbrecords = 0
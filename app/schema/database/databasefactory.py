@@ -4,10 +4,11 @@
 
 from exception.exceptiondatabaseunknown import DSExceptionDatabaseUnknown
 from .databasemysql import DSDatabaseMySQL
+from .databaseasyncmysql import DSDatabaseAsyncMySQL
 
 def factory(configuration):
     """Create a database instance"""
-    databases = { "MySQL" : DSDatabaseMySQL }
+    databases = { "MySQL" : DSDatabaseMySQL, "AsyncMySQL": DSDatabaseAsyncMySQL }
     klass = configuration.get('class', 'MySQL')
     if klass not in databases:
         raise DSExceptionDatabaseUnknown(f"Database '{klass}' not known")
@@ -0,0 +1,565 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=bare-except
+
+"""
+This module handles the requests shared by the synchronous and the asynchronous connexions to a MySQL instance.
+"""
+
+import os
+import json
+import time
+import tempfile
+
+from exception.exceptiondatabaseconflict import DSExceptionDatabaseConflict
+from exception.exceptiondatabasenotconnected import DSExceptionDatabaseNotConnected
+from exception.exceptiondatabaserequest import DSExceptionDatabaseRequest
+from exception.exceptiondatabaseunknown import DSExceptionDatabaseUnknown
+
+from .database import DSDatabase
+from .databasemysqlcatalog import DSDatabaseMySQLCatalog
+from .databasemysqlplanner import DSDatabaseMySQLPlanner
+from .databasemysqlquery import DSDatabaseMySQLQuery
+
+class DSDatabaseMySQLBase(DSDatabase):
+    """
+    This class implements the requests to a MySQL Database, whatever the connexion (see DSDatabaseMySQL and
+    DSDatabaseAsyncMySQL) :
+    each request is a generator building the SQL requests and handling their results, it yields the calls to the
+    connexion (function, arguments...) and receives their results (see '_run', implemented by the connexion) :
+      * _execute(query, parameters) : execute a request and retrieve the number of rows
+      * _executemany(query, items) : execute a request for each item and retrieve the number of rows
+      * _fetchall() : retrieve the rows of the last request
+      * _tsv(query, fields, values) : write the records into a temporary file, retrieve (filename, count)
+      * _commit(), _rollback() : end the current transaction and start a new one
+    """
+
+    SCRIPT_CREATE_USER = """
+        CREATE USER IF NOT EXISTS '{{username}}'@'{{hostname}}';
+        ALTER USER '{{username}}'@'{{hostname}}' IDENTIFIED WITH 'mysql_native_password' AS '{{password}}';
+        GRANT {{privileges}} ON `{{schema}}`.* TO '{{username}}'@'{{hostname}}' WITH GRANT OPTION;
+        FLUSH PRIVILEGES;
+    """
+
+    def to_dict(self):
+        """Retrieves the database instance into a dictionary"""
+        return {
+            'hostname': self.__hostname,
+            'username': self.__username,
+            'password': self.__password,
+            'schema': self.__schema
+            }
+
+    @property
+    def hostname(self):
+        """Name of the MySQL instance"""
+        return self.__hostname
+
+    @property
+    def username(self):
+        """Name of the user connected"""
+        return self.__username
+
+    @property
+    def password(self):
+        """Password of the user (encrypted by PSPASSWORD_KEY)"""
+        return self.__password
+
+    @property
+    def parameters(self):
+        """Parameters of the pool of connexions (see DSDatabaseMySQLPool)"""
+        return self.__parameters
+
+    @property
+    def bulk(self):
+        """Parameters of the bulk inserts"""
+        return self.__bulk
+
+    @property
+    def query(self):
+        """Builder of the SQL requests (see DSDatabaseMySQLQuery)"""
+        return self.__query
+
+    def set_user(self, user):
+        """Set the current user name (to trace information into the log file)"""
+        super().set_user(user)
+        self.__query.set_user(user)
+        self.__planner.set_user(user)
+        return self
+
+    @staticmethod
+    def _resume(generator, result = None, error = None):
+        """
+        Resume a request with the result (or the exception) of its last call :
+        retrieve (False, next call) or (True, value returned by the request)
+        """
+        try:
+            if error is not None:
+                return False, generator.throw(error)
+            return False, generator.send(result)
+        except StopIteration as stop:
+            return True, stop.value
+
+    def _run(self, generator):
+        """Execute a request by calling the connexion (see '_resume')"""
+        raise NotImplementedError()
+
+    def _execute(self, query, parameters):
+        """Execute a request and retrieve the number of rows"""
+        raise NotImplementedError()
+
+    def _executemany(self, query, items):
+        """Execute a request for each item and retrieve the number of rows"""
+        raise NotImplementedError()
+
+    def _fetchall(self):
+        """Retrieve the rows of the last request"""
+        raise NotImplementedError()
+
+    def _commit(self):
+        """Commit the current transaction and start a new one"""
+        raise NotImplementedError()
+
+    def _rollback(self):
+        """Rollback the current transaction and start a new one"""
+        raise NotImplementedError()
+
+    def _tsv(self, query, fields, values):
+        """Write the records into a temporary file loaded by 'LOAD DATA' and retrieve (filename, count)"""
+        with tempfile.NamedTemporaryFile(mode='wb', suffix='.tsv', delete=False) as file:
+            return file.name, self.__query.tsv(query, fields, values, file)
+
+    def _notconnected(self):
+        """Build the exception raised if a request is executed without connexion"""
+        return DSExceptionDatabaseNotConnected(f"No connection to the database '{self.__hostname}' with user '{self.__username}'")
+
+    def _select(self, tablename, fields, clause, orderby, limit):
+        """Build the request selecting the records of a table and retrieve (query, parameters), the connexion is checked"""
+        query, parameters = self.__query.select(tablename, fields, clause, orderby, limit)
+
+        self.debug(f"Executing '{query}' ...")
+        if self.isverbose:
+            self.verbose(str(parameters))
+
+        if not self.isconnected:
+            raise self._notconnected()
+        return query, parameters
+
+    @property
+    def schema(self):
+        """Retrieve a JSON description of the tables from a given schema (awaitable if the database is asynchronous)"""
+        return self._run(self.__describe(self.__schema))
+
+    def __describe(self, name):
+        """
+        Retrieve a JSON description of the tables from a given schema
+        (read by a single request and kept into the catalog until the schema is migrated)
+        """
+        structure = DSDatabaseMySQLCatalog.read(self.__hostname, name)
+        if structure is not None:
+            self.debug(f"The schema '{name}' is retrieved from the catalog")
+            return structure
+
+        self.debug(f"Retrieveing the schema '{name}' ...")
+
+        if not self.isconnected:
+            raise self._notconnected()
+
+        query, parameters = self.__query.catalog(name)
+        if self.isverbose:
+            self.verbose(query)
+        try:
+            yield self._execute, query, parameters
+            tables = self.__query.tables((yield (self._fetchall,)))
+        except Exception as exc:
+            self.exception(f"Error on executing the request '{query}'")
+            raise DSExceptionDatabaseRequest(f"Error on executing the request '{query}'") from exc
+        if tables is None:
+            raise DSExceptionDatabaseUnknown(f"Schema '{name}' unknown")
+
+        structure = { 'Name': name, 'Tables' : tables }
+        self.info(f"The schema '{name}' is retrieved")
+
+        if self.isverbose:
+            self.verbose(json.dumps(structure, sort_keys=True, indent=2))
+
+        DSDatabaseMySQLCatalog.write(self.__hostname, name, structure)
+        return structure
+
+    def __execute_script(self, template_sql, items):
+        """Execute a SQL Script"""
+        for request in self.__query.script(template_sql, items):
+            self.verbose(request)
+            yield self._execute, request, None
+
+    def __execute_plan(self, steps):
+        """
+        Execute the steps of a migration plan (see DSDatabaseMySQLPlanner),
+        the requests of a step are tried in order until one of them is supported
+        """
+        for requests in steps:
+            for index, request in enumerate(requests):
+                if self.__planner.copying(request):
+                    self.warning(f"The table may be copied and locked until the end of the request '{request}'")
+                self.info(f"Executing '{request}' ...")
+                try:
+                    yield self._execute, request, None
+                    break
+                except Exception as exc:
+                    if index + 1 < len(requests) and self.__planner.unsupported(exc):
+                        self.info("Request not supported, trying the next algorithm ...")
+                        continue
+                    if self.__planner.unsupported(exc):
+                        self.error(f"The request '{request}' can't be executed online")
+                        raise DSExceptionDatabaseRequest(f"The request '{request}' can't be executed online, " +
+                                                         "an offline migration is required (see --allow-copy)") from exc
+                    self.exception(f"Error on executing the request '{request}'")
+                    raise DSExceptionDatabaseRequest(f"Error on executing the request '{request}'") from exc
+
+    def __upgrade(self, schema, allowcopy):
+        """Upgrade an existing schema from its current description (True if the schema is modified)"""
+        current = yield from self.__describe(schema.get('Name'))
+        steps = self.__planner.upgrade(schema, current, allowcopy)
+        if len(steps) == 0:
+            return False
+        try:
+            yield from self.__execute_plan(steps)
+        finally:
+            DSDatabaseMySQLCatalog.clear(self.__hostname, schema.get('Name'))
+        return True
+
+    def migrate(self, schema, database, allprivileges, allowcopy = False):
+        """
+        Create or upgrade a schema from the json description
+        * allowcopy : a table which can't be altered online is altered by copying it (see DSDatabaseMySQLPlanner)
+        """
+        return self._run(self.__migrate(schema, database, allprivileges, allowcopy))
+
+    def __migrate(self, schema, database, allprivileges, allowcopy):
+        """Create or upgrade a schema from the json description (see 'migrate')"""
+        if self.isverbose:
+            self.verbose("Migrating the schema :")
+            self.verbose(json.dumps(schema, indent=2))
+
+        if schema is None or schema.get('Name', None) is None:
+            raise DSExceptionDatabaseUnknown("Schema non correctly defined")
+
+        if not allprivileges:
+            database['privileges'] = "DELETE, INSERT, UPDATE, SELECT"
+
+        if not self.isconnected:
+            raise self._notconnected()
+
+        try:
+            yield self._execute, f"USE `{schema.get('Name')}`", None
+            exists = True
+        except:
+            exists = False
+
+        if exists:
+            self.info(f"Schema to upgrade : {schema.get('Name')}")
+            return (yield from self.__upgrade(schema, allowcopy))
+
+        self.info(f"Creating the schema '{schema.get('Name')}' ...")
+        DSDatabaseMySQLCatalog.clear(self.__hostname, schema.get('Name'))
+
+        try:
+            yield from self.__execute_plan(self.__planner.create(schema))
+        except:
+            self.exception("Error on migrating the schema ...")
+            raise
+
+        if not allprivileges:
+            self.info(f"Granting the schema '{schema.get('Name')}' ...")
+
+            try:
+                yield from self.__execute_script(DSDatabaseMySQLBase.SCRIPT_CREATE_USER, database)
+            except:
+                self.exception("Error on granting the schema ...")
+                raise
+
+        DSDatabaseMySQLCatalog.clear(self.__hostname, schema.get('Name'))
+        return True
+
+    def __execute(self, query, items, action, tablename):
+        """Execute a request for each item and retrieve the number of rows"""
+        count = len(items)
+        self.verbose(f"Executing {count} lines ...")
+        if self.isverbose:
+            for item in items:
+                self.verbose(str(item))
+        try:
+            if count == 1:
+                rowcount = yield self._execute, query, items[0]
+                self.info(f"{rowcount} row {action} into '{tablename}'")
+            elif count > 1:
+                rowcount = yield self._executemany, query, items
+                self.info(f"{rowcount} rows {action} into '{tablename}'")
+            else:
+                rowcount = 0
+                self.info(f"No data {action} into '{tablename}'")
+        except Exception as exc:
+            self.exception(f"Error on executing the request '{query}'")
+            raise DSExceptionDatabaseRequest(f"Error on executing the request '{query}'") from exc
+        return rowcount
+
+    def insert(self, tablename, fields, values):
+        """Return the list of values inserted into a table"""
+        return self._run(self.__insert(tablename, fields, values))
+
+    def __insert(self, tablename, fields, values):
+        """Return the list of values inserted into a table (see 'insert')"""
+        query = self.__query.insert(tablename, fields)
+
+        self.debug(f"Executing '{query}' ...")
+
+        if not self.isconnected:
+            raise self._notconnected()
+
+        yield from self.__execute(query, self.__query.items(query, fields, values), "inserted", tablename)
+        return values
+
+    def bulk_insert(self, tablename, fields, values, infile = None):
+        """
+        Insert a large list of records into a table and return the number of records inserted :
+        * the records are sent by multi-row VALUES requests of at most 'maxbytes' bytes and 'maxrows' records
+        * if infile is True (or None and the number of records reaches the 'infile' threshold), the records are written
+          into a temporary file loaded by 'LOAD DATA LOCAL INFILE'
+        """
+        return self._run(self.__bulk_insert(tablename, fields, values, infile))
+
+    def __bulk_insert(self, tablename, fields, values, infile):
+        """Insert a large list of records into a table and return the number of records inserted (see 'bulk_insert')"""
+        if not self.isconnected:
+            raise self._notconnected()
+
+        threshold = self.__bulk.get('infile', None)
+        if infile is None:
+            infile = threshold is not None and hasattr(values, '__len__') and len(values) >= threshold
+        elif infile and threshold is None:
+            raise DSExceptionDatabaseRequest(f"'LOAD DATA LOCAL INFILE' isn't enabled on the database '{self.__hostname}'")
+
+        start = time.monotonic()
+        count = 0
+        if infile:
+            query = self.__query.loaddata(tablename, fields)
+            self.debug(f"Executing '{query}' ...")
+            filename, count = yield self._tsv, query, fields, values
+            try:
+                yield self._execute, query, (filename,)
+            except Exception as exc:
+                self.exception(f"Error on executing the request '{query}'")
+                raise DSExceptionDatabaseRequest(f"Error on executing the request '{query}'") from exc
+            finally:
+                os.remove(filename)
+        else:
+            for chunk in self.__query.chunks(f"INSERT INTO `{tablename}`", fields, values,
+                                             self.__bulk.get('maxbytes', DSDatabaseMySQLQuery.MAXBYTES),
+                                             self.__bulk.get('maxrows', DSDatabaseMySQLQuery.MAXROWS)):
+                query = self.__query.insertmany(tablename, fields, len(chunk))
+                try:
+                    yield self._execute, query, [data for item in chunk for data in item]
+                except Exception as exc:
+                    self.exception(f"Error on inserting {len(chunk)} rows into '{tablename}'")
+                    raise DSExceptionDatabaseRequest(f"Error on inserting {len(chunk)} rows into '{tablename}'") from exc
+                count += len(chunk)
+                self.debug(f"{count} rows inserted into '{tablename}' ...")
+
+        elapsed = time.monotonic() - start
+        self.info(f"{count} rows inserted into '{tablename}' in {elapsed:.3f}s " +
+                  f"({count / elapsed if elapsed > 0 else count:.0f} rows/s)")
+        return count
+
+    def upsert(self, tablename, fields, values, key, rowversion = None):
+        """
+        Return the list of values inserted or updated (if a record with the same key already exists) into a table
+        The records are sent by multi-row requests of at most 'maxbytes' bytes and 'maxrows' records
+        """
+        return self._run(self.__upsert(tablename, fields, values, key, rowversion))
+
+    def __upsert(self, tablename, fields, values, key, rowversion):
+        """Return the list of values inserted or updated into a table (see 'upsert')"""
+        if not self.isconnected:
+            raise self._notconnected()
+
+        count = 0
+        records = values if isinstance(values, (list, tuple)) else [values]
+        for chunk in self.__query.chunks(f"INSERT INTO `{tablename}`", fields, records,
+                                         self.__bulk.get('maxbytes', DSDatabaseMySQLQuery.MAXBYTES),
+                                         self.__bulk.get('maxrows', DSDatabaseMySQLQuery.MAXROWS)):
+            query = self.__query.upsertmany(tablename, fields, key, len(chunk), rowversion)
+            self.debug(f"Executing '{query}' ...")
+            if self.isverbose:
+                for item in chunk:
+                    self.verbose(str(item))
+            try:
+                yield self._execute, query, [data for item in chunk for data in item]
+                if rowversion is not None:
+                    # the versions of the records already existing have been incremented by the database
+                    query, parameters = self.__query.versions(tablename, fields, key, rowversion, chunk)
+                    yield self._execute, query, parameters
+                    self.__query.upsertversions(fields, records[count:count + len(chunk)], key, rowversion,
+                                                (yield (self._fetchall,)))
+            except Exception as exc:
+                self.exception(f"Error on upserting {len(chunk)} rows into '{tablename}'")
+                raise DSExceptionDatabaseRequest(f"Error on upserting {len(chunk)} rows into '{tablename}'") from exc
+            count += len(chunk)
+            self.debug(f"{count} rows upserted into '{tablename}' ...")
+
+        self.info(f"{count} rows upserted into '{tablename}'")
+        return values
+
+    def aggregate(self, tablename, groupby, metrics, clause = None):
+        """Return the list of rows (values of the fields grouping the records then the metrics) of an aggregation"""
+        return self._run(self.__aggregate(tablename, groupby, metrics, clause))
+
+    def __aggregate(self, tablename, groupby, metrics, clause):
+        """Return the list of rows of an aggregation (see 'aggregate')"""
+        if not self.isconnected:
+            raise self._notconnected()
+
+        query, parameters = self.__query.aggregate(tablename, groupby, metrics, clause)
+        self.debug(f"Executing '{query}' ...")
+        try:
+            yield self._execute, query, parameters
+            rows = yield (self._fetchall,)
+        except Exception as exc:
+            self.exception(f"Error on executing the request '{query}'")
+            raise DSExceptionDatabaseRequest(f"Error on executing the request '{query}'") from exc
+
+        self.info(f"{len(rows)} rows aggregated from '{tablename}'")
+        return rows
+
+    def update(self, tablename, fields, oldvalues, newvalues, key = None, rowversion = None):
+        """
+        Return the new value
+        Only the fields changed are updated, the records are found by their key (and their version if defined)
+        """
+        return self._run(self.__update(tablename, fields, oldvalues, newvalues, key, rowversion))
+
+    def __update(self, tablename, fields, oldvalues, newvalues, key, rowversion):
+        """Return the new value (see 'update')"""
+        if not self.isconnected:
+            raise self._notconnected()
+
+        requests = self.__query.updateitems(tablename, fields, oldvalues, newvalues, key, rowversion)
+        if len(requests) == 0:
+            self.info(f"No data updated into '{tablename}'")
+            return newvalues
+
+        for query, items in requests:
+            self.debug(f"Executing '{query}' ...")
+            rowcount = yield from self.__execute(query, items, "updated", tablename)
+            if rowversion is not None and rowcount != len(items):
+                raise DSExceptionDatabaseConflict(f"{len(items) - rowcount} record(s) of '{tablename}' modified by another session")
+
+        if rowversion is not None:
+            self.__query.updateversions(fields, oldvalues, newvalues, key, rowversion)
+        return newvalues
+
+    def delete(self, tablename, fields, values):
+        """Return the list of values removed"""
+        return self._run(self.__delete(tablename, fields, values))
+
+    def __delete(self, tablename, fields, values):
+        """Return the list of values removed (see 'delete')"""
+        query = self.__query.delete(tablename, fields)
+
+        self.debug(f"Executing '{query}' ...")
+
+        if not self.isconnected:
+            raise self._notconnected()
+
+        yield from self.__execute(query, self.__query.items(query, fields, values), "deleted", tablename)
+        return values
+
+    def update_where(self, tablename, assignments, clause = None, rowversion = None):
+        """
+        Return the number of records updated by a single request (all records matching the clause)
+        * assignments : dictionary of the new values by field
+        """
+        return self._run(self.__update_where(tablename, assignments, clause, rowversion))
+
+    def __update_where(self, tablename, assignments, clause, rowversion):
+        """Return the number of records updated by a single request (see 'update_where')"""
+        if not self.isconnected:
+            raise self._notconnected()
+
+        query, parameters = self.__query.updatewhere(tablename, assignments, clause, rowversion)
+        self.debug(f"Executing '{query}' ...")
+        try:
+            count = yield self._execute, query, parameters
+        except Exception as exc:
+            self.exception(f"Error on executing the request '{query}'")
+            raise DSExceptionDatabaseRequest(f"Error on executing the request '{query}'") from exc
+
+        self.info(f"{count} rows updated into '{tablename}'")
+        return count
+
+    def delete_where(self, tablename, clause = None, chunk = None):
+        """
+        Return the number of records deleted by a single request (all records matching the clause)
+        * chunk : if defined, the records are deleted by requests of at most 'chunk' records,
+          the transaction is committed after each request to release the locks
+        """
+        return self._run(self.__delete_where(tablename, clause, chunk))
+
+    def __delete_where(self, tablename, clause, chunk):
+        """Return the number of records deleted (see 'delete_where')"""
+        if not self.isconnected:
+            raise self._notconnected()
+
+        query, parameters = self.__query.deletewhere(tablename, clause, chunk)
+        self.debug(f"Executing '{query}' ...")
+        count = 0
+        while True:
+            try:
+                rowcount = yield self._execute, query, parameters
+            except Exception as exc:
+                self.exception(f"Error on executing the request '{query}'")
+                raise DSExceptionDatabaseRequest(f"Error on executing the request '{query}'") from exc
+            count += rowcount
+            if chunk is None:
+                break
+            yield from self.__commit()
+            self.debug(f"{count} rows deleted from '{tablename}' ...")
+            if rowcount < chunk:
+                break
+
+        self.info(f"{count} rows deleted from '{tablename}'")
+        return count
+
+    def __end(self, end, action, done, error):
+        """End the current transaction by a call to the connexion ('_commit' or '_rollback'), an error is logged"""
+        self.debug(f"{action} ...")
+
+        if not self.isconnected:
+            raise self._notconnected()
+
+        try:
+            yield (end,)
+            self.info(done)
+        except:
+            self.exception(error)
+
+    def commit(self):
+        """Commit the current transaction"""
+        return self._run(self.__commit())
+
+    def __commit(self):
+        """Commit the current transaction (see 'commit')"""
+        return self.__end(self._commit, "Committing", "Commit done", "Error on committing")
+
+    def rollback(self):
+        """Rollback the current transaction"""
+        return self._run(self.__end(self._rollback, "Rollbacking", "Rollback done", "Error on rollbacking"))
+
+    def __init__(self, hostname, username, password, schema, pool = None, bulk = None):
+        super().__init__()
+        self.__hostname = hostname
+        self.__username = username
+        self.__password = password
+        self.__schema = schema
+        self.__parameters = pool or {}
+        self.__bulk = bulk or {}
+        self.__query = DSDatabaseMySQLQuery(schema)
+        self.__planner = DSDatabaseMySQLPlanner()
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module handles the catalog of the schemas read from a MySQL instance.
+"""
+
+import copy
+import threading
+
+class DSDatabaseMySQLCatalog:
+    """
+    This class keeps the JSON description of the schemas (tables, fields, key and indexes) read from
+    'information_schema', shared by all sessions of the process.
+    A description is kept until the schema is migrated.
+    """
+
+    __catalogs = {}
+    __lock = threading.Lock()
+
+    @classmethod
+    def read(cls, hostname, schema):
+        """Retrieve a copy of the description of a schema (None if it isn't read yet)"""
+        with cls.__lock:
+            structure = cls.__catalogs.get((hostname, schema), None)
+        return None if structure is None else copy.deepcopy(structure)
+
+    @classmethod
+    def write(cls, hostname, schema, structure):
+        """Keep the description of a schema"""
+        with cls.__lock:
+            cls.__catalogs[(hostname, schema)] = copy.deepcopy(structure)
+
+    @classmethod
+    def clear(cls, hostname, schema):
+        """Forget the description of a schema (after its migration)"""
+        with cls.__lock:
+            cls.__catalogs.pop((hostname, schema), None)
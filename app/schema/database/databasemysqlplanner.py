@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module plans the requests creating or upgrading a MySQL schema.
+"""
+
+import re
+import decimal
+
+from logger.loggerobject import DSLoggerObject
+
+from ..field.fieldboolean import DSFieldBoolean
+
+class DSDatabaseMySQLPlanner(DSLoggerObject):
+    """
+    This class plans the requests migrating a schema from its current description (see DSDatabaseMySQLCatalog)
+    towards its JSON description :
+      * the missing tables are created
+      * the missing fields are added, the fields whose type or default value has changed are modified
+      * the missing indexes are created, the indexes whose definition has changed are rebuilt
+    The fields and the indexes no longer described are kept (no data is lost).
+    All changes of a table are done by a single 'ALTER TABLE' trying the algorithms from the lightest one
+    (INSTANT, then INPLACE without lock). The default algorithm, which may copy and lock the table, is only
+    planned if 'allowcopy' is set : else the table requires an offline migration.
+    A plan is a list of steps, each step is the list of equivalent requests tried in order.
+    """
+
+    INSTANT = "ALGORITHM=INSTANT"
+    INPLACE = "ALGORITHM=INPLACE, LOCK=NONE"
+
+    # ER_ALTER_OPERATION_NOT_SUPPORTED and ER_ALTER_OPERATION_NOT_SUPPORTED_REASON
+    UNSUPPORTED = (1845, 1846)
+
+    SQLTYPES = {
+        'Integer': "INT",
+        'BigInteger': "BIGINT",
+        'Float': "DOUBLE",
+        'Boolean': "TINYINT(1)",
+        'Date': "DATE",
+        'DateTime': "DATETIME",
+        'Blob': "LONGBLOB"
+        }
+    NUMERICS = ('Integer', 'BigInteger', 'Float', 'Decimal', 'Boolean')
+
+    def unsupported(self, error):
+        """Check if the error raised by a request means that its algorithm isn't supported (the next one can be tried)"""
+        errno = getattr(error, 'errno', None)
+        if errno is None and len(error.args) > 0:
+            errno = error.args[0]
+        return errno in self.UNSUPPORTED
+
+    def online(self, request):
+        """Check if a request alters a table without copying it or locking it (INSTANT or INPLACE)"""
+        return request.endswith((self.INSTANT, self.INPLACE))
+
+    def copying(self, request):
+        """Check if a request alters a table by the default algorithm (the table may be copied and locked)"""
+        return request.startswith("ALTER TABLE") and not self.online(request)
+
+    def sqltype(self, field):
+        """Retrieve the MySQL type of a field (see fieldfactory.FIELDTYPES)"""
+        fieldtype = field.get('Type', None)
+        if fieldtype == "String":
+            return f"VARCHAR({field.get('MaxLength')})"
+        if fieldtype == "Decimal":
+            return f"DECIMAL({int(field.get('Precision', 10))},{int(field.get('Scale', 0))})"
+        return self.SQLTYPES.get(fieldtype, "VARCHAR(2048)")
+
+    def default(self, field):
+        """Retrieve the default value of a field as a SQL literal (None if not defined, a blob has no default value)"""
+        value = field.get('DefaultValue', None)
+        fieldtype = field.get('Type', None)
+        if value is None or fieldtype == "Blob":
+            return None
+        if fieldtype in ("Integer", "BigInteger"):
+            return str(int(value))
+        if fieldtype == "Boolean":
+            return "1" if str(value).strip().lower() in DSFieldBoolean.TRUE else "0"
+        if fieldtype == "Float":
+            return repr(float(value))
+        if fieldtype == "Decimal":
+            return str(decimal.Decimal(str(value)))
+        return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+    def column(self, field):
+        """Build the definition of a field"""
+        default = self.default(field)
+        return f"`{field['Name']}` {self.sqltype(field)}" + ("" if default is None else f" DEFAULT {default}")
+
+    def index(self, indexname, index):
+        """Build the definition of an index (see DSTable.indexes)"""
+        lengths = index.get('Lengths', None) or {}
+        return ("UNIQUE " if index.get('Unique', False) else "") + f"INDEX `{indexname}` " + \
+               "(" + ", ".join([f"`{name}`" + (f"({int(lengths[name])})" if name in lengths else "")
+                                for name in index['Fields']]) + ")"
+
+    def createtable(self, schemaname, table):
+        """Build the request creating a table"""
+        definitions = [self.column(field) for field in table['Fields'].values()]
+        definitions.append(f"CONSTRAINT PK_{table['Name']} PRIMARY KEY (" +
+                           ", ".join([f"`{name}`" for name in table['Key']]) + ")")
+        for indexname, index in (table.get('Indexes', None) or {}).items():
+            definitions.append(self.index(indexname, index))
+        return f"CREATE TABLE `{schemaname}`.`{table['Name']}` (" + ", ".join(definitions) + ")"
+
+    def create(self, schema):
+        """Plan the creation of a schema and its tables"""
+        return [[f"CREATE SCHEMA `{schema['Name']}`"]] + \
+               [[self.createtable(schema['Name'], table)] for table in schema.get('Tables', {}).values()]
+
+    def __sametype(self, field, current):
+        """Check if the type of a field read from the catalog matches its description (without the display width of the integers)"""
+        def normalize(sqltype):
+            return re.sub(r"^(tinyint|smallint|mediumint|int|bigint)\(\d+\)", r"\1", str(sqltype).lower())
+        return normalize(self.sqltype(field)) == normalize(current['Type'])
+
+    def __currentdefault(self, current):
+        """Retrieve the default value of a field read from the catalog (without the quotes added by MariaDB)"""
+        default = current.get('DefaultValue', None)
+        if isinstance(default, str) and len(default) >= 2 and default[0] == default[-1] == "'":
+            return default[1:-1]
+        return default
+
+    def __samedefault(self, field, current):
+        """Check if the default value of a field read from the catalog matches its description (numbers compared by value)"""
+        default = self.default(field)
+        currentdefault = self.__currentdefault(current)
+        if default is None or currentdefault is None:
+            return default is None and currentdefault is None
+        if field.get('Type', None) in self.NUMERICS:
+            try:
+                return decimal.Decimal(default) == decimal.Decimal(str(currentdefault))
+            except decimal.InvalidOperation:
+                return False
+        return str(field['DefaultValue']) == str(currentdefault)
+
+    def altertable(self, schemaname, table, current, allowcopy = False):
+        """
+        Plan the single request upgrading a table (None if the table is up to date)
+        * allowcopy : the default algorithm is tried if the online ones aren't supported
+        """
+        clauses = []
+        instant = True
+        for fieldname, field in table['Fields'].items():
+            currentfield = current['Fields'].get(fieldname, None)
+            if currentfield is None:
+                clauses.append(f"ADD COLUMN {self.column(field)}")
+            elif not self.__sametype(field, currentfield):
+                clauses.append(f"MODIFY COLUMN {self.column(field)}")
+                instant = False
+            elif not self.__samedefault(field, currentfield):
+                default = self.default(field)
+                clauses.append(f"ALTER COLUMN `{fieldname}` " + ("DROP DEFAULT" if default is None else f"SET DEFAULT {default}"))
+
+        for indexname, index in (table.get('Indexes', None) or {}).items():
+            currentindex = current['Indexes'].get(indexname, None)
+            if currentindex is not None and \
+               (list(currentindex['Fields']), bool(currentindex['Unique']), currentindex.get('Lengths', None) or {}) == \
+               (list(index['Fields']), bool(index.get('Unique', False)), index.get('Lengths', None) or {}):
+                continue
+            if currentindex is not None:
+                clauses.append(f"DROP INDEX `{indexname}`")
+            clauses.append(f"ADD {self.index(indexname, index)}")
+            instant = False
+
+        if list(current['Key']) != list(table['Key']):
+            self.info(f"The key of the table '{schemaname}.{table['Name']}' has changed and isn't migrated")
+
+        if len(clauses) == 0:
+            return None
+        request = f"ALTER TABLE `{schemaname}`.`{table['Name']}` " + ", ".join(clauses)
+        return ([f"{request}, {self.INSTANT}"] if instant else []) + [f"{request}, {self.INPLACE}"] + \
+               ([request] if allowcopy else [])
+
+    def upgrade(self, schema, current, allowcopy = False):
+        """Plan the upgrade of a schema from its current description (see 'altertable' for allowcopy)"""
+        steps = []
+        for tablename, table in schema.get('Tables', {}).items():
+            currenttable = current['Tables'].get(tablename, None)
+            if currenttable is None:
+                steps.append([self.createtable(schema['Name'], table)])
+                continue
+            requests = self.altertable(schema['Name'], table, currenttable, allowcopy)
+            if requests is not None:
+                steps.append(requests)
+        return steps
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=bare-except
+
+"""
+This module handles a pool of connexions to a MySQL instance.
+"""
+
+import os
+import time
+import threading
+import collections
+from cryptography.fernet import Fernet
+
+import mysql.connector
+
+from logger.loggerobject import DSLoggerObject
+
+from exception.exceptiondatabasenotconnected import DSExceptionDatabaseNotConnected
+
+class DSDatabaseMySQLPool(DSLoggerObject):
+    """
+    This class handles a bounded pool of connexions to a MySQL Database, shared by all sessions
+    using the same hostname, the same user and the same settings :
+      * minsize : number of connexions kept opened even if they are idle
+      * maxsize : maximum number of connexions opened at the same time
+      * idle : number of seconds before closing an idle connexion (above minsize)
+      * ping : number of seconds of inactivity before checking that the connexion is still alive
+      * timeout : number of seconds waiting for a free connexion
+      * statements : number of prepared statements kept by connexion
+      * localinfile : allow 'LOAD DATA LOCAL INFILE' on the connexions
+    """
+
+    MINSIZE = 0
+    MAXSIZE = 10
+    IDLE = 300
+    PING = 30
+    TIMEOUT = 30
+    STATEMENTS = 64
+
+    class Connection:
+        """
+        This class describes a connexion stored into the pool
+        and the statements prepared on the server for this connexion (the most recently used are kept)
+        """
+
+        def prepare(self, query):
+            """Retrieve the prepared statement (query, cursor) of a request, the request is prepared on the first call"""
+            statement = self.statements.get(query, None)
+            if statement is not None:
+                self.statements.move_to_end(query)
+                return statement
+            statement = (query, self.database.cursor(prepared=True))
+            self.statements[query] = statement
+            while len(self.statements) > self.maxstatements:
+                _, (_, cursor) = self.statements.popitem(last=False)
+                try:
+                    cursor.close()
+                except:
+                    pass
+            return statement
+
+        def unprepare(self, query):
+            """Forget the prepared statement of a request (on error)"""
+            statement = self.statements.pop(query, None)
+            if statement is not None:
+                try:
+                    statement[1].close()
+                except:
+                    pass
+
+        def __init__(self, database, maxstatements):
+            self.database = database
+            self.lastused = time.monotonic()
+            self.statements = collections.OrderedDict()
+            self.maxstatements = maxstatements
+
+    __pools = {}
+    __lock = threading.Lock()
+
+    @classmethod
+    def get(cls, hostname, username, password, parameters = None):
+        """Retrieve the pool attached to the database target (created on the first call)"""
+        parameters = parameters or {}
+        key = (hostname, username, password, tuple(sorted(parameters.items())))
+        with cls.__lock:
+            pool = cls.__pools.get(key, None)
+            if pool is None:
+                pool = DSDatabaseMySQLPool(hostname, username, password, parameters)
+                cls.__pools[key] = pool
+            return pool
+
+    @classmethod
+    def close_all(cls):
+        """Close all connexions of all pools"""
+        with cls.__lock:
+            pools = list(cls.__pools.values())
+            cls.__pools.clear()
+        for pool in pools:
+            pool.close()
+
+    @property
+    def size(self):
+        """Number of connexions opened (free or in use)"""
+        return self.__size
+
+    def __connect(self):
+        """Open a new connexion to the database"""
+        self.debug(f"Opening a new connexion to the database '{self.__hostname}' with user '{self.__username}' ...")
+        if self.__password is None:
+            cipher_suite = Fernet(bytes(os.getenv("PSPASSWORD_KEY"), 'utf-8'))
+            self.__password = cipher_suite.decrypt(bytes(self.__encrypted_password, 'utf-8')).decode('utf-8')
+        return DSDatabaseMySQLPool.Connection(mysql.connector.connect(host=self.__hostname,
+                                                                      user=self.__username,
+                                                                      password=self.__password,
+                                                                      allow_local_infile=self.__localinfile),
+                                              self.__statements)
+
+    def __disconnect(self, connection):
+        """Close a connexion removed from the pool"""
+        try:
+            connection.database.close()
+        except:
+            self.exception(f"Error on closing a connexion to the database '{self.__hostname}'")
+
+    def __isalive(self, connection):
+        """Check if the connexion is still usable (ping only if it hasn't been used recently)"""
+        if time.monotonic() - connection.lastused < self.__ping:
+            return True
+        try:
+            return connection.database.is_connected()
+        except:
+            return False
+
+    def __expired(self):
+        """Retrieve the idle connexions to close (above minsize) - the lock has to be acquired"""
+        expired = []
+        now = time.monotonic()
+        while self.__size > self.__minsize and len(self.__free) > 0 and \
+              now - self.__free[0].lastused > self.__idle:
+            expired.append(self.__free.pop(0))
+            self.__size -= 1
+        return expired
+
+    def acquire(self):
+        """
+        Check out a connexion from the pool, a new connexion is opened if no connexion is free
+        (the connexions are checked and closed outside the lock)
+        """
+        deadline = time.monotonic() + self.__timeout
+        while True:
+            expired = []
+            try:
+                with self.__condition:
+                    while True:
+                        expired.extend(self.__expired())
+                        connection = self.__free.pop() if len(self.__free) > 0 else None
+                        if connection is not None or self.__size < self.__maxsize:
+                            if connection is None:
+                                self.__size += 1
+                            break
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0 or not self.__condition.wait(remaining):
+                            raise DSExceptionDatabaseNotConnected("No connexion available to the database " +
+                                                                  f"'{self.__hostname}' with user '{self.__username}'")
+            finally:
+                for item in expired:
+                    self.__disconnect(item)
+
+            if connection is None:
+                break
+            if self.__isalive(connection):
+                self.debug(f"Connexion to the database '{self.__hostname}' recycled")
+                return connection
+            self.discard(connection)
+
+        try:
+            return self.__connect()
+        except:
+            with self.__condition:
+                self.__size -= 1
+                self.__condition.notify()
+            raise
+
+    def release(self, connection):
+        """Check in a connexion into the pool, the current transaction is rollbacked"""
+        try:
+            connection.database.rollback()
+        except:
+            self.discard(connection)
+            return
+
+        with self.__condition:
+            connection.lastused = time.monotonic()
+            self.__free.append(connection)
+            expired = self.__expired()
+            self.__condition.notify()
+
+        for item in expired:
+            self.__disconnect(item)
+
+    def discard(self, connection):
+        """Remove a connexion from the pool (broken connexion)"""
+        with self.__condition:
+            self.__size -= 1
+            self.__condition.notify()
+        self.__disconnect(connection)
+
+    def close(self):
+        """Close all free connexions"""
+        with self.__condition:
+            free = self.__free
+            self.__size -= len(free)
+            self.__free = []
+        for connection in free:
+            self.__disconnect(connection)
+        self.info(f"Pool of the database '{self.__hostname}' with user '{self.__username}' closed")
+
+    def __init__(self, hostname, username, password, parameters):
+        super().__init__()
+        self.__hostname = hostname
+        self.__username = username
+        self.__encrypted_password = password
+        self.__password = None
+        self.__minsize = parameters.get('minsize', self.MINSIZE)
+        self.__maxsize = max(1, parameters.get('maxsize', self.MAXSIZE))
+        self.__idle = parameters.get('idle', self.IDLE)
+        self.__ping = parameters.get('ping', self.PING)
+        self.__timeout = parameters.get('timeout', self.TIMEOUT)
+        self.__statements = parameters.get('statements', self.STATEMENTS)
+        self.__localinfile = parameters.get('localinfile', False)
+        self.__condition = threading.Condition(threading.Lock())
+        self.__free = []
+        self.__size = 0
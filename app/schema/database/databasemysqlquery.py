@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module builds the SQL requests sent to a MySQL instance.
+"""
+
+import jinja2
+
+from logger.loggerobject import DSLoggerObject
+
+from exception.exceptiondatabaserequest import DSExceptionDatabaseRequest
+
+class DSDatabaseMySQLQuery(DSLoggerObject):
+    """
+    This class builds the SQL requests and their parameters for a MySQL schema.
+    It is shared by the synchronous and the asynchronous connexions.
+    The bulk inserts are split into requests of at most MAXBYTES bytes and MAXROWS records.
+    """
+
+    MAXBYTES = 4 * 1024 * 1024
+    MAXROWS = 10000
+
+    __environment = jinja2.Environment(loader=jinja2.BaseLoader())
+    __templates = {}
+
+    @property
+    def schema(self):
+        """Name of the schema"""
+        return self.__schema
+
+    def script(self, template_sql, items):
+        """Render a SQL Script (compiled on the first call) and split it into a list of requests"""
+        template = DSDatabaseMySQLQuery.__templates.get(template_sql, None)
+        if template is None:
+            template = DSDatabaseMySQLQuery.__environment.from_string(template_sql)
+            DSDatabaseMySQLQuery.__templates[template_sql] = template
+        script = template.render(**items)
+        self.verbose(script)
+        return [request for request in script.split(";") if request.strip() != '']
+
+    def catalog(self, schema):
+        """
+        Build the single request reading the description of all tables of a schema (fields and indexes)
+        from 'information_schema' and its list of parameters
+        Each row is (kind, table, index, position, name, type or unique, nullable, length, default value)
+        """
+        return "SELECT 'S', NULL, '', 0, `SCHEMA_NAME`, NULL, NULL, NULL, NULL " + \
+               "FROM `information_schema`.`SCHEMATA` WHERE `SCHEMA_NAME` = %s " + \
+               "UNION ALL " + \
+               "SELECT 'C', `TABLE_NAME`, '', `ORDINAL_POSITION`, `COLUMN_NAME`, `COLUMN_TYPE`, `IS_NULLABLE`, " + \
+               "NULL, `COLUMN_DEFAULT` " + \
+               "FROM `information_schema`.`COLUMNS` WHERE `TABLE_SCHEMA` = %s " + \
+               "UNION ALL " + \
+               "SELECT 'I', `TABLE_NAME`, `INDEX_NAME`, `SEQ_IN_INDEX`, `COLUMN_NAME`, CAST(`NON_UNIQUE` AS CHAR), NULL, " + \
+               "CAST(`SUB_PART` AS CHAR), NULL " + \
+               "FROM `information_schema`.`STATISTICS` WHERE `TABLE_SCHEMA` = %s " + \
+               "ORDER BY 2, 1, 3, 4", (schema, schema, schema)
+
+    def tables(self, rows):
+        """
+        Convert the rows read by 'catalog' into a JSON description of the tables
+        (None if the schema doesn't exist)
+        """
+        exists = False
+        tables = {}
+        for kind, tablename, indexname, _, name, nature, nullable, length, defaultvalue in rows:
+            if kind == 'S':
+                exists = True
+                continue
+            table = tables.setdefault(tablename, { 'Name': tablename, 'Fields': {}, 'Key': [], 'Indexes': {} })
+            if kind == 'C':
+                table['Fields'][name] = {
+                    'Name': name,
+                    'Type': nature,
+                    'DefaultValue': defaultvalue,
+                    'Nullable' : nullable
+                    }
+            elif indexname == 'PRIMARY':
+                table['Key'].append(name)
+            else:
+                index = table['Indexes'].setdefault(indexname, { 'Fields': [], 'Unique': int(nature) == 0 })
+                index['Fields'].append(name)
+                if length is not None:
+                    index.setdefault('Lengths', {})[name] = int(length)
+        return tables if exists else None
+
+    def insert(self, tablename, fields):
+        """Build the request inserting a record into a table"""
+        return "INSERT INTO `" + self.__schema + "`.`" + tablename + "`" + \
+               "(" + ", ".join(["`" + name + "`" for name in fields]) + ") " + \
+               "VALUES(" + ", ".join(["%s" for _ in fields]) + ")"
+
+    def insertmany(self, tablename, fields, count):
+        """Build the request inserting 'count' records into a table by a single multi-row VALUES"""
+        row = "(" + ", ".join(["%s" for _ in fields]) + ")"
+        return "INSERT INTO `" + self.__schema + "`.`" + tablename + "`" + \
+               "(" + ", ".join(["`" + name + "`" for name in fields]) + ") " + \
+               "VALUES " + ", ".join([row] * count)
+
+    def upsertmany(self, tablename, fields, key, count, rowversion = None):
+        """
+        Build the request inserting 'count' records into a table or updating the fields of the records
+        already existing with the same key (the version is incremented if defined)
+        """
+        assignments = ["`" + name + "` = VALUES(`" + name + "`)" for name in fields
+                       if name not in key and name != rowversion]
+        if rowversion is not None:
+            assignments.append("`" + rowversion + "` = COALESCE(`" + rowversion + "`, 0) + 1")
+        if len(assignments) == 0:
+            assignments = ["`" + name + "` = `" + name + "`" for name in key]
+        return self.insertmany(tablename, fields, count) + " ON DUPLICATE KEY UPDATE " + ", ".join(assignments)
+
+    def versions(self, tablename, fields, key, rowversion, chunk):
+        """
+        Build the request reading the key and the version of the records of a chunk upserted (see 'upsertmany')
+        and its list of parameters
+        """
+        positions = [fields.index(name) for name in key]
+        columns = ", ".join(["`" + name + "`" for name in key])
+        if len(key) == 1:
+            where = columns + " IN (" + ", ".join(["%s" for _ in chunk]) + ")"
+        else:
+            where = "(" + columns + ") IN (" + ", ".join(["(" + ", ".join(["%s" for _ in key]) + ")" for _ in chunk]) + ")"
+        query = "SELECT " + columns + ", `" + rowversion + "` FROM `" + self.__schema + "`.`" + tablename + "` WHERE " + where
+        return query, [item[position] for item in chunk for position in positions]
+
+    def upsertversions(self, fields, values, key, rowversion, rows):
+        """
+        Report the versions read after an upsert (see 'versions') into the records
+        (incremented for the records already existing, the records given as tuples are left as is)
+        """
+        def normalize(data):
+            return data.lower() if isinstance(data, str) else data
+        versions = {tuple(normalize(data) for data in row[:-1]): row[-1] for row in rows}
+        positions = [fields.index(name) for name in key]
+        for value in values:
+            if isinstance(value, (list, tuple)):
+                continue
+            item = self.__item(fields, value)
+            version = versions.get(tuple(normalize(item[position]) for position in positions), None)
+            if version is not None:
+                value[rowversion] = version
+
+    def loaddata(self, tablename, fields):
+        """
+        Build the request loading a tab separated file (see 'tsv') into a table
+        (no conversion of the file : the strings are written in UTF-8 and the binary values as is)
+        """
+        return "LOAD DATA LOCAL INFILE %s INTO TABLE `" + self.__schema + "`.`" + tablename + "` " + \
+               "CHARACTER SET binary " + \
+               "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' " + \
+               "(" + ", ".join(["`" + name + "`" for name in fields]) + ")"
+
+    def __where(self, clause):
+        """Build the where clause (criteria, SQL string or tuple (SQL template, parameters)) and its list of parameters"""
+        if clause is None:
+            return "", []
+        if isinstance(clause, str):
+            return " WHERE " + clause, []
+        if isinstance(clause, tuple):
+            template, parameters = clause
+        else:
+            template, parameters = clause.tomysqlquery()
+        return " WHERE " + template, list(parameters)
+
+    def select(self, tablename, fields, clause = None, orderby = None, limit = None):
+        """
+        Build the request selecting records from a table and its list of parameters :
+        * clause : criteria, SQL string or tuple (SQL template, parameters)
+        * orderby : list of (fieldname, descending) sorting the records
+        * limit : maximum number of records returned
+        """
+        query = "SELECT " + ", ".join(["`" + name + "`" for name in fields]) + " " + \
+                "FROM `" + self.__schema + "`.`" + tablename + "`"
+        where, parameters = self.__where(clause)
+        query += where
+        if orderby:
+            query += " ORDER BY " + ", ".join(["`" + name + "`" + (" DESC" if descending else "")
+                                               for name, descending in orderby])
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        return query, tuple(parameters)
+
+    def aggregate(self, tablename, groupby, metrics, clause = None):
+        """
+        Build the request computing metrics on the records matching the clause and its list of parameters :
+        * groupby : list of fields grouping the records (the groups are sorted by these fields)
+        * metrics : list of (function, fieldname) (fieldname is None for 'count(*)')
+        """
+        columns = ["`" + name + "`" for name in groupby] + \
+                  [function.upper() + "(" + ("*" if name is None else "`" + name + "`") + ")" for function, name in metrics]
+        where, parameters = self.__where(clause)
+        query = "SELECT " + ", ".join(columns) + " FROM `" + self.__schema + "`.`" + tablename + "`" + where
+        if groupby:
+            query += " GROUP BY " + ", ".join(["`" + name + "`" for name in groupby]) + \
+                     " ORDER BY " + ", ".join(["`" + name + "`" for name in groupby])
+        return query, tuple(parameters)
+
+    def update(self, tablename, fields, key = None, rowversion = None):
+        """
+        Build the request updating the given fields of a record found by its key :
+        * key : list of fields identifying the record (if not defined, all fields are compared with the old values)
+        * rowversion : field incremented on each update and compared with the old value (optimistic lock)
+        """
+        assignments = ["`" + field + "` = %s" for field in fields]
+        if key is None:
+            conditions = ["`" + field + "` <=> %s" for field in fields]
+        else:
+            conditions = ["`" + field + "` = %s" for field in key]
+        if rowversion is not None:
+            assignments.append("`" + rowversion + "` = COALESCE(`" + rowversion + "`, 0) + 1")
+            conditions.append("`" + rowversion + "` <=> %s")
+        return "UPDATE `" + self.__schema + "`.`" + tablename + "` " + \
+               "SET " + ", ".join(assignments) + " " + \
+               "WHERE " + " and ".join(conditions)
+
+    def updatewhere(self, tablename, assignments, clause = None, rowversion = None):
+        """
+        Build the request updating all records matching the clause and its list of parameters :
+        * assignments : dictionary of the new values by field
+        * rowversion : field incremented on each update
+        """
+        fields = [field for field in assignments if field != rowversion]
+        sets = ["`" + field + "` = %s" for field in fields]
+        if rowversion is not None:
+            sets.append("`" + rowversion + "` = COALESCE(`" + rowversion + "`, 0) + 1")
+        where, parameters = self.__where(clause)
+        return "UPDATE `" + self.__schema + "`.`" + tablename + "` SET " + ", ".join(sets) + where, \
+               tuple([assignments[field] for field in fields] + parameters)
+
+    def deletewhere(self, tablename, clause = None, limit = None):
+        """Build the request deleting the records matching the clause (at most 'limit' records) and its list of parameters"""
+        where, parameters = self.__where(clause)
+        query = "DELETE FROM `" + self.__schema + "`.`" + tablename + "`" + where
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        return query, tuple(parameters)
+
+    def delete(self, tablename, fields):
+        """Build the request deleting a record from a table"""
+        return "DELETE FROM `" + self.__schema + "`.`" + tablename + "` " + \
+               "WHERE " + "and ".join(["`" + field + "` = %s " for field in fields])
+
+    def __item(self, fields, value):
+        """Extract the parameters of a record (a record, a dictionary or a tuple in the order of the fields)"""
+        if isinstance(value, (list, tuple)):
+            return tuple(value)
+        return tuple(value[name] for name in fields)
+
+    def chunks(self, query, fields, values, maxbytes = MAXBYTES, maxrows = MAXROWS):
+        """
+        Split the records into chunks (list of parameters) whose estimated size in the request
+        doesn't exceed maxbytes (and maxrows records)
+        """
+        chunk = []
+        size = 0
+        try:
+            for value in values:
+                item = self.__item(fields, value)
+                length = 2
+                for data in item:
+                    if data is None:
+                        length += 6
+                    elif isinstance(data, str):
+                        length += len(data.encode('utf-8')) + 4
+                    elif isinstance(data, bool):
+                        length += 3
+                    elif isinstance(data, (bytes, bytearray)):
+                        # each byte may be escaped, the value is prefixed by _binary
+                        length += 2 * len(data) + 12
+                    else:
+                        length += len(str(data)) + 2
+                if len(chunk) > 0 and (size + length > maxbytes or len(chunk) >= maxrows):
+                    yield chunk
+                    chunk = []
+                    size = 0
+                chunk.append(item)
+                size += length
+        except (KeyError, TypeError) as exc:
+            self.exception(f"Error on extracting data from '{query}'")
+            raise DSExceptionDatabaseRequest(f"Error on extracting data from '{query}'") from exc
+        if len(chunk) > 0:
+            yield chunk
+
+    def tsv(self, query, fields, values, file):
+        """
+        Write the records into a tab separated file (opened in binary mode) loaded by 'loaddata'
+        and retrieve the number of records
+        """
+        def convert(data):
+            if data is None:
+                return b"\\N"
+            if isinstance(data, bool):
+                return b"1" if data else b"0"
+            if isinstance(data, (bytes, bytearray)):
+                data = bytes(data)
+            else:
+                data = str(data).encode('utf-8')
+            return data.replace(b"\\", b"\\\\").replace(b"\t", b"\\t").replace(b"\n", b"\\n") \
+                       .replace(b"\r", b"\\r").replace(b"\0", b"\\0")
+
+        count = 0
+        try:
+            for value in values:
+                file.write(b"\t".join([convert(data) for data in self.__item(fields, value)]) + b"\n")
+                count += 1
+        except (KeyError, TypeError) as exc:
+            self.exception(f"Error on extracting data from '{query}'")
+            raise DSExceptionDatabaseRequest(f"Error on extracting data from '{query}'") from exc
+        return count
+
+    def items(self, query, fields, values):
+        """Extract the parameters of a request from one or many records"""
+        items = []
+        try:
+            if isinstance(values, (list, tuple)):
+                for value in values:
+                    items.append(tuple(value[name] for name in fields))
+            else:
+                items.append(tuple(values[name] for name in fields))
+        except Exception as exc:
+            self.exception(f"Error on extracting data from '{query}'")
+            raise DSExceptionDatabaseRequest(f"Error on extracting data from '{query}'") from exc
+        return items
+
+    def __changed(self, fields, oldvalue, newvalue, key = None, rowversion = None):
+        """List of fields to update (all fields if the key is not defined and the records are different)"""
+        if key is None:
+            return () if oldvalue == newvalue else tuple(fields)
+        return tuple(field for field in fields if field != rowversion and oldvalue[field] != newvalue[field])
+
+    def updateversions(self, fields, oldvalues, newvalues, key, rowversion):
+        """Report the increment of the version done by the update into the new records"""
+        if not isinstance(oldvalues, (list, tuple)):
+            oldvalues = [oldvalues]
+            newvalues = [newvalues]
+        for oldvalue, newvalue in zip(oldvalues, newvalues):
+            if len(self.__changed(fields, oldvalue, newvalue, key, rowversion)) > 0:
+                newvalue[rowversion] = (oldvalue[rowversion] or 0) + 1
+
+    def updateitems(self, tablename, fields, oldvalues, newvalues, key = None, rowversion = None):
+        """
+        Compare the old and the new records and group the updates by list of fields changed :
+        list of (request, list of parameters) executed by executemany
+        (if the key is not defined, all fields are updated and compared with the old values)
+        """
+        groups = {}
+        try:
+            if not isinstance(oldvalues, (list, tuple)):
+                oldvalues = [oldvalues]
+                newvalues = [newvalues]
+            for oldvalue, newvalue in zip(oldvalues, newvalues):
+                changed = self.__changed(fields, oldvalue, newvalue, key, rowversion)
+                if len(changed) == 0:
+                    continue
+                item = [newvalue[field] for field in changed]
+                item.extend(oldvalue[field] for field in (changed if key is None else key))
+                if rowversion is not None:
+                    item.append(oldvalue[rowversion])
+                groups.setdefault(changed, []).append(tuple(item))
+        except Exception as exc:
+            self.exception(f"Error on extracting data to update into '{tablename}'")
+            raise DSExceptionDatabaseRequest(f"Error on extracting data to update into '{tablename}'") from exc
+        return [(self.update(tablename, changed, key, rowversion), items) for changed, items in groups.items()]
+
+    def __init__(self, schema):
+        super().__init__()
+        self.__schema = schema
@@ -52,6 +52,24 @@ class DSField:
         """Default value of the field"""
         return self.__defaultvalue
 
+    @property
+    def dtype(self):
+        """Type of the NumPy array storing the values of the field (see DSTable.select_columns)"""
+        return object
+
+    def convert(self, value):
+        """Convert a value (e.g. a string from an URL) into the type of the field"""
+        return value
+
+    def decode(self, value):
+        """Convert a value read from the database into the type of the field (see DSRecord.decode)"""
+        return value
+
+    @property
+    def isdecoded(self):
+        """Return if the values read from the database have to be converted (see decode)"""
+        return type(self).decode is not DSField.decode
+
     def __eq__(self, value):
         return DSCriteriaComparableEqual(self, value)
 
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module handles a 64 bits integer field description.
+"""
+
+from .fieldinteger import DSFieldInteger
+
+class DSFieldBigInteger(DSFieldInteger):
+    """
+    This class handles a 64 bits integer field description.
+    """
+
+    def __init__(self, table, fieldname, description):
+        super().__init__(table, fieldname, description, "BigInteger")
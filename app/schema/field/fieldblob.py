@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module handles a binary field description.
+"""
+
+from .field import DSField
+
+class DSFieldBlob(DSField):
+    """
+    This class handles a binary field description (stored as a LONGBLOB, without default value).
+    """
+
+    def convert(self, value):
+        """Convert a value (e.g. a string from an URL) into the type of the field"""
+        if isinstance(value, str):
+            return value.encode('utf-8')
+        if isinstance(value, bytearray):
+            return bytes(value)
+        return value
+
+    def decode(self, value):
+        """Convert a value read from the database into the type of the field"""
+        if isinstance(value, bytearray):
+            return bytes(value)
+        return value
+
+    def __init__(self, table, fieldname, description):
+        super().__init__(table, "Blob", fieldname, description)
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module handles a boolean field description.
+"""
+
+import numpy
+
+from .field import DSField
+
+class DSFieldBoolean(DSField):
+    """
+    This class handles a boolean field description (stored as a TINYINT(1)).
+    """
+
+    TRUE = ('1', 'true', 'yes', 'on')
+
+    @property
+    def dtype(self):
+        """Type of the NumPy array storing the values of the field (see DSTable.select_columns)"""
+        return numpy.bool_
+
+    def convert(self, value):
+        """Convert a value (e.g. a string from an URL) into the type of the field"""
+        if isinstance(value, str):
+            return value.strip().lower() in self.TRUE
+        if isinstance(value, int):
+            return bool(value)
+        return value
+
+    def decode(self, value):
+        """Convert a value read from the database into the type of the field"""
+        return None if value is None else bool(value)
+
+    def __init__(self, table, fieldname, description):
+        super().__init__(table, "Boolean", fieldname, description)
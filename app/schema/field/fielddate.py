@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module handles a date field description.
+"""
+
+import datetime
+
+from .field import DSField
+
+class DSFieldDate(DSField):
+    """
+    This class handles a date field description.
+    """
+
+    @property
+    def dtype(self):
+        """Type of the NumPy array storing the values of the field (see DSTable.select_columns)"""
+        return "datetime64[D]"
+
+    def convert(self, value):
+        """Convert a value (e.g. a string 'YYYY-MM-DD' from an URL) into the type of the field"""
+        if isinstance(value, str):
+            return datetime.date.fromisoformat(value)
+        if isinstance(value, datetime.datetime):
+            return value.date()
+        return value
+
+    def __init__(self, table, fieldname, description):
+        super().__init__(table, "Date", fieldname, description)
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module handles a date and time field description.
+"""
+
+import datetime
+
+from .field import DSField
+
+class DSFieldDateTime(DSField):
+    """
+    This class handles a date and time field description.
+    """
+
+    @property
+    def dtype(self):
+        """Type of the NumPy array storing the values of the field (see DSTable.select_columns)"""
+        return "datetime64[us]"
+
+    def convert(self, value):
+        """Convert a value (e.g. a string 'YYYY-MM-DD HH:MM:SS' from an URL) into the type of the field"""
+        if isinstance(value, str):
+            return datetime.datetime.fromisoformat(value)
+        if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+            return datetime.datetime.combine(value, datetime.time())
+        return value
+
+    def __init__(self, table, fieldname, description):
+        super().__init__(table, "DateTime", fieldname, description)
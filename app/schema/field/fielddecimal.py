@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module handles a fixed point field description.
+"""
+
+import decimal
+
+from .field import DSField
+
+class DSFieldDecimal(DSField):
+    """
+    This class handles a fixed point field description :
+      * Precision : number of digits (10 by default)
+      * Scale : number of digits after the decimal point (0 by default)
+    """
+
+    def to_dict(self):
+        """Convert the field to a json"""
+        field = super().to_dict()
+        field['Precision'] = self.precision
+        field['Scale'] = self.scale
+        return field
+
+    @property
+    def precision(self):
+        """Number of digits"""
+        return self.__precision
+
+    @property
+    def scale(self):
+        """Number of digits after the decimal point"""
+        return self.__scale
+
+    def convert(self, value):
+        """Convert a value (e.g. a string from an URL) into the type of the field"""
+        if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+            return decimal.Decimal(str(value))
+        return value
+
+    def __init__(self, table, fieldname, description):
+        super().__init__(table, "Decimal", fieldname, description)
+        self.__precision = int(description.get('Precision', 10))
+        self.__scale = int(description.get('Scale', 0))
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+"""Create a field from its description"""
+
+from exception.exceptionfieldtypeunknown import DSExceptionFieldTypeUnknown
+
+from .fieldbiginteger import DSFieldBigInteger
+from .fieldblob import DSFieldBlob
+from .fieldboolean import DSFieldBoolean
+from .fielddate import DSFieldDate
+from .fielddatetime import DSFieldDateTime
+from .fielddecimal import DSFieldDecimal
+from .fieldfloat import DSFieldFloat
+from .fieldinteger import DSFieldInteger
+from .fieldstring import DSFieldString
+
+FIELDTYPES = {
+    'String': DSFieldString,
+    'Integer': DSFieldInteger,
+    'BigInteger': DSFieldBigInteger,
+    'Float': DSFieldFloat,
+    'Decimal': DSFieldDecimal,
+    'Boolean': DSFieldBoolean,
+    'Date': DSFieldDate,
+    'DateTime': DSFieldDateTime,
+    'Blob': DSFieldBlob
+    }
+
+
+def register(fieldtype, fieldclass):
+    """Declare a new type of field (fieldclass is built by fieldclass(table, fieldname, description))"""
+    FIELDTYPES[fieldtype] = fieldclass
+
+
+def factory(table, fieldname, description):
+    """Convert the description of a field ('Type' is 'String' by default) into a field"""
+    fieldtype = description.get('Type', 'String')
+    fieldclass = FIELDTYPES.get(fieldtype, None)
+    if fieldclass is None:
+        raise DSExceptionFieldTypeUnknown(f"The type '{fieldtype}' of the field '{fieldname}' is unknown")
+    return fieldclass(table, fieldname, description)
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module handles a floating point field description.
+"""
+
+import numpy
+
+from .field import DSField
+
+class DSFieldFloat(DSField):
+    """
+    This class handles a floating point field description (stored as a double).
+    """
+
+    @property
+    def dtype(self):
+        """Type of the NumPy array storing the values of the field (see DSTable.select_columns)"""
+        return numpy.float64
+
+    def convert(self, value):
+        """Convert a value (e.g. a string from an URL) into the type of the field"""
+        if isinstance(value, (str, int)) and not isinstance(value, bool):
+            return float(value)
+        return value
+
+    def __init__(self, table, fieldname, description):
+        super().__init__(table, "Float", fieldname, description)
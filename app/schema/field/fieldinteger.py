@@ -4,6 +4,8 @@
 This module handles an integer field description.
 """
 
+import numpy
+
 from .field import DSField
 
 class DSFieldInteger(DSField):
@@ -11,5 +13,16 @@ class DSFieldInteger(DSField):
     This class handles an integer field description.
     """
 
-    def __init__(self, table, fieldname, description):
-        super().__init__(table, "Integer", fieldname, description)
+    @property
+    def dtype(self):
+        """Type of the NumPy array storing the values of the field (see DSTable.select_columns)"""
+        return numpy.int64
+
+    def convert(self, value):
+        """Convert a value (e.g. a string from an URL) into the type of the field"""
+        if isinstance(value, str):
+            return int(value)
+        return value
+
+    def __init__(self, table, fieldname, description, fieldtype = "Integer"):
+        super().__init__(table, fieldtype, fieldname, description)
@@ -22,6 +22,17 @@ class DSFieldString(DSField):
         """Max lenght of the string"""
         return self.__maxlength
 
+    @property
+    def dtype(self):
+        """Type of the NumPy array storing the values of the field (see DSTable.select_columns)"""
+        return f"U{self.maxlength}"
+
+    def convert(self, value):
+        """Convert a value (e.g. a string from an URL) into the type of the field"""
+        if value is None or isinstance(value, str):
+            return value
+        return str(value)
+
     def __init__(self, table, fieldname, description):
         super().__init__(table, "String", fieldname, description)
         self.__maxlength = description.get('MaxLength', 256)
@@ -5,63 +5,117 @@ This module handles a generic record from a table.
 """
 
 class DSRecord:
-    """This class describes a generic record from any table"""
+    """
+    This class describes a generic record from any table
+    Each table generates its own record class (see DSTable.recordclass) storing the values into a list,
+    DSRecord(table, fields) creates a record of the class generated by the table.
+    A partial record contains only a part of the fields of the table (projection)
+    """
+
+    __slots__ = ('_values',)
+
+    _table = None
+    _fields = ()
+    _indexes = {}
+    _defaults = ()
+    _decoders = ()
+
+    class Value:
+        """This class gives access to the value of a field as an attribute of the record"""
+
+        __slots__ = ('index',)
+
+        def __get__(self, record, owner = None):
+            if record is None:
+                return self
+            return record._values[self.index]  # pylint: disable=protected-access
+
+        def __set__(self, record, value):
+            record._values[self.index] = value  # pylint: disable=protected-access
+
+        def __init__(self, index):
+            self.index = index
+
+    @classmethod
+    def generate(cls, dstable, fields = None):
+        """Create the record class of a table (only the given fields if defined)"""
+        fields = tuple(fields or dstable.fields)
+        attributes = {
+            '__slots__': (),
+            '_table': dstable,
+            '_fields': fields,
+            '_indexes': {fieldname: index for index, fieldname in enumerate(fields)},
+            '_defaults': tuple(dstable[fieldname].defaultvalue for fieldname in fields),
+            '_decoders': tuple((index, dstable[fieldname].decode) for index, fieldname in enumerate(fields)
+                               if dstable[fieldname].isdecoded)
+            }
+        for index, fieldname in enumerate(fields):
+            if fieldname.isidentifier() and not hasattr(cls, fieldname):
+                attributes[fieldname] = DSRecord.Value(index)
+        return type(f"DSRecord{dstable.name}", (cls,), attributes)
+
+    @classmethod
+    def decode(cls, values):
+        """Create a record from a row read from the database (the values are converted by the fields, see DSField.decode)"""
+        record = cls(values=values)
+        for index, decode in cls._decoders:
+            record._values[index] = decode(record._values[index])
+        return record
 
     def to_dict(self):
         """Convert the record to a dict"""
-        record = {}
-        for fieldname in self.table.fields:
-            record[fieldname] = self[fieldname]
-        return record
+        return dict(zip(self._fields, self._values))
 
     @property
     def table(self):
         """Retrieve the table attached to this record"""
-        return self.__table
+        return self._table
+
+    @property
+    def fields(self):
+        """List of field names contained into the record"""
+        return self._fields
+
+    @property
+    def ispartial(self):
+        """Return if the record doesn't contain all fields of the table"""
+        return len(self._fields) != len(self._table.fields)
 
     def clone(self):
         """Clone the current instance of record"""
-        record = DSRecord(self.table)
-        for fieldname in self.table.fields:
-            record[fieldname] = self[fieldname]
-        return record
+        return self.__class__(values=self._values)
 
     def __eq__(self, record):
-        if self.table != record.table:
+        if not isinstance(record, DSRecord):
             return False
-        for fieldname in self.table.fields:
-            if record[fieldname] != self[fieldname]:
-                return False
-        return True
+        return self._table == record.table and self._fields == record.fields and \
+               self._values == record._values  # pylint: disable=protected-access
 
     def __str__(self):
-        return "{" + ", ".join([f"{fieldname}={self.__fields[fieldname][1]}"
-                                for fieldname in self.__fields]) + "}"
+        return "{" + ", ".join([f"{fieldname}={value}" for fieldname, value in zip(self._fields, self._values)]) + "}"
 
     def __getattr__(self, fieldname):
-        if fieldname in self.__fields:
-            return self.__fields[fieldname][1]
-        raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{fieldname}'")
+        index = self._indexes.get(fieldname, None)
+        if index is None:
+            raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{fieldname}'")
+        return self._values[index]
 
     def __getitem__(self, fieldname):
-        if fieldname in self.__fields:
-            return self.__fields[fieldname][1]
-        raise KeyError(f"Field '{fieldname}' not found in record.")
-
-    def __setattr__(self, fieldname, value):
-        if fieldname in self.__dict__["_DSRecord__fields"]:
-            self.__fields[fieldname][1] = value
-        else:
-            super().__setattr__(fieldname, value)
+        index = self._indexes.get(fieldname, None)
+        if index is None:
+            raise KeyError(f"Field '{fieldname}' not found in record.")
+        return self._values[index]
 
     def __setitem__(self, fieldname, value):
-        if fieldname in self.__fields:
-            self.__fields[fieldname][1] = value
-        else:
+        index = self._indexes.get(fieldname, None)
+        if index is None:
             raise KeyError(f"Field '{fieldname}' not found in record.")
+        self._values[index] = value
+
+    def __new__(cls, dstable = None, fields = None, values = None):  # pylint: disable=unused-argument
+        if cls is DSRecord:
+            return super().__new__(dstable.recordclass(fields))
+        return super().__new__(cls)
 
-    def __init__(self, dstable):
-        self.__dict__["_DSRecord__table"] = dstable
-        self.__dict__["_DSRecord__fields"] = {}
-        for fieldname in dstable.fields:
-            self.__fields[fieldname] = [dstable[fieldname], dstable[fieldname].defaultvalue]
+    def __init__(self, dstable = None, fields = None, values = None):  # pylint: disable=unused-argument
+        self._values = list(self._defaults if values is None else values)
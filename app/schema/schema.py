@@ -4,39 +4,41 @@
 This module handles a schema.
 """
 
+import inspect
+
 from logger.loggerobject import DSLoggerObject
 from .table import DSTable
+from .schemadefinition import DSSchemaDefinition
 
 class DSSchema(DSLoggerObject):
     """
     This class handles an instance of a current database schema.
+    The description of the schema and its tables is shared by all sessions (see DSSchemaDefinition).
     """
 
     def to_dict(self):
-        """Convert the schema to a json"""
-        tables = {}
-        for key, value in self.__tables.items():
-            tables[key] = value.to_dict()
-        return {
-                'Name': self.name,
-                'Description': self.description,
-                'Tables': tables
-            }
+        """Convert the schema to a json (see DSSchemaDefinition.to_dict)"""
+        return self.__definition.to_dict()
+
+    @property
+    def definition(self):
+        """Description of the schema shared by all sessions (see DSSchemaDefinition)"""
+        return self.__definition
 
     @property
     def name(self):
         """Name of the schema"""
-        return self.__name
+        return self.__definition.name
 
     @property
     def description(self):
         """Description of the schema"""
-        return self.__description
+        return self.__definition.description
 
     @property
     def version(self):
         """Version of the schema"""
-        return self.__version
+        return self.__definition.version
 
     @property
     def tables(self):
@@ -48,6 +50,11 @@ class DSSchema(DSLoggerObject):
         """Return if the connection is done"""
         return self.__database.isconnected
 
+    @property
+    def isasync(self):
+        """Return if the requests have to be awaited (asyncio)"""
+        return self.__database.isasync
+
     @property
     def database(self):
         """Return the current database session"""
@@ -61,29 +68,54 @@ class DSSchema(DSLoggerObject):
             table.set_user(user)
         return self
 
+    def identities(self, tablename):
+        """
+        Retrieve the identity map of a table (records read by key within the current transaction)
+        The map is cleared at the end of the transaction or on writing into the table
+        """
+        identities = self.__identities.get(tablename, None)
+        if identities is None:
+            identities = {}
+            self.__identities[tablename] = identities
+        return identities
+
+    def __end_transaction(self, result):
+        """Notify the tables that the transaction is done (after awaiting the result if the database is asynchronous)"""
+        if inspect.isawaitable(result):
+            async def end():
+                value = await result
+                self.__end_transaction(None)
+                return value
+            return end()
+        self.__identities.clear()
+        for table in self.__tables.values():
+            table.end_transaction()
+        return result
+
     def commit(self):
         """Commit current transaction"""
         self.verbose("Committing transaction ...")
-        self.__database.commit()
+        return self.__end_transaction(self.__database.commit())
 
     def rollback(self):
         """Rollback current transaction"""
         self.verbose("Rollbacking transaction ...")
-        self.__database.rollback()
+        return self.__end_transaction(self.__database.rollback())
 
-    def migrate(self, schema = None):
+    def migrate(self, schema = None, allowcopy = False):
         """
         Create or upgrade a schema towards a new version
         * True if the schema is upgrading
         * False if no changes has done
         The current schema should be the main instance because the right is higher (root)
+        If allowcopy is set, the tables which can't be altered online are copied (else they are reported)
         """
         allprivileges = False
         if schema is None:
             schema = self
             allprivileges = True
         self.verbose(f"Migrating the schema '{schema.name}' ...")
-        return self.__database.migrate(schema.to_dict(), schema.database.to_dict(), allprivileges)
+        return self.__database.migrate(schema.to_dict(), schema.database.to_dict(), allprivileges, allowcopy)
 
     def __getattr__(self, name):
         return self.__tables[name]
@@ -96,15 +128,21 @@ class DSSchema(DSLoggerObject):
 
     def __exit__(self, *args):
         self.__database.__exit__()
+        self.__end_transaction(None)
+
+    async def __aenter__(self):
+        return await self.__database.__aenter__()
+
+    async def __aexit__(self, *args):
+        await self.__database.__aexit__()
+        self.__end_transaction(None)
 
     def __init__(self, database, schema):
         super().__init__()
-        self.__name = schema['Name']
-        self.__description = schema.get('Description', '')
-        self.__version = schema.get('Version', 0)
+        self.__definition = DSSchemaDefinition.get(schema)
         self.__tables = {}
+        self.__identities = {}
         self.__database = database
 
-        tables = schema.get('Tables', {})
-        for key in tables.keys():
-            self.__tables[key] = DSTable(self, key, tables[key])
+        for key in self.__definition.tables:
+            self.__tables[key] = DSTable(self, key, self.__definition[key])
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module handles the description of a schema.
+"""
+
+import json
+import threading
+
+from .tabledefinition import DSTableDefinition
+
+class DSSchemaDefinition:
+    """
+    This class handles the description of a schema (name, version and tables), built once by description
+    and shared read-only by all sessions and tenants whose schema has the same description (see DSSchema).
+    """
+
+    __definitions = {}
+    __lock = threading.Lock()
+
+    @classmethod
+    def get(cls, description):
+        """
+        Retrieve the definition of a schema from its description (a dictionary or a configuration item),
+        built on the first call and shared by all identical descriptions
+        """
+        if isinstance(description, DSSchemaDefinition):
+            return description
+        if hasattr(description, 'to_dict'):
+            description = description.to_dict()
+        key = json.dumps(description, sort_keys=True, default=str)
+        with cls.__lock:
+            definition = cls.__definitions.get(key, None)
+        if definition is not None:
+            return definition
+        definition = DSSchemaDefinition(description)
+        with cls.__lock:
+            return cls.__definitions.setdefault(key, definition)
+
+    def to_dict(self):
+        """Convert the schema to a json (built once, mustn't be modified)"""
+        if self.__dict is None:
+            self.__dict = {
+                    'Name': self.name,
+                    'Description': self.description,
+                    'Tables': {key: value.to_dict() for key, value in self.__tables.items()}
+                }
+        return self.__dict
+
+    @property
+    def name(self):
+        """Name of the schema"""
+        return self.__name
+
+    @property
+    def description(self):
+        """Description of the schema"""
+        return self.__description
+
+    @property
+    def version(self):
+        """Version of the schema"""
+        return self.__version
+
+    @property
+    def tables(self):
+        """List of table name"""
+        return list(self.__tables.keys())
+
+    def __getattr__(self, name):
+        return self.__tables[name]
+
+    def __getitem__(self, name):
+        return self.__tables[name]
+
+    def __init__(self, schema):
+        self.__name = schema['Name']
+        self.__description = schema.get('Description', '')
+        self.__version = schema.get('Version', 0)
+        self.__tables = {}
+        self.__dict = None
+
+        tables = schema.get('Tables', {})
+        for key in tables.keys():
+            self.__tables[key] = DSTableDefinition(key, tables[key])
@@ -6,66 +6,100 @@ This module handles a table.
 
 from logger.loggerobject import DSLoggerObject
 
-from .record import DSRecord
+from .tabledefinition import DSTableDefinition
 from .cursor import DSCursor
+from .columns import DSColumns
+from .tablecache import DSTableCache
 
-from .field.fieldstring import DSFieldString # pylint: disable=unused-import
-from .field.fieldinteger import DSFieldInteger  # pylint: disable=unused-import
+from .criteria.criteriacomparableequal import DSCriteriaComparableEqual
+from .criteria.criteriacomparablegreater import DSCriteriaComparableGreater
+from .criteria.criteriacomparablein import DSCriteriaComparableIn
+from .criteria.criteriacomparableless import DSCriteriaComparableLess
+from .criteria.criterialogicaland import DSCriteriaLogicalAnd
+from .criteria.criterialogicalor import DSCriteriaLogicalOr
 
 class DSTable(DSLoggerObject):
     """
-    This class handles a table description.
+    This class handles a table within a session, its description is shared by all sessions (see DSTableDefinition).
+    If the description contains 'Cache', the selections are kept into a cache shared by the sessions (see DSTableCache).
+    If the database is asynchronous, insert, update and delete have to be awaited
+    and the cursors have to be read within 'async for'.
     """
 
     def to_dict(self):
-        """Convert the table to a json"""
-        fields = {}
-        for key, value in self.__fields.items():
-            fields[key] = value.to_dict()
-        return {
-                'Name': self.name,
-                'Description': self.description,
-                'Fields': fields,
-                'Key': self.key
-            }
+        """Convert the table to a json (see DSTableDefinition.to_dict)"""
+        return self.__definition.to_dict()
+
+    @property
+    def definition(self):
+        """Description of the table shared by all sessions (see DSTableDefinition)"""
+        return self.__definition
 
     @property
     def name(self):
         """Name of the table"""
-        return self.__name
+        return self.__definition.name
 
     @property
     def description(self):
         """Description of the table"""
-        return self.__description
+        return self.__definition.description
 
     @property
     def key(self):
         """Name of the field key of the table"""
-        return self.__key
+        return self.__definition.key
+
+    @property
+    def indexes(self):
+        """Dictionary of the secondary indexes of the table by name (see DSTableDefinition.indexes)"""
+        return self.__definition.indexes
+
+    @property
+    def rowversion(self):
+        """Name of the field incremented on each update to detect concurrent modifications (None if not defined)"""
+        return self.__definition.rowversion
 
     @property
     def fields(self):
         """List of field name"""
-        return list(self.__fields.keys())
+        return self.__definition.fields
+
+    def recordclass(self, fields = None):
+        """Retrieve the record class of the table (only the given fields if defined), see DSTableDefinition.recordclass"""
+        return self.__definition.recordclass(fields)
 
     @property
     def schema(self):
         """Reference on the schema of the table"""
         return self.__schema
 
-    def new(self, value = None):
-        """Create a new record from the current table"""
-        record = DSRecord(self)
-        if isinstance(value, (list, tuple)):
-            for index, fieldname in enumerate(self.__fields):
-                record[fieldname] = value[index]
-        elif isinstance(value, dict):
-            for fieldname in self.__fields:
-                if fieldname in value:
-                    record[fieldname] = value[fieldname]
+    @property
+    def cache(self):
+        """Cache of the selections shared by all sessions of the process (None if the table isn't cached)"""
+        if self.__cache is None and self.__definition.cacheparameters is not None:
+            database = self.__schema.database.to_dict()
+            self.__cache = DSTableCache.get((database.get('hostname', None), database.get('schema', None), self.name),
+                                            self.__definition.cacheparameters).set_user(self.user)
+        return self.__cache
+
+    def __written(self):
+        """The table is modified by the current transaction : the cache is cleared and not used until its end"""
+        self.__modified = True
+        self.__schema.identities(self.name).clear()
+        if self.cache is not None:
+            self.cache.clear()
 
-        return record
+    def end_transaction(self):
+        """The current transaction is committed or rollbacked : the cache is cleared if the table has been modified"""
+        if self.__modified:
+            self.__modified = False
+            if self.cache is not None:
+                self.cache.clear()
+
+    def new(self, value = None, fields = None):
+        """Create a new record from the current table (a partial record if the list of fields is defined)"""
+        return self.__definition.new(value, fields)
 
     def insert(self, values):
         """Insert one or many records into the database"""
@@ -74,27 +108,271 @@ class DSTable(DSLoggerObject):
                 self.verbose(f"Inserting {len(values)} records into the table '{self.__schema.name}.{self.name}' ...")
             else:
                 self.verbose(f"Inserting a record into the table '{self.__schema.name}.{self.name}' ...")
+        self.__written()
         return self.__schema.database.insert(self.name, self.fields, values)
 
-    def select(self, clause = None):
-        """Retrieve a cursor on the list of records matching within the clause"""
+    def keyset(self, orderby = None):
+        """Retrieve the list of (fieldname, descending) sorting the records in a unique order (see DSTableDefinition)"""
+        return self.__definition.keyset(orderby)
+
+    def position(self, record, orderby = None):
+        """Retrieve the values of the keyset of a record (see 'after' into 'select')"""
+        return self.__definition.position(record, orderby)
+
+    def __after(self, keyset, after):
+        """Build the criteria selecting the records following the position 'after' into the keyset order"""
+        if len(after) != len(keyset):
+            raise ValueError(f"The position {after} doesn't match the order {keyset}")
+        criterias = []
+        for index, (name, descending) in enumerate(keyset):
+            items = [DSCriteriaComparableEqual(self.__definition[keyset[i][0]], after[i]) for i in range(index)]
+            if descending:
+                items.append(DSCriteriaComparableLess(self.__definition[name], after[index]))
+            else:
+                items.append(DSCriteriaComparableGreater(self.__definition[name], after[index]))
+            criterias.append(DSCriteriaLogicalAnd(*items))
+        return DSCriteriaLogicalOr(*criterias)
+
+    def projection(self, fields = None, keyset = None):
+        """Retrieve the list of fields read by a selection (see DSTableDefinition.projection)"""
+        return self.__definition.projection(fields, keyset)
+
+    def __request(self, clause, orderby, limit, after):
+        """Retrieve the keyset ordering the records and the where clause of a selection"""
         where = None
         if clause is not None:
             if isinstance(clause, str):
                 where = clause
             else:
                 where = clause(self)
+        keyset = None
+        if orderby is not None or limit is not None or after is not None:
+            keyset = self.keyset(orderby)
+        if after is not None:
+            criteria = self.__after(keyset, after)
+            if where is None:
+                where = criteria
+            elif isinstance(where, str):
+                template, parameters = criteria.tomysqlquery()
+                where = (f"({where}) and ({template})", parameters)
+            else:
+                where = where & criteria
+        return keyset, where
+
+    def select(self, clause = None, stream = False, orderby = None, limit = None, after = None, fields = None):
+        """
+        Retrieve a cursor on the list of records matching within the clause
+        * stream : if True, the records are read from the database while the cursor is read
+        * orderby : list of fields sorting the records ('-' before the name for a descending order),
+          the records are also sorted by the key to have a unique order
+        * limit : maximum number of records
+        * after : position (see 'position') of the last record read, the records are read from the next one
+        * fields : list of fields read from the database (see 'projection'), the records are partial
+        The ordering fields mustn't be null to page through the records with 'after'
+        """
+        keyset, where = self.__request(clause, orderby, limit, after)
+        projection = self.projection(fields, keyset)
         self.verbose(f"Selecting values from the table '{self.__schema.name}.{self.name}' ...")
-        return DSCursor(self, self.__schema.database.select(self.name, self.fields, where)).set_user(self.user)
+
+        def execute():
+            return self.__schema.database.select(self.name, projection or self.fields, where, stream, keyset, limit)
+
+        request = None
+        if self.cache is not None and not self.__modified:
+            request = self.__cacherequest(projection or self.fields, where, keyset, limit)
+        if request is None:
+            return DSCursor(self, execute(), projection).set_user(self.user)
+        return DSCursor(self, self.cache.select(request, execute), projection).set_user(self.user)
+
+    def __cacherequest(self, fields, where, keyset, limit):
+        """Retrieve the key of a selection into the cache (None if the selection can't be cached)"""
+        if where is None:
+            template, parameters = None, ()
+        elif isinstance(where, str):
+            template, parameters = where, ()
+        elif isinstance(where, tuple):
+            template, parameters = where
+        else:
+            template, parameters = where.tomysqlquery()
+        request = (tuple(fields), template, tuple(parameters), None if keyset is None else tuple(keyset), limit)
+        try:
+            hash(request)
+        except TypeError:
+            return None
+        return request
+
+    def select_columns(self, clause = None, fields = None, orderby = None, limit = None, after = None):
+        """
+        Retrieve a dictionary of NumPy arrays (one by field) of the records matching within the clause
+        (awaitable if the database is asynchronous), see 'select' for the parameters
+        The rows are read by batch from the database and converted into the type of each field (see DSField.dtype)
+        """
+        keyset, where = self.__request(clause, orderby, limit, after)
+        fields = self.projection(fields, keyset) or self.fields
+        columns = DSColumns(self, fields).set_user(self.user)
+        self.verbose(f"Selecting columns from the table '{self.__schema.name}.{self.name}' ...")
+        cursor = self.__schema.database.select(self.name, fields, where, True, keyset, limit)
+
+        if self.__schema.database.isasync:
+            async def read():
+                try:
+                    rows = await cursor.fetch()
+                    while len(rows) > 0:
+                        columns.append(rows)
+                        rows = await cursor.fetch()
+                finally:
+                    await cursor.close()
+                return columns.arrays
+            return read()
+
+        try:
+            rows = cursor.fetch()
+            while len(rows) > 0:
+                columns.append(rows)
+                rows = cursor.fetch()
+        finally:
+            cursor.close()
+        return columns.arrays
+
+    def metric(self, metric):
+        """Retrieve (function, fieldname) from the description of a metric (see DSTableDefinition.metric)"""
+        return self.__definition.metric(metric)
+
+    def aggregate(self, clause = None, groupby = None, metrics = None):
+        """
+        Retrieve the list of metrics computed by the database on the records matching within the clause
+        (awaitable if the database is asynchronous) :
+        * groupby : list of fields (or string separated by ',') grouping the records, a dictionary is retrieved by group
+        * metrics : list of metrics (or string separated by ','), e.g. 'count(*)', 'sum(Age)' (see 'metric')
+        Each dictionary contains the values of the fields grouping the records and the value of each metric
+        """
+        if isinstance(groupby, str):
+            groupby = groupby.split(",")
+        groupby = [self.__definition[name.strip()].name for name in groupby or [] if name.strip() != '']
+        if isinstance(metrics, str):
+            metrics = metrics.split(",")
+        metrics = [metric.strip() for metric in metrics or ["count(*)"] if metric.strip() != '']
+        functions = [self.metric(metric) for metric in metrics]
+        _, where = self.__request(clause, None, None, None)
+        self.verbose(f"Aggregating values from the table '{self.__schema.name}.{self.name}' ...")
+        rows = self.__schema.database.aggregate(self.name, groupby, functions, where)
+        names = groupby + metrics
+
+        if self.__schema.database.isasync:
+            async def read():
+                return [dict(zip(names, row)) for row in await rows]
+            return read()
+        return [dict(zip(names, row)) for row in rows]
+
+    def count(self, clause = None):
+        """Retrieve the number of records matching within the clause (awaitable if the database is asynchronous)"""
+        rows = self.aggregate(clause)
+        if self.__schema.database.isasync:
+            async def read():
+                return (await rows)[0]["count(*)"]
+            return read()
+        return rows[0]["count(*)"]
+
+    def bulk_insert(self, values, infile = None):
+        """
+        Insert a large list of records (records, dictionaries or tuples in the order of the fields) into the database
+        by chunks and retrieve the number of records inserted (see DSDatabaseMySQL.bulk_insert)
+        """
+        self.verbose(f"Inserting records by bulk into the table '{self.__schema.name}.{self.name}' ...")
+        self.__written()
+        return self.__schema.database.bulk_insert(self.name, self.fields, values, infile)
+
+    def __keycriteria(self, keys):
+        """Build the criteria selecting the records matching a list of keys"""
+        fields = [self.__definition[name] for name in self.key]
+        if len(fields) == 1:
+            if len(keys) == 1:
+                return DSCriteriaComparableEqual(fields[0], keys[0][0])
+            return DSCriteriaComparableIn(fields[0], [key[0] for key in keys])
+        criterias = [DSCriteriaLogicalAnd(*[DSCriteriaComparableEqual(field, value) for field, value in zip(fields, key)])
+                     for key in keys]
+        if len(criterias) == 1:
+            return criterias[0]
+        return DSCriteriaLogicalOr(*criterias)
+
+    @staticmethod
+    def __identity(key):
+        """
+        Retrieve the key of a record into the identity map (the strings are compared case insensitively
+        as by the database, see DSDatabaseMySQLQuery.upsertversions)
+        """
+        return tuple(value.lower() if isinstance(value, str) else value for value in key)
+
+    def get_many(self, keys):
+        """
+        Retrieve the list of records matching a list of keys (None if the record doesn't exist)
+        A key is a value or a tuple of values (in the order of the fields of the key).
+        The records already read by the current transaction are retrieved from the identity map of the schema,
+        the others are read by a single request. Awaitable if the database is asynchronous.
+        """
+        fields = [self.__definition[name] for name in self.key]
+        keys = [tuple(field.convert(value) for field, value in zip(fields, key if isinstance(key, (list, tuple)) else (key,)))
+                for key in keys]
+        identities = self.__schema.identities(self.name)
+        missing = {}
+        for key in keys:
+            if self.__identity(key) not in identities:
+                missing.setdefault(self.__identity(key), key)
+        missing = list(missing.values())
+
+        def store(record):
+            identities.setdefault(self.__identity(record[name] for name in self.key), record)
+
+        def result():
+            return [identities.get(self.__identity(key), None) for key in keys]
+
+        if self.__schema.database.isasync:
+            async def read():
+                if len(missing) > 0:
+                    async for record in self.select(lambda _: self.__keycriteria(missing)):
+                        store(record)
+                return result()
+            return read()
+
+        if len(missing) > 0:
+            for record in self.select(lambda _: self.__keycriteria(missing)):
+                store(record)
+        return result()
+
+    def get(self, *key):
+        """Retrieve the record matching the key (None if the record doesn't exist), see 'get_many'"""
+        records = self.get_many([key])
+        if self.__schema.database.isasync:
+            async def read():
+                return (await records)[0]
+            return read()
+        return records[0]
+
+    def upsert(self, values):
+        """
+        Insert one or many records into the database or update them if a record with the same key already exists
+        (a single request by batch of records)
+        """
+        if self.isverbose:
+            if isinstance(values, (tuple, list)):
+                self.verbose(f"Upserting {len(values)} records into the table '{self.__schema.name}.{self.name}' ...")
+            else:
+                self.verbose(f"Upserting a record into the table '{self.__schema.name}.{self.name}' ...")
+        self.__written()
+        return self.__schema.database.upsert(self.name, self.fields, values, self.key, self.rowversion)
 
     def update(self, oldvalues, newvalues):
-        """Update one or many records into the database"""
+        """
+        Update one or many records into the database (only the fields changed between the old and the new records)
+        Raise DSExceptionDatabaseConflict if the version of a record has changed since it was read
+        """
         if self.isverbose:
             if isinstance(oldvalues, (tuple, list)):
                 self.verbose(f"Updating {len(oldvalues)} records into the table '{self.__schema.name}.{self.name}' ...")
             else:
                 self.verbose(f"Updating a record into the table '{self.__schema.name}.{self.name}' ...")
-        return self.__schema.database.update(self.name, self.fields, oldvalues, newvalues)
+        self.__written()
+        return self.__schema.database.update(self.name, self.fields, oldvalues, newvalues, self.key, self.rowversion)
 
     def delete(self, values):
         """Delete one or many records into the database"""
@@ -103,20 +381,43 @@ class DSTable(DSLoggerObject):
                 self.verbose(f"Deleting {len(values)} records into the table '{self.__schema.name}.{self.name}' ...")
             else:
                 self.verbose(f"Deleting a record into the table '{self.__schema.name}.{self.name}' ...")
+        self.__written()
         return self.__schema.database.delete(self.name, self.key, values)
 
+    def update_where(self, clause, assignments):
+        """
+        Update all records matching the clause by a single request and retrieve the number of records updated
+        * assignments : dictionary of the new values by field
+        """
+        _, where = self.__request(clause, None, None, None)
+        assignments = {fieldname: self.__definition[fieldname].convert(value) for fieldname, value in assignments.items()}
+        self.verbose(f"Updating records into the table '{self.__schema.name}.{self.name}' ...")
+        self.__written()
+        return self.__schema.database.update_where(self.name, assignments, where, self.rowversion)
+
+    def delete_where(self, clause, chunk = None):
+        """
+        Delete all records matching the clause by a single request and retrieve the number of records deleted
+        * chunk : if defined, the records are deleted by requests of at most 'chunk' records,
+          the transaction is committed after each request to release the locks
+        """
+        _, where = self.__request(clause, None, None, None)
+        self.verbose(f"Deleting records from the table '{self.__schema.name}.{self.name}' ...")
+        self.__written()
+        return self.__schema.database.delete_where(self.name, where, chunk)
+
     def __getattr__(self, name):
-        return self.__fields[name]
+        return self.__definition[name]
 
     def __getitem__(self, name):
-        return self.__fields[name]
+        return self.__definition[name]
 
     def __iter__(self):
         if self.__cursor is not None:
             self.__cursor = None
             self.__iterator = None
 
-        self.__cursor = DSCursor(self, self.__schema.database.select(self.name, self.fields)).set_user(self.user)
+        self.__cursor = self.select()
         self.__iterator = iter(self.__cursor)
         return self
 
@@ -128,24 +429,16 @@ class DSTable(DSLoggerObject):
             self.__iterator = None
             raise
 
+    def __aiter__(self):
+        return self.select().__aiter__()
+
     def __init__(self, schema, tablename, description):
         super().__init__()
         self.__schema = schema
-        self.__name = tablename
-        self.__description = description['Description']
-        self.__key = description['Key']
+        self.__definition = description
+        if not isinstance(description, DSTableDefinition):
+            self.__definition = DSTableDefinition(tablename, description)
         self.__cursor = None
         self.__iterator = None
-        self.__fields = {}
-
-        if isinstance(self.__key, str):
-            self.__key = [self.__key]
-
-        fields = description['Fields']
-        for key in fields.keys():
-            # TODO: check if the fieldtype is only a word (use a factory)
-            fieldtype = fields[key].get('Type', 'String')
-            try:
-                self.__fields[key] = eval(f'DSField{fieldtype}')(self, key, fields[key])  # pylint: disable=eval-used
-            except:  # pylint: disable=bare-except
-                pass
+        self.__cache = None
+        self.__modified = False
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module handles a cache of the records selected from a table.
+"""
+
+import time
+import threading
+import collections
+
+from logger.loggerobject import DSLoggerObject
+
+from .database.databasecursor import DSDatabaseCursor
+
+class DSTableCache(DSLoggerObject):
+    """
+    This class handles a cache of the rows selected from a table, shared by all sessions of the process :
+      * TTL : number of seconds before forgetting a selection
+      * MaxRows : maximum number of rows kept (the least recently used selections are forgotten)
+    The cache is cleared on writing into the table.
+    """
+
+    TTL = 60
+    MAXROWS = 10000
+
+    class Cursor:
+        """This class records the rows read from a cursor and stores them into the cache at the end"""
+
+        @property
+        def fields(self):
+            """List of field names of the records"""
+            return self._cursor.fields
+
+        def fetch(self):
+            """Retrieve the next batch of rows not read yet (an empty list at the end of the selection)"""
+            rows = self._cursor.fetch()
+            self._record(rows)
+            return rows
+
+        def close(self):
+            """Close the cursor (the selection is not stored if it is not completely read)"""
+            self._rows = None
+            return self._cursor.close()
+
+        def _record(self, rows):
+            """Keep the rows read and store them into the cache at the end of the selection"""
+            if self._rows is None:
+                return
+            if len(rows) == 0:
+                self._cache.write(self._request, self._rows, self._version)
+                self._rows = None
+            else:
+                self._rows.extend(rows)
+
+        def __iter__(self):
+            return self
+
+        def __next__(self):
+            try:
+                row = next(self._cursor)
+            except StopIteration:
+                self._record([])
+                raise
+            self._record([row])
+            return row
+
+        def __init__(self, cache, request, cursor):
+            self._cache = cache
+            self._request = request
+            self._version = cache.version
+            self._cursor = cursor
+            self._rows = []
+
+    class AsyncCursor(Cursor):
+        """This class records the rows read from an asynchronous cursor and stores them into the cache at the end"""
+
+        async def fetch(self):  # pylint: disable=invalid-overridden-method
+            """Retrieve the next batch of rows not read yet (awaitable as the fetch of the asynchronous cursor)"""
+            rows = await self._cursor.fetch()
+            self._record(rows)
+            return rows
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            try:
+                row = await self._cursor.__anext__()
+            except StopAsyncIteration:
+                self._record([])
+                raise
+            self._record([row])
+            return row
+
+    __caches = {}
+    __lock = threading.Lock()
+
+    @classmethod
+    def get(cls, key, parameters):
+        """Retrieve the cache attached to a table (created on the first call)"""
+        with cls.__lock:
+            cache = cls.__caches.get(key, None)
+            if cache is None:
+                cache = DSTableCache(key, parameters)
+                cls.__caches[key] = cache
+            return cache
+
+    @property
+    def version(self):
+        """Number of times the cache has been cleared"""
+        return self.__version
+
+    def read(self, request):
+        """Retrieve the rows of a selection (None if the selection isn't into the cache)"""
+        with self.__mutex:
+            entry = self.__entries.get(request, None)
+            if entry is None:
+                return None
+            if time.monotonic() > entry[0]:
+                del self.__entries[request]
+                self.__size -= len(entry[1])
+                return None
+            self.__entries.move_to_end(request)
+        self.debug(f"{len(entry[1])} rows read from the cache of '{self.__name}'")
+        return entry[1]
+
+    def write(self, request, rows, version):
+        """Store the rows of a selection (ignored if the cache has been cleared since the selection started)"""
+        if len(rows) > self.__maxrows:
+            return
+        with self.__mutex:
+            if version != self.__version:
+                return
+            entry = self.__entries.pop(request, None)
+            if entry is not None:
+                self.__size -= len(entry[1])
+            self.__entries[request] = (time.monotonic() + self.__ttl, rows)
+            self.__size += len(rows)
+            while self.__size > self.__maxrows:
+                _, entry = self.__entries.popitem(last=False)
+                self.__size -= len(entry[1])
+        self.debug(f"{len(rows)} rows stored into the cache of '{self.__name}'")
+
+    def clear(self):
+        """Forget all selections"""
+        with self.__mutex:
+            self.__entries.clear()
+            self.__size = 0
+            self.__version += 1
+        self.debug(f"Cache of '{self.__name}' cleared")
+
+    def select(self, request, execute):
+        """Retrieve a cursor on the rows of a selection read from the cache or from the cursor given by execute()"""
+        rows = self.read(request)
+        if rows is not None:
+            return DSDatabaseCursor(DSDatabaseCursor.Rows(rows), self.__name, request[0])
+        cursor = execute()
+        if hasattr(cursor, '__aiter__'):
+            return DSTableCache.AsyncCursor(self, request, cursor)
+        return DSTableCache.Cursor(self, request, cursor)
+
+    def __init__(self, key, parameters):
+        super().__init__()
+        self.__name = ".".join([str(item) for item in key])
+        self.__ttl = parameters.get('TTL', self.TTL)
+        self.__maxrows = parameters.get('MaxRows', self.MAXROWS)
+        self.__mutex = threading.Lock()
+        self.__entries = collections.OrderedDict()
+        self.__size = 0
+        self.__version = 0
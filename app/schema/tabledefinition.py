@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module handles the description of a table.
+"""
+
+import re
+
+from .record import DSRecord
+
+from .field.fieldfactory import factory as fieldfactory
+
+class DSTableDefinition:
+    """
+    This class handles the description of a table (fields, key, indexes, ...), built once by schema description
+    and shared read-only by all sessions and tenants using it (see DSSchemaDefinition).
+    The records of the table are attached to its description.
+    """
+
+    AGGREGATES = ('count', 'sum', 'min', 'max', 'avg')
+
+    def to_dict(self):
+        """Convert the table to a json (built once, mustn't be modified)"""
+        if self.__dict is not None:
+            return self.__dict
+        fields = {}
+        for key, value in self.__fields.items():
+            fields[key] = value.to_dict()
+        table = {
+                'Name': self.name,
+                'Description': self.description,
+                'Fields': fields,
+                'Key': self.key
+            }
+        if len(self.__indexes) > 0:
+            table['Indexes'] = self.__indexes
+        if self.__rowversion is not None:
+            table['RowVersion'] = self.__rowversion
+        if self.__cacheparameters is not None:
+            table['Cache'] = self.__cacheparameters
+        self.__dict = table
+        return table
+
+    @property
+    def name(self):
+        """Name of the table"""
+        return self.__name
+
+    @property
+    def description(self):
+        """Description of the table"""
+        return self.__description
+
+    @property
+    def key(self):
+        """Name of the field key of the table"""
+        return self.__key
+
+    @property
+    def indexes(self):
+        """
+        Dictionary of the secondary indexes of the table by name :
+        'Fields' (list of fields), 'Unique' and 'Lengths' (length of the prefix indexed by string field, if defined)
+        """
+        return self.__indexes
+
+    @property
+    def rowversion(self):
+        """Name of the field incremented on each update to detect concurrent modifications (None if not defined)"""
+        return self.__rowversion
+
+    @property
+    def cacheparameters(self):
+        """Parameters of the cache of the selections (None if the table isn't cached, see DSTableCache)"""
+        return self.__cacheparameters
+
+    @property
+    def fields(self):
+        """List of field name"""
+        return self.__fieldnames
+
+    def recordclass(self, fields = None):
+        """Retrieve the record class of the table (only the given fields if defined), generated on the first call"""
+        key = None if fields is None else tuple(fields)
+        recordclass = self.__recordclasses.get(key, None)
+        if recordclass is None:
+            recordclass = DSRecord.generate(self, key)
+            self.__recordclasses[key] = recordclass
+        return recordclass
+
+    def new(self, value = None, fields = None):
+        """Create a new record from the current table (a partial record if the list of fields is defined)"""
+        recordclass = self.recordclass(fields)
+        if isinstance(value, (list, tuple)):
+            return recordclass(values=value)
+        record = recordclass()
+        if isinstance(value, dict):
+            for fieldname in recordclass._fields:  # pylint: disable=protected-access
+                if fieldname in value:
+                    record[fieldname] = value[fieldname]
+
+        return record
+
+    def keyset(self, orderby = None):
+        """
+        Retrieve the list of (fieldname, descending) sorting the records in a unique order :
+        the fields of 'orderby' (list or string separated by ',', '-' before the name for a descending order)
+        followed by the fields of the key
+        """
+        if isinstance(orderby, str):
+            orderby = orderby.split(",")
+        keyset = []
+        for name in orderby or []:
+            name = name.strip()
+            if name == '':
+                continue
+            descending = name.startswith('-')
+            name = name.lstrip('+-')
+            field = self.__fields[name]
+            if all(name != fieldname for fieldname, _ in keyset):
+                keyset.append((field.name, descending))
+        for name in self.key:
+            if all(name != fieldname for fieldname, _ in keyset):
+                keyset.append((name, False))
+        return keyset
+
+    def position(self, record, orderby = None):
+        """Retrieve the values of the keyset of a record (see 'after' into DSTable.select)"""
+        return [record[name] for name, _ in self.keyset(orderby)]
+
+    def projection(self, fields = None, keyset = None):
+        """
+        Retrieve the list of fields read by a selection (list or string separated by ',', all fields if None)
+        The fields of the keyset are added to retrieve the position of the records
+        """
+        if fields is None:
+            return None
+        if isinstance(fields, str):
+            fields = fields.split(",")
+        projection = []
+        for name in fields:
+            name = name.strip()
+            if name != '' and name not in projection:
+                projection.append(self.__fields[name].name)
+        for name, _ in keyset or []:
+            if name not in projection:
+                projection.append(name)
+        return projection
+
+    def metric(self, metric):
+        """
+        Retrieve (function, fieldname) from the description of a metric 'function(fieldname)' or 'count(*)'
+        (fieldname is None for '*'), the functions are 'count', 'sum', 'min', 'max' and 'avg'
+        """
+        match = re.fullmatch(r"\s*(\w+)\s*\(\s*(\*|\w+)\s*\)\s*", metric)
+        if match is None or match.group(1).lower() not in self.AGGREGATES:
+            raise ValueError(f"Metric '{metric}' unknown")
+        function, fieldname = match.group(1).lower(), match.group(2)
+        if fieldname == '*':
+            if function != 'count':
+                raise ValueError(f"Metric '{metric}' unknown")
+            return function, None
+        return function, self.__fields[fieldname].name
+
+    def __getattr__(self, name):
+        return self.__fields[name]
+
+    def __getitem__(self, name):
+        return self.__fields[name]
+
+    def __init__(self, tablename, description):
+        self.__name = tablename
+        self.__description = description['Description']
+        self.__key = description['Key']
+        self.__rowversion = description.get('RowVersion', None)
+        self.__cacheparameters = description.get('Cache', None)
+        self.__fields = {}
+        self.__recordclasses = {}
+        self.__dict = None
+
+        if isinstance(self.__key, str):
+            self.__key = [self.__key]
+
+        fields = description['Fields']
+        for key in fields.keys():
+            self.__fields[key] = fieldfactory(self, key, fields[key])
+
+        self.__fieldnames = tuple(self.__fields.keys())
+
+        self.__indexes = {}
+        indexes = description.get('Indexes', None) or {}
+        for indexname in indexes.keys():
+            index = indexes[indexname]
+            fieldnames = index['Fields']
+            if isinstance(fieldnames, str):
+                fieldnames = fieldnames.split(",")
+            self.__indexes[indexname] = {
+                'Fields': [self.__fields[fieldname.strip()].name for fieldname in fieldnames],
+                'Unique': bool(index.get('Unique', False))
+                }
+            lengths = index.get('Lengths', None)
+            if lengths:
+                self.__indexes[indexname]['Lengths'] = {self.__fields[fieldname].name: int(lengths[fieldname])
+                                                        for fieldname in lengths.keys()}
@@ -7,14 +7,21 @@ This module handles the configuration of the current application.
 
 import inspect
 import os
-import yaml
 
+from configuration.configurationcache import DSConfigurationCache
 from configuration.configurationitem import DSConfigurationItem
+from configuration.configurationlazyitems import DSConfigurationLazyItems
 
 class DSConfiguration:
-    """This class stores the configuration of the current application"""
+    """
+    This class stores the configuration of the current application
+    The root item 'lazy' lists the items whose sub items are loaded on first access (e.g. 'clients') :
+    * maxsize : maximum number of sub items kept into memory (the least recently used are reloaded on the next access)
+    * preload : list of sub items loaded at startup
+    """
 
     EMPTY = None
+    LAZY = "lazy"
 
     @property
     def items(self):
@@ -42,11 +49,12 @@ class DSConfiguration:
         return DSConfiguration.EMPTY
 
     def to_dict(self):
-        """Retrieve the configuration items without evaluation"""
-        return self.__configuration
+        """Retrieve the configuration items without evaluation (the items loaded on first access aren't loaded)"""
+        return {key: value.sources if isinstance(value, DSConfigurationLazyItems) else value
+                for key, value in self.__configuration.items()}
 
-    def _load(self, filename, items = None, root = './'):
-        """Load a yaml file and the sub files if needed"""
+    def _load(self, filename, items = None, root = './', lazy = False):
+        """Load a yaml file and the sub files if needed (the root items listed into 'lazy' are loaded on first access)"""
         if filename is not None:
             items = filename
 
@@ -54,12 +62,21 @@ class DSConfiguration:
             if not os.path.exists(root + items):
                 return items
             filename = root + items
-            with open(filename, 'r', encoding="utf-8") as file:
-                subitems = self._load(None, yaml.safe_load(file), os.path.dirname(filename) + '/')
+            subitems = self._load(None, DSConfigurationCache.load(filename), os.path.dirname(filename) + '/', lazy)
             if subitems is None:
                 return {}
             return subitems
 
+        if isinstance(items, dict) and lazy:
+            parameters = items.get(self.LAZY, None) or {}
+            newitems = {}
+            for key, value in items.items():
+                if key in parameters:
+                    newitems[key] = self._load_lazy(value, root, parameters[key] or {})
+                else:
+                    newitems[key] = self._load(None, value, root)
+            return newitems
+
         if isinstance(items, list):
             newitems = []
             for value in items:
@@ -74,8 +91,35 @@ class DSConfiguration:
 
         return items
 
+    def _load_lazy(self, items, root, parameters):
+        """Read the list of sub items of an item without loading them (see DSConfigurationLazyItems)"""
+        if isinstance(items, str) and os.path.exists(root + items):
+            filename = root + items
+            items = DSConfigurationCache.load(filename)
+            root = os.path.dirname(filename) + '/'
+        if not isinstance(items, dict):
+            return self._load(None, items, root)
+
+        def load(value):
+            value = self._load(None, value, root)
+            if isinstance(value, dict):
+                return DSConfigurationItem(self, value)
+            return value
+
+        lazyitems = DSConfigurationLazyItems(items, load, parameters.get('maxsize', DSConfigurationLazyItems.MAXSIZE))
+        lazyitems.preload(parameters.get('preload', None))
+        return lazyitems
+
     def _get_content_file(self, filename):
-        """Load a content text file into a string"""
+        """Load a content text file into a string (read once)"""
+        content = self.__contents.get(filename, None)
+        if content is None:
+            content = self._read_content_file(filename)
+            self.__contents[filename] = content
+        return content
+
+    def _read_content_file(self, filename):
+        """Read a content text file into a string"""
         module_path = os.path.dirname(inspect.getfile(self.__class__))
         if not os.path.exists(module_path + "/" + filename):
             module_path += "/.."
@@ -92,7 +136,8 @@ class DSConfiguration:
         return self.__items.get(key, default_value)
 
     def __init__(self, filename = None):
+        self.__contents = {}
         self.__configuration = {}
         if filename is not None:
-            self.__configuration = self._load(filename)
+            self.__configuration = self._load(filename, lazy=True)
         self.__items = DSConfigurationItem(self, self.__configuration)
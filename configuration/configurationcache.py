@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=bare-except
+
+"""
+This module handles the cache of the YAML files parsed.
+"""
+
+import os
+import pickle
+import hashlib
+import yaml
+
+class DSConfigurationCache:
+    """
+    This class keeps the content of each YAML file parsed into a binary file (as Python does for a module)
+    '__pycache__/<file>.pickle' next to the file, to avoid parsing it again on the next start :
+      * the cache of a file is used while the modification time and the size of the file are unchanged
+      * the cache is ignored if it has been written by another version of the cache or of PyYAML
+      * the cache is written into the directory PSCONFIG_CACHE if this environment variable is defined
+        (e.g. if the configuration is mounted read-only)
+      * the cache isn't written if its directory is read-only (the directory isn't tried again)
+    Only the content of the files is cached, the configuration items and the schemas are built on each start.
+    The files are parsed by the C YAML loader if PyYAML is built with LibYAML.
+    """
+
+    VERSION = 1
+    ENABLED = True
+    DIRECTORY = "__pycache__"
+    EXTENSION = ".pickle"
+    ENVIRONMENT = "PSCONFIG_CACHE"
+
+    LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+    __readonly = set()
+
+    @classmethod
+    def cachename(cls, filename):
+        """Retrieve the name of the cache of a file"""
+        directory = os.getenv(cls.ENVIRONMENT, None)
+        if not directory:
+            return os.path.join(os.path.dirname(filename), cls.DIRECTORY, os.path.basename(filename) + cls.EXTENSION)
+        # the files of all directories share the same cache directory
+        path = hashlib.sha1(os.path.dirname(os.path.abspath(filename)).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(directory, f"{os.path.basename(filename)}.{path}{cls.EXTENSION}")
+
+    @classmethod
+    def __signature(cls, filename):
+        """Retrieve the signature of a file (the cache is used if the signature is unchanged)"""
+        status = os.stat(filename)
+        return (cls.VERSION, yaml.__version__, status.st_mtime_ns, status.st_size)
+
+    @classmethod
+    def __read(cls, filename, signature):
+        """Read the content of a file from its cache (raise KeyError if the cache doesn't match the file)"""
+        with open(cls.cachename(filename), 'rb') as file:
+            cachesignature, content = pickle.load(file)
+        if cachesignature != signature:
+            raise KeyError(filename)
+        return content
+
+    @classmethod
+    def __write(cls, filename, signature, content):
+        """Write the content of a file into its cache (replaced atomically, ignored on failure)"""
+        cachename = cls.cachename(filename)
+        directory = os.path.dirname(cachename)
+        if directory in cls.__readonly:
+            return
+        temporary = f"{cachename}.{os.getpid()}"
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except:
+            cls.__readonly.add(directory)
+            return
+        try:
+            with open(temporary, 'wb') as file:
+                pickle.dump((signature, content), file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, cachename)
+        except:
+            if not os.access(directory, os.W_OK):
+                cls.__readonly.add(directory)
+            try:
+                os.remove(temporary)
+            except:
+                pass
+
+    @classmethod
+    def load(cls, filename):
+        """Retrieve the content of a YAML file (from its cache if it's up to date)"""
+        if not cls.ENABLED:
+            with open(filename, 'r', encoding="utf-8") as file:
+                return yaml.load(file, Loader=cls.LOADER)
+
+        signature = cls.__signature(filename)
+        try:
+            return cls.__read(filename, signature)
+        except:
+            pass
+        with open(filename, 'r', encoding="utf-8") as file:
+            content = yaml.load(file, Loader=cls.LOADER)
+        cls.__write(filename, signature, content)
+        return content
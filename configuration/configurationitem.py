@@ -9,6 +9,8 @@ import re
 import os
 import datetime
 
+from configuration.configurationlazyitems import DSConfigurationLazyItems
+
 class DSConfigurationItem:
     """This class describes a generic item from a part of configuration"""
 
@@ -16,6 +18,8 @@ class DSConfigurationItem:
     MAX_CHANGES = 5
     MASK_HIDDEN = "*"
 
+    __MISSING = object()
+
     @property
     def root(self):
         """Retrieve the configuration root"""
@@ -26,12 +30,20 @@ class DSConfigurationItem:
         """Retrieve the current configuration items"""
         return self.__items
 
+    @property
+    def islazy(self):
+        """Return if the sub items are loaded on first access (see DSConfigurationLazyItems)"""
+        return isinstance(self.__items, DSConfigurationLazyItems)
+
     def keys(self):
         """Retrieve the current configuration keys"""
         return self.__items.keys()
 
     def to_dict(self):
-        """Convert the item to a dict"""
+        """Convert the item to a dict (the sub items loaded on first access are described by their sources)"""
+        if self.islazy:
+            return self.__items.sources
+
         def subitem(item):
             items = []
             for value in item:
@@ -40,7 +52,7 @@ class DSConfigurationItem:
                 elif isinstance(value, DSConfigurationItem):
                     items.append(value.to_dict())
                 else:
-                    items.append(self.__evaluate(value))
+                    items.append(self.__evaluate(value)[0])
             return items
 
         items = {}
@@ -51,21 +63,34 @@ class DSConfigurationItem:
                 elif isinstance(value, DSConfigurationItem):
                     items[key] = value.to_dict()
                 else:
-                    items[key] = self.__evaluate(value)
+                    items[key] = self.__value(key)
         return items
 
     def __getattr__(self, name):
         if name in self.__items:
-            return self.__evaluate(self.__items[name])
+            return self.__value(name)
         raise KeyError(f"Field '{name}' not found in record.")
 
     def __getitem__(self, name):
         if name in self.__items:
-            return self.__evaluate(self.__items[name])
+            return self.__value(name)
         raise KeyError(f"Field '{name}' not found in record.")
 
+    def __value(self, name):
+        """
+        Retrieve the evaluated value of an item
+        (memoized unless it depends on the current date or it is loaded on first access)
+        """
+        value = self.__values.get(name, self.__MISSING)
+        if value is self.__MISSING:
+            value, volatile = self.__evaluate(self.__items[name])
+            if not volatile and not self.islazy:
+                self.__values[name] = value
+        return value
+
     def __evaluate(self, value):
-        """This function replaces the substitution strings into a field from the configuration.
+        """This function replaces the substitution strings into a field from the configuration
+        and retrieves (value, volatile), volatile is True if the value depends on the current date.
 
         The format of this kind of string is '${KEY}' or '${KEY?DefaultValue}
 
@@ -84,7 +109,11 @@ class DSConfigurationItem:
             dont l'alias a la même valeur que le nom de l'environnement
         """
 
+        volatile = False
+
         def replace_key(match):
+            nonlocal volatile
+
             key = match.group(1)
             default_value = ""
             if "?" in key:
@@ -107,6 +136,7 @@ class DSConfigurationItem:
                     pass
                 return value
             if key.startswith("date:"):
+                volatile = True
                 try:
                     value = datetime.datetime.now().strftime(key[5:])
                 except:
@@ -116,10 +146,12 @@ class DSConfigurationItem:
             # Check existing the configuration item
 
             if key[0] == '.':
-                value = self.root.get(key[1:])
+                # The root item is also a DSConfigurationItem (a public method would hide a key named 'resolve')
+                value, dependency = self.root.items.__resolve(key[1:])  # pylint: disable=protected-access
             else:
-                value = self.get(key)
-            if value is not None:
+                value, dependency = self.__resolve(key)
+            volatile = volatile or dependency
+            if value is not None and value is not self.__MISSING:
                 return value
 
             # Check environment variable
@@ -130,7 +162,7 @@ class DSConfigurationItem:
             return value
 
         if not isinstance(value, str):
-            return value
+            return value, False
 
         # on autorise jusqu'à 5 référence de référence
         # Exemple de référence de référence : ${parameters.${environment.name}.value}
@@ -147,7 +179,7 @@ class DSConfigurationItem:
             # ignore l'exception et retourne la valeur dans l'état où elle est ...
             pass
 
-        return value
+        return value, volatile
 
     def get(self, key, default_value = None):
         """
@@ -156,8 +188,37 @@ class DSConfigurationItem:
         """
         if key is None:
             return default_value
+        value, _ = self.__resolve(key)
+        if value is self.__MISSING:
+            return default_value
+        return value
+
+    def __resolve(self, key):
+        """
+        Retrieve (value, volatile) from a path of a value from the current item (see __evaluate),
+        the evaluated values of the paths are memoized unless they depend on the current date
+        or they go through sub items loaded on first access (kept by their own item)
+        """
+        value = self.__paths.get(key, self.__MISSING)
+        if value is not self.__MISSING:
+            return value, False
+        item, lazy = self.__walk(key)
+        if item is self.__MISSING:
+            return item, False
+        value, volatile = self.__evaluate(item)
+        if not volatile and not lazy:
+            self.__paths[key] = value
+        return value, volatile
+
+    def __walk(self, key):
+        """
+        Retrieve (item, lazy) described by a path from the current item (__MISSING if the path doesn't exist),
+        lazy is True if the path goes through sub items loaded on first access
+        """
         item = self
+        lazy = False
         for itemkey in key.split('.'):
+            lazy = lazy or (isinstance(item, DSConfigurationItem) and item.islazy)
             try:
                 item = item.items[itemkey]
             except:
@@ -166,15 +227,15 @@ class DSConfigurationItem:
                         try:
                             item = item.items[itemkey]
                         except:
-                            return default_value
+                            return self.__MISSING, lazy
                     else:
                         if itemkey[-1] != ']':
-                            return default_value
+                            return self.__MISSING, lazy
                         try:
                             item = item[int(itemkey[:-1])]
                         except:
-                            return default_value
-        return self.__evaluate(item)
+                            return self.__MISSING, lazy
+        return item, lazy
 
     def __init__(self, root, item):
         def subitem(root, item):
@@ -189,13 +250,20 @@ class DSConfigurationItem:
             return items
 
         self.__dict__["_DSConfigurationItem__root"] = root
+        self.__dict__["_DSConfigurationItem__values"] = {}
+        self.__dict__["_DSConfigurationItem__paths"] = {}
+        if isinstance(item, DSConfigurationLazyItems):
+            self.__dict__["_DSConfigurationItem__items"] = item
+            self.__dict__["_DSConfigurationItem__masks"] = []
+            return
+
         items = {}
         masks = []
         for key, value in item.items():
             if key.endswith(self.MASK_HIDDEN):
                 key = key[0:-len(self.MASK_HIDDEN)]
                 masks.append(key)
-            if isinstance(value, dict):
+            if isinstance(value, (dict, DSConfigurationLazyItems)):
                 items[key] = DSConfigurationItem(root, value)
             elif isinstance(value, (list, tuple)):
                 items[key] = subitem(root, value)
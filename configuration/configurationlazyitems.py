@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module handles the sub items of a configuration item loaded on first access.
+"""
+
+import threading
+import collections
+import collections.abc
+
+class DSConfigurationLazyItems(collections.abc.Mapping):
+    """
+    This class handles the sub items of a configuration item (e.g. the clients) loaded on first access :
+      * the sources describe each sub item (a file name or a dictionary) and are read without being loaded
+      * at most 'maxsize' sub items are kept, the least recently used are forgotten and reloaded on the next access
+    """
+
+    MAXSIZE = 1024
+
+    @property
+    def sources(self):
+        """Retrieve the description of the sub items (not loaded)"""
+        return dict(self.__sources)
+
+    @property
+    def loaded(self):
+        """Retrieve the list of keys of the sub items currently loaded"""
+        with self.__lock:
+            return list(self.__items.keys())
+
+    def preload(self, keys):
+        """Load a list of sub items (the unknown keys are ignored)"""
+        for key in keys or []:
+            if key in self.__sources:
+                _ = self[key]
+
+    def __getitem__(self, key):
+        with self.__lock:
+            item = self.__items.get(key, None)
+            if item is not None:
+                self.__items.move_to_end(key)
+                return item
+        item = self.__loader(self.__sources[key])
+        with self.__lock:
+            self.__items[key] = item
+            self.__items.move_to_end(key)
+            while len(self.__items) > self.__maxsize:
+                self.__items.popitem(last=False)
+        return item
+
+    def __contains__(self, key):
+        return key in self.__sources
+
+    def __iter__(self):
+        return iter(self.__sources)
+
+    def __len__(self):
+        return len(self.__sources)
+
+    def __init__(self, sources, loader, maxsize = MAXSIZE):
+        self.__sources = dict(sources or {})
+        self.__loader = loader
+        self.__maxsize = max(1, int(maxsize))
+        self.__lock = threading.Lock()
+        self.__items = collections.OrderedDict()
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module describes a database exception on updating a record modified by another session.
+"""
+
+from exception.exceptiondatabaserequest import DSExceptionDatabaseRequest
+
+class DSExceptionDatabaseConflict(DSExceptionDatabaseRequest):
+    """Database exception on updating a record whose version has changed since it was read"""
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module describes an exception on describing a field with an unknown type.
+"""
+
+from exception.exception import DSException
+
+class DSExceptionFieldTypeUnknown(DSException):
+    """Exception on describing a field whose type isn't declared (see fieldfactory.FIELDTYPES)"""
@@ -5,36 +5,47 @@ API - Functions API Rest to get access data
 """
 
 import json
+import functools
 
-from fastapi import FastAPI, Depends, HTTPException, Security
+from fastapi import FastAPI, Depends, HTTPException, Query, Security
+from fastapi.responses import Response, StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 
 from logger.logger import DSLogger
 from logger.loggerobject import asyncloggerexecutiontime
 
-from interface.schemas import DSSchemas
+from interface.schemas import DSSchemas, resolve, lifespan, continuation_token, continuation_position
 from interface.authentication import new_token, decrypt_user
 
+from app.schema.columns import DSColumns
 from app.schema.criteria.criteriafactory import factory as criteriafactory
 
 class RequestAPI:
     """Class containing properties of an API Request"""
-    def __init__(self, client, application, table, newrecord, oldrecord, query):
+    def __init__(self, client, application, table, newrecord, oldrecord, query,
+                 orderby = None, limit = None, after = None, fields = None):
         self.client = client
         self.application = application
         self.table = table
         self.newrecord = newrecord
         self.oldrecord = oldrecord
         self.query = query
+        self.orderby = orderby
+        self.limit = limit
+        self.after = after
+        self.fields = fields
 
 # Handle the API routes
 
 app = FastAPI(title=DSLogger.Instance.project,
               description="API Interface - Getting service access",
-              version=DSLogger.Instance.version)
+              version=DSLogger.Instance.version,
+              lifespan=lifespan)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
 
+STREAM_CHUNK_SIZE = 65536
+
 def decrypt_user_api(token = Security(oauth2_scheme)):
     """
     Retrieve user profile from api interface
@@ -43,43 +54,150 @@ def decrypt_user_api(token = Security(oauth2_scheme)):
                         None,
                         DSSchemas().configuration.items.interface.api)
 
+def convert(schema, table, value):
+    """Convert a json (a record or a list of records) into records of the table"""
+    dsrecord = None
+    if value is not None:
+        items = json.loads(value)
+        if isinstance(items, (list, tuple)):
+            dsrecord = []
+            for item in items:
+                dsrecord.append(schema[table].new(item))
+        else:
+            dsrecord = schema[table].new(items)
+    return dsrecord
+
 def query_string_api(application: str = None,
                      table: str = None,
                      newrecord: str = None,
                      oldrecord: str = None,
                      query: str = None,
+                     orderby: str = None,
+                     limit: int = Query(None, ge=1),
+                     after: str = None,
+                     fields: str = None,
                      user = Depends(decrypt_user_api)):
     """
     Retrieve parameter of the api interface
     """
-    def convert(schema, value):
-        dsrecord = None
-        if value is not None:
-            items = json.loads(value)
-            if isinstance(items, (list, tuple)):
-                dsrecord = []
-                for item in items:
-                    dsrecord.append(schema[table].new(item))
-            else:
-                dsrecord = schema[table].new(items)
-        return dsrecord
-
-    if query is not None:
-        query = json.loads(query)
-
     if (user["client"] is None) != (application is None):
         raise HTTPException(status_code=405, detail="Not allowed !")
 
-    with DSSchemas().get_session(user["client"], application) as schema:
-        dsoldrecord = convert(schema, oldrecord)
-        dsnewrecord = convert(schema, newrecord)
+    try:
+        after = continuation_position(after)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    schema = DSSchemas().definition(user["client"], application)
+    if schema is None:
+        raise HTTPException(status_code=404, detail="Application unknown")
+    if table is not None and table not in schema.tables:
+        raise HTTPException(status_code=404, detail="Table unknown")
+    if query is not None:
+        # the criteria is checked before the response is started (the records are streamed)
+        try:
+            query = json.loads(query)
+            criteriafactory(query, schema[table])
+        except KeyError as exc:
+            raise HTTPException(status_code=400, detail=f"Field {exc} unknown") from exc
+        except (IndexError, TypeError, ValueError) as exc:
+            raise HTTPException(status_code=400, detail="Query invalid") from exc
+    dsoldrecord = convert(schema, table, oldrecord)
+    dsnewrecord = convert(schema, table, newrecord)
+    if orderby is not None or after is not None or fields is not None:
+        try:
+            keyset = schema[table].keyset(orderby)
+            fields = schema[table].projection(fields)
+        except KeyError as exc:
+            raise HTTPException(status_code=400, detail=f"Field {exc} unknown") from exc
+        if after is not None and len(after) != len(keyset):
+            raise HTTPException(status_code=400, detail="The continuation token doesn't match the order")
 
     return RequestAPI(user["client"],
                       application,
                       table,
                       dsnewrecord,
                       dsoldrecord,
-                      query)
+                      query,
+                      orderby,
+                      limit,
+                      after,
+                      fields)
+
+def criteria(request):
+    """Retrieve the function building the criteria of the request on a table (None if the request has no query)"""
+    if request.query is None:
+        return None
+    return functools.partial(criteriafactory, request.query)
+
+async def select_records(request, page):
+    """
+    Read the records selected by the request while the response is sent
+    (the session is kept until the last record is read)
+    At the end, page['next'] contains the continuation token of the next page if the page is full
+    """
+    with DSSchemas().get_session(request.client, request.application) as schema:
+        async with schema:
+            table = schema[request.table]
+            clause = criteria(request)
+            cursor = table.select(clause, stream=True, orderby=request.orderby, limit=request.limit, after=request.after,
+                                  fields=request.fields)
+            try:
+                count = 0
+                last = None
+                async for record in cursor:
+                    count += 1
+                    last = record
+                    yield record.to_dict()
+                if request.limit is not None and count >= request.limit:
+                    page['next'] = continuation_token(table.position(last, request.orderby))
+            finally:
+                await resolve(cursor.close())
+
+async def select_columns(request):
+    """Read the records selected by the request into one list of values by field"""
+    with DSSchemas().get_session(request.client, request.application) as schema:
+        async with schema:
+            table = schema[request.table]
+            clause = criteria(request)
+            columns = await resolve(table.select_columns(clause, request.fields, request.orderby,
+                                                         request.limit, request.after))
+    token = None
+    size = min((len(column) for column in columns.values()), default=0)
+    if request.limit is not None and size >= request.limit:
+        last = {name: DSColumns.item(column, -1) for name, column in columns.items()}
+        token = continuation_token(table.position(last, request.orderby))
+    return json.dumps({"columns": {name: column.tolist() for name, column in columns.items()},
+                       "next": token},
+                      default=str)
+
+async def stream_json(records, page):
+    """Convert the records into a JSON document '{"table": [...], "next": ...}' sent by chunks"""
+    chunk = '{"table": ['
+    separator = ""
+    async for record in records:
+        chunk += separator + json.dumps(record, default=str)
+        separator = ", "
+        if len(chunk) >= STREAM_CHUNK_SIZE:
+            yield chunk
+            chunk = ""
+    yield chunk + '], "next": ' + json.dumps(page.get('next', None)) + '}'
+
+async def stream_ndjson(records, page):
+    """
+    Convert the records into a NDJSON document (one record by line) sent by chunks
+    If the page is full, the last line is '{"next": ...}'
+    """
+    chunk = ""
+    async for record in records:
+        chunk += json.dumps(record, default=str) + "\n"
+        if len(chunk) >= STREAM_CHUNK_SIZE:
+            yield chunk
+            chunk = ""
+    if page.get('next', None) is not None:
+        chunk += json.dumps({'next': page['next']}) + "\n"
+    if chunk != "":
+        yield chunk
 
 # --------------------------------------
 # API handles the CRUD into the database
@@ -91,10 +209,10 @@ async def get_token(form: OAuth2PasswordRequestForm = Depends()):
     """
     Generate a new token for a given user
     """
-    return new_token(DSSchemas.Interface.API.value,
-                     form.username,
-                     form.password,
-                     DSSchemas().configuration.items.interface.api)
+    return await new_token(DSSchemas.Interface.API.value,
+                           form.username,
+                           form.password,
+                           DSSchemas().configuration.items.interface.api)
 
 @app.get("/profil")
 @asyncloggerexecutiontime
@@ -111,51 +229,129 @@ async def get_profil(user = Depends(decrypt_user_api)):
 @app.post("/schema/{table}/")
 @app.post("/{application}/schema/{table}/")
 @asyncloggerexecutiontime
-async def insert(request = Depends(query_string_api)):
+async def insert(request = Depends(query_string_api), mode: str = None):
     """
     Create a new record into an administration table :
     * oldrecord is ignored
+    * mode : 'upsert' updates the records already existing with the same key
     """
+    if mode == "upsert":
+        return await upsert(request)
+    if mode is not None:
+        raise HTTPException(status_code=400, detail=f"Mode '{mode}' unknown")
     with DSSchemas().get_session(request.client, request.application) as schema:
-        with schema:
-            newrecord = schema[request.table].insert(request.newrecord)
-            schema.commit()
+        async with schema:
+            newrecord = await resolve(schema[request.table].insert(request.newrecord))
+            await resolve(schema.commit())
+    return newrecord.to_dict()
+
+@app.patch("/schema/{table}/")
+@app.patch("/{application}/schema/{table}/")
+@asyncloggerexecutiontime
+async def upsert(request = Depends(query_string_api)):
+    """
+    Create or update one or many records into an administration table (by a single request by batch of records) :
+    * newrecord contains a record or a list of records, a record having the key of an existing record replaces it
+    * oldrecord is ignored
+    """
+    with DSSchemas().get_session(request.client, request.application) as schema:
+        async with schema:
+            newrecord = await resolve(schema[request.table].upsert(request.newrecord))
+            await resolve(schema.commit())
+    if isinstance(newrecord, (list, tuple)):
+        return [record.to_dict() for record in newrecord]
     return newrecord.to_dict()
 
 @app.get("/schema/{table}/")
 @app.get("/{application}/schema/{table}/")
 @asyncloggerexecutiontime
-async def select(request = Depends(query_string_api)):
+async def select(request = Depends(query_string_api),
+                 output: str = Query("json", alias="format")):
     """
     Select a list of records from an administration table
     * query : describes a filter on the list of records 
-    
+    * format : 'json' (default) retrieves '{"table": [...], "next": ...}', 'ndjson' retrieves one record by line,
+      'columnar' retrieves '{"columns": {"field": [...], ...}, "next": ...}' (one list of values by field)
+    * orderby : list of fields separated by ',' sorting the records ('-' before the name for a descending order)
+    * limit : maximum number of records into the page
+    * after : continuation token ('next') retrieved by the previous page
+    * fields : list of fields separated by ',' retrieved by record (all fields by default)
+
     Example : ['=', 'Name', 'Tutu'] => List of records having 'Name' = 'Tutu'
+
+    The records are sent while they are read from the database.
+    'next' is null if the page is the last one, else the next page is retrieved with 'after' = 'next'.
+    """
+    page = {}
+    if output == "json":
+        return StreamingResponse(stream_json(select_records(request, page), page), media_type="application/json")
+    if output == "ndjson":
+        return StreamingResponse(stream_ndjson(select_records(request, page), page), media_type="application/x-ndjson")
+    if output == "columnar":
+        return Response(await select_columns(request), media_type="application/json")
+    raise HTTPException(status_code=400, detail=f"Format '{output}' unknown")
+
+@app.get("/schema/{table}/aggregate")
+@app.get("/{application}/schema/{table}/aggregate")
+@asyncloggerexecutiontime
+async def aggregate(request = Depends(query_string_api), groupby: str = None, metrics: str = "count(*)"):
+    """
+    Compute metrics on the records of an administration table
+    * query : describes a filter on the list of records (see select)
+    * groupby : list of fields separated by ',' grouping the records
+    * metrics : list of metrics separated by ',' ('count(*)' by default), e.g. 'count(*),sum(Age),max(Age)'
+
+    Retrieve '{"table": [{"Field": ..., "count(*)": ...}, ...]}' (one item by group)
     """
     with DSSchemas().get_session(request.client, request.application) as schema:
-        records = []
-        with schema:
-            if request.query is None:
-                for record in schema[request.table]:
-                    records.append(record.to_dict())
-            else:
-                for record in schema[request.table].select(lambda t: criteriafactory(request.query, t)):
-                    records.append(record.to_dict())
-        return { "table": records }
+        async with schema:
+            clause = criteria(request)
+            try:
+                rows = await resolve(schema[request.table].aggregate(clause, groupby, metrics))
+            except KeyError as exc:
+                raise HTTPException(status_code=400, detail=f"Field {exc} unknown") from exc
+            except ValueError as exc:
+                raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"table": rows}
 
 @app.put("/schema/{table}/")
 @app.put("/{application}/schema/{table}/")
 @asyncloggerexecutiontime
-async def update(request = Depends(query_string_api)):
+async def update(request = Depends(query_string_api), assignments: str = None):
     """
     Update an existing record within a new record into an administration table
     * oldrecord has to match the record to update
     * newrecord has to contain the fields to update
+
+    Or update all records matching the query by a single request :
+    * query : describes a filter on the list of records (see select)
+    * assignments : dictionary of the new values by field (e.g. {"Name": "Tutu"})
+    Retrieve '{"count": number of records updated}'
     """
+    if request.query is not None:
+        if assignments is None:
+            raise HTTPException(status_code=400, detail="Assignments missing")
+        try:
+            assignments = json.loads(assignments)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail="Assignments invalid") from exc
+        if not isinstance(assignments, dict):
+            raise HTTPException(status_code=400, detail="Assignments invalid")
+        with DSSchemas().get_session(request.client, request.application) as schema:
+            async with schema:
+                try:
+                    count = await resolve(schema[request.table].update_where(criteria(request), assignments))
+                except KeyError as exc:
+                    raise HTTPException(status_code=400, detail=f"Field {exc} unknown") from exc
+                except (TypeError, ValueError) as exc:
+                    raise HTTPException(status_code=400, detail=str(exc)) from exc
+                await resolve(schema.commit())
+        return {"count": count}
+
     with DSSchemas().get_session(request.client, request.application) as schema:
-        with schema:
-            newrecordupdated = schema[request.table].update(request.oldrecord, request.newrecord)
-            schema.commit()
+        async with schema:
+            newrecordupdated = await resolve(schema[request.table].update(request.oldrecord, request.newrecord))
+            await resolve(schema.commit())
     if newrecordupdated is None:
         raise HTTPException(status_code=404, detail="Key missing")
     return newrecordupdated.to_dict()
@@ -163,12 +359,24 @@ async def update(request = Depends(query_string_api)):
 @app.delete("/schema/{table}/")
 @app.delete("/{application}/schema/{table}/")
 @asyncloggerexecutiontime
-async def delete(request = Depends(query_string_api)):
+async def delete(request = Depends(query_string_api), chunk: int = Query(None, ge=1)):
     """
     Delete an existing record from an administration table
+
+    Or delete all records matching the query by a single request :
+    * query : describes a filter on the list of records (see select)
+    * chunk : if defined, the records are deleted by requests of at most 'chunk' records (each one committed)
+    Retrieve '{"count": number of records deleted}'
     """
+    if request.query is not None:
+        with DSSchemas().get_session(request.client, request.application) as schema:
+            async with schema:
+                count = await resolve(schema[request.table].delete_where(criteria(request), chunk))
+                await resolve(schema.commit())
+        return {"count": count}
+
     with DSSchemas().get_session(request.client, request.application) as schema:
-        with schema:
-            oldrecord = schema[request.table].delete(request.oldrecord)
-            schema.commit()
+        async with schema:
+            oldrecord = await resolve(schema[request.table].delete(request.oldrecord))
+            await resolve(schema.commit())
     return oldrecord.to_dict()
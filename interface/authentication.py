@@ -10,7 +10,7 @@ import hashlib
 import jwt
 from fastapi import HTTPException
 
-from interface.schemas import DSSchemas
+from interface.schemas import DSSchemas, resolve
 
 # Handle the authentification user
 # ---------------------------------
@@ -22,12 +22,13 @@ def create_access_token(data, configuration):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, configuration.jwt.secret_key, algorithm=configuration.jwt.algorithm)
 
-def new_token(interface, username, password, configuration):
+async def new_token(interface, username, password, configuration):
     """Generate a token to a given user"""
     with DSSchemas().get_session() as schema:
-        with schema:
-            users = list(schema.User.select(lambda record : (record.Interface == interface) &
-                                                            (record.Login == username)))
+        async with schema:
+            users = [user async for user in schema.User.select(lambda record : (record.Interface == interface) &
+                                                                                (record.Login == username),
+                                                               fields=["Password", "ClientId"])]
             if len(users) == 0:
                 raise HTTPException(status_code=400, detail="Invalid username or password")
 
@@ -39,9 +40,10 @@ def new_token(interface, username, password, configuration):
                 raise HTTPException(status_code=400, detail="Invalid username or password")
 
             client = None
-            clients = list(schema.Client.select(lambda record : record.Id == users[0].ClientId))
-            if len(clients) > 0:
-                client = clients[0].Name
+            if users[0].ClientId is not None:
+                record = await resolve(schema.Client.get(users[0].ClientId))
+                if record is not None:
+                    client = record.Name
 
             return {
                 "access_token": create_access_token({
@@ -5,14 +5,71 @@
 This module stores the schemas and the database session
 """
 
+import json
+import base64
+import inspect
+import threading
+import contextlib
+import collections
 from enum import Enum
 
 from configuration.configuration import DSConfiguration
+from configuration.configurationlazyitems import DSConfigurationLazyItems
 from logger.logger import DSLogger
 from logger.loggerobject import DSLoggerObject
 
+from app.schema.database.databaseasyncmysql import DSDatabaseAsyncMySQL
 from app.schema.database.databasefactory import factory as databasefactory
+from app.schema.database.databasemysqlpool import DSDatabaseMySQLPool
 from app.schema.schema import DSSchema
+from app.schema.schemadefinition import DSSchemaDefinition
+
+async def resolve(value):
+    """Await the value returned by a schema if the database is asynchronous"""
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+@contextlib.asynccontextmanager
+async def lifespan(_app):
+    """Lifespan of an interface (FastAPI application) : the asynchronous pools are closed on shutdown"""
+    yield
+    await DSSchemas().shutdown()
+
+def continuation_token(position):
+    """Convert the position of the last record read (see DSTable.position) into a token given to the client"""
+    if position is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(position, default=str).encode('utf-8')).decode('ascii')
+
+def continuation_position(token):
+    """Convert a token given by the client into the position of the last record read (ValueError if invalid)"""
+    if token is None or token == "":
+        return None
+    try:
+        position = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+    except Exception as exc:
+        raise ValueError(f"The continuation token '{token}' is invalid") from exc
+    if not isinstance(position, list) or \
+       any(isinstance(value, bool) or not isinstance(value, (str, int, float)) for value in position):
+        raise ValueError(f"The continuation token '{token}' is invalid")
+    return position
+
+async def select_page(table, orderby = None, limit = None, after = None):
+    """
+    Read a page of records from a table (see DSTable.select)
+    and retrieve the list of records and the continuation token of the next page (None if it's the last page)
+    """
+    records = []
+    last = None
+    cursor = table.select(orderby=orderby, limit=limit, after=continuation_position(after))
+    async for record in cursor:
+        records.append(record.to_dict())
+        last = record
+    token = None
+    if limit is not None and len(records) >= limit:
+        token = continuation_token(table.position(last, orderby))
+    return records, token
 
 class DSSchemas:
     """
@@ -37,7 +94,11 @@ class DSSchemas:
             self.__session = session
 
     class Sessions(DSLoggerObject):
-        """Store the list of sessions by name"""
+        """
+        Store the list of sessions by name
+        At most 'maxsize' schemas (definitions and sessions) are kept, as the clients loaded (see 'lazy.clients.maxsize'),
+        the least recently used are forgotten and built again on the next access
+        """
 
         @property
         def configuration(self):
@@ -58,8 +119,15 @@ class DSSchemas:
                 self.__log.open()
             self.info("Schemas opened")
 
-        def get_session(self, client = None, application = None):
-            """Return a schema instance ready to get access to the database"""
+        @property
+        def maxsize(self):
+            """Maximum number of schemas kept into memory (see DSConfigurationLazyItems)"""
+            return max(1, int(self.configuration.items.get(f"{DSConfiguration.LAZY}.clients.maxsize", None) or
+                              DSConfigurationLazyItems.MAXSIZE))
+
+        @staticmethod
+        def __name(client, application):
+            """Retrieve the name of the sessions of a schema ('client.application' or '' for the main schema)"""
             name = ""
             if not client is None:
                 name = client
@@ -67,28 +135,78 @@ class DSSchemas:
                 name += "."
             if not application is None:
                 name += application
+            return name
 
-            self.debug(f"Getting a session '{name}' ...")
+        def __used(self, client, application):
+            """The schema is used : it becomes the most recently used one (the lock must be held)"""
+            if (client, application) in self.__definitions:
+                self.__definitions.move_to_end((client, application))
 
-            if not name in self.__schemas:
-                self.__schemas[name] = []
+        def __evict(self):
+            """Forget the least recently used schemas and their sessions beyond 'maxsize' (the lock must be held)"""
+            maxsize = self.maxsize
+            while len(self.__definitions) > maxsize:
+                (client, application), _ = self.__definitions.popitem(last=False)
+                name = self.__name(client, application)
+                self.__schemas.pop(name, None)
+                self.__schemas_availables.pop(name, None)
+                self.debug(f"Schema '{name}' forgotten")
 
-            if not name in self.__schemas_availables:
-                self.__schemas_availables[name] = []
+        def tenants(self):
+            """Retrieve the list of (client, application) declared into the configuration"""
+            clients = self.configuration.items.get("clients", None)
+            tenants = []
+            for client in clients.keys() if clients is not None else []:
+                applications = clients.get(f"{client}.applications", None)
+                for application in applications.keys() if applications is not None else []:
+                    tenants.append((client, application))
+            return tenants
 
-            if len(self.__schemas_availables[name]) > 0:
-                self.info(f"Session '{name}' recycled")
-                return DSSchemas.Session(name, self.__schemas_availables[name].pop())
+        def definition(self, client = None, application = None):
+            """
+            Retrieve the description of a schema shared by all sessions (None if unknown, see DSSchemaDefinition),
+            the metadata (tables, fields, records) are available without database session
+            """
+            with self.__lock:
+                definition = self.__definitions.get((client, application), None)
+                self.__used(client, application)
+            if definition is not None:
+                return definition
 
-            database = None
             schema = None
+            if client is None and application is None:
+                schema = self.configuration.items.main.schema
+            elif client is not None and application is not None:
+                schema = self.configuration.items.clients.get(f"{client}.applications.{application}.schema", None)
+            if schema is None:
+                return None
+
+            definition = DSSchemaDefinition.get(schema)
+            with self.__lock:
+                self.__definitions[(client, application)] = definition
+                self.__evict()
+            return definition
+
+        def get_session(self, client = None, application = None):
+            """Return a schema instance ready to get access to the database"""
+            name = self.__name(client, application)
+
+            self.debug(f"Getting a session '{name}' ...")
+
+            with self.__lock:
+                self.__used(client, application)
+                availables = self.__schemas_availables.get(name, None)
+                if availables:
+                    self.info(f"Session '{name}' recycled")
+                    return DSSchemas.Session(name, availables.pop())
+
+            database = None
+            schema = self.definition(client, application)
 
             if client is None and application is None:
                 database = self.configuration.items.main.database
-                schema = self.configuration.items.main.schema
             elif client is not None and application is not None:
                 database = self.configuration.items.clients.get(f"{client}.applications.{application}.database", None)
-                schema = self.configuration.items.clients.get(f"{client}.applications.{application}.schema", None)
 
             if database is None or schema is None:
                 self.info(f"Session '{name}' unknown")
@@ -101,17 +219,27 @@ class DSSchemas:
 
             self.info(f"Session '{name}' created")
 
-            self.__schemas[name].append(newschema)
+            with self.__lock:
+                if (client, application) in self.__definitions:
+                    self.__schemas.setdefault(name, []).append(newschema)
+                    self.__schemas_availables.setdefault(name, [])
             return DSSchemas.Session(name, newschema)
 
         def release_session(self, name, session):
             """Release a session and set it as free for a new session"""
-            if name in self.__schemas and session is not None:
-                self.info(f"Session '{name}' released")
-                self.__schemas_availables[name].append(session)
+            with self.__lock:
+                if name in self.__schemas and session is not None:
+                    self.info(f"Session '{name}' released")
+                    self.__schemas_availables[name].append(session)
+
+        async def shutdown(self):
+            """Close the pools of asynchronous connexions (has to be awaited into the event loop using them)"""
+            await DSDatabaseAsyncMySQL.close_all()
+            self.info("Asynchronous pools closed")
 
         def close(self):
             """Close schemas"""
+            DSDatabaseMySQLPool.close_all()
             if self.__log is not None:
                 self.__log.close()
             self.info("Schemas closed")
@@ -120,8 +248,10 @@ class DSSchemas:
             super().__init__()
             self.__configuration = None
             self.__log = None
+            self.__lock = threading.Lock()
             self.__schemas = {}
             self.__schemas_availables = {}
+            self.__definitions = collections.OrderedDict()
 
     __instance = None
 
@@ -16,18 +16,15 @@ from fastapi.staticfiles import StaticFiles
 from logger.logger import DSLogger
 from logger.loggerobject import asyncloggerexecutiontime
 
-from interface.schemas import DSSchemas
+from interface.schemas import DSSchemas, resolve, lifespan, select_page
 from interface.authentication import new_token, decrypt_user
 
-from app.schema.criteria.criteriacomparableequal import DSCriteriaComparableEqual
-from app.schema.criteria.criterialogicaland import DSCriteriaLogicalAnd
-from app.schema.criteria.criteriafactory import factory as criteriafactory
-
 # Handle the API routes
 
 app = FastAPI(title=DSLogger.Instance.project,
               description="Web Interface - Getting HTML pages",
-              version=DSLogger.Instance.version)
+              version=DSLogger.Instance.version,
+              lifespan=lifespan)
 
 def decrypt_user_web(access_token = Cookie(None)):
     """
@@ -39,6 +36,17 @@ def decrypt_user_web(access_token = Cookie(None)):
                         access_token,
                         DSSchemas().configuration.items.interface.web)
 
+def convert_form(table, form):
+    """
+    Convert the values of a form (strings) into a record of the table (the values are converted into the type
+    of their field, so that only the fields really changed are updated)
+    """
+    try:
+        return table.new({name: table[name].convert(value) if name in table.fields else value
+                          for name, value in form.items()})
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
 # ---------------
 # Templates files
 # ---------------
@@ -79,10 +87,10 @@ async def post_login(username = Form(...),
                      password = Form(...),
                      redirect_to = Form("/")):
     """Commit the authentication of the user"""
-    access_token = new_token(DSSchemas.Interface.WEB.value,
-                             username,
-                             password,
-                             DSSchemas().configuration.items.interface.web)
+    access_token = await new_token(DSSchemas.Interface.WEB.value,
+                                   username,
+                                   password,
+                                   DSSchemas().configuration.items.interface.web)
     response = RedirectResponse(url=redirect_to, status_code=303)
     response.set_cookie(key="access_token", value=f"Bearer {access_token['access_token']}", httponly=True)
     return response
@@ -137,17 +145,17 @@ async def get_application(application : str,
                                                          DSSchemas().configuration.empty.items)
     application_context = client.get(f"applications.{application}", DSSchemas().configuration.empty.items)
 
-    with DSSchemas().get_session(user["client"], application) as schema:
-        return templates.TemplateResponse("client/application/index.html",
-                                          {
-                                              "request": request,
-                                              "user": user,
-                                              "projet": DSSchemas().configuration.project,
-                                              "version": DSSchemas().configuration.version,
-                                              "client": client.to_dict(),
-                                              "application": application_context.to_dict(),
-                                              "schema": schema.to_dict()
-                                          })
+    schema = DSSchemas().definition(user["client"], application)
+    return templates.TemplateResponse("client/application/index.html",
+                                      {
+                                          "request": request,
+                                          "user": user,
+                                          "projet": DSSchemas().configuration.project,
+                                          "version": DSSchemas().configuration.version,
+                                          "client": client.to_dict(),
+                                          "application": application_context.to_dict(),
+                                          "schema": schema.to_dict()
+                                      })
 
 @app.get("/{application}/insert/{table}", response_class=HTMLResponse)
 @asyncloggerexecutiontime
@@ -163,18 +171,18 @@ async def get_table_insert(application : str,
                                                          DSSchemas().configuration.empty.items)
     application_context = client.get(f"applications.{application}", DSSchemas().configuration.empty.items)
 
-    with DSSchemas().get_session(user["client"], application) as schema:
-        return templates.TemplateResponse("client/application/insert.html",
-                                          {
-                                              "request": request,
-                                              "user": user,
-                                              "projet": DSSchemas().configuration.project,
-                                              "version": DSSchemas().configuration.version,
-                                              "client": client.to_dict(),
-                                              "application": application_context.to_dict(),
-                                              "schema": schema.to_dict(),
-                                              "table": schema[table].to_dict()
-                                          })
+    schema = DSSchemas().definition(user["client"], application)
+    return templates.TemplateResponse("client/application/insert.html",
+                                      {
+                                          "request": request,
+                                          "user": user,
+                                          "projet": DSSchemas().configuration.project,
+                                          "version": DSSchemas().configuration.version,
+                                          "client": client.to_dict(),
+                                          "application": application_context.to_dict(),
+                                          "schema": schema.to_dict(),
+                                          "table": schema[table].to_dict()
+                                      })
 
 @app.post("/{application}/insert/{table}", response_class=HTMLResponse)
 @asyncloggerexecutiontime
@@ -187,9 +195,9 @@ async def post_table_insert(application : str,
         raise HTTPException(status_code=400, detail="Not authenticated")
     record = await request.form()
     with DSSchemas().get_session(user["client"], application) as schema:
-        with schema:
-            schema[table].insert(schema[table].new(dict(record)))
-            schema.commit()
+        async with schema:
+            await resolve(schema[table].insert(schema[table].new(dict(record))))
+            await resolve(schema.commit())
     return RedirectResponse(url=f"/{application}/select/{table}", status_code=303)
 
 @app.get("/{application}/select/{table}", response_class=HTMLResponse)
@@ -197,8 +205,11 @@ async def post_table_insert(application : str,
 async def get_table_select(application : str,
                            table : str,
                            request : Request,
+                           orderby : str = None,
+                           limit : int = Query(None, ge=1),
+                           after : str = None,
                            user = Depends(decrypt_user_web)):
-    """Access to the page showing the list of records"""
+    """Access to the page showing the list of records (a page of 'limit' records following 'after')"""
     if user is None:
         return RedirectResponse(url=f"/login?redirect_to={request.url}", status_code=303)
 
@@ -207,10 +218,12 @@ async def get_table_select(application : str,
     application_context = client.get(f"applications.{application}", DSSchemas().configuration.empty.items)
 
     with DSSchemas().get_session(user["client"], application) as schema:
-        records = []
-        with schema:
-            for record in schema[table]:
-                records.append(record.to_dict())
+        async with schema:
+            try:
+                records, token = await select_page(schema[table], orderby, limit, after)
+            except (KeyError, ValueError) as exc:
+                raise HTTPException(status_code=400, detail=str(exc)) from exc
+        nextpage = None if token is None else str(request.url.include_query_params(after=token))
         return templates.TemplateResponse("client/application/select.html",
                                           {
                                               "request": request,
@@ -221,7 +234,8 @@ async def get_table_select(application : str,
                                               "application": application_context.to_dict(),
                                               "schema": schema.to_dict(),
                                               "table": schema[table].to_dict(),
-                                              "records": records
+                                              "records": records,
+                                              "next": nextpage
                                           })
 
 @app.get("/{application}/update/{table}/{keys}", response_class=HTMLResponse)
@@ -240,16 +254,10 @@ async def get_table_update(application : str,
     application_context = client.get(f"applications.{application}", DSSchemas().configuration.empty.items)
 
     with DSSchemas().get_session(user["client"], application) as schema:
-        records = []
-        with schema:
-            clause = [DSCriteriaLogicalAnd.SIGN,
-                      [
-                          [DSCriteriaComparableEqual.SIGN, key, value]
-                          for key, value in zip(schema[table].key, keys.split(","))
-                          ]
-                      ]
-            for record in schema[table].select(lambda t : criteriafactory(clause, t)):
-                records.append(record.to_dict())
+        async with schema:
+            record = await resolve(schema[table].get(*keys.split(",")))
+        if record is None:
+            raise HTTPException(status_code=404, detail="Record not found")
         return templates.TemplateResponse("client/application/update.html",
                                           {
                                               "request": request,
@@ -260,7 +268,7 @@ async def get_table_update(application : str,
                                               "application": application_context.to_dict(),
                                               "schema": schema.to_dict(),
                                               "table": schema[table].to_dict(),
-                                              "record": records[0],
+                                              "record": record.to_dict(),
                                               "keys": keys
                                           })
 
@@ -275,19 +283,13 @@ async def post_table_update(application : str,
     if user is None:
         raise HTTPException(status_code=400, detail="Not authenticated")
     newrecord = await request.form()
-    records = []
     with DSSchemas().get_session(user["client"], application) as schema:
-        with schema:
-            clause = [DSCriteriaLogicalAnd.SIGN,
-                      [
-                          [DSCriteriaComparableEqual.SIGN, key, value]
-                          for key, value in zip(schema[table].key, keys.split(","))
-                          ]
-                      ]
-            for oldrecord in schema[table].select(lambda t : criteriafactory(clause, t)):
-                records.append(oldrecord.clone())
-            schema[table].update(records[0], schema[table].new(dict(newrecord)))
-            schema.commit()
+        async with schema:
+            oldrecord = await resolve(schema[table].get(*keys.split(",")))
+            if oldrecord is None:
+                raise HTTPException(status_code=404, detail="Record not found")
+            await resolve(schema[table].update(oldrecord, convert_form(schema[table], newrecord)))
+            await resolve(schema.commit())
     return RedirectResponse(url=f"/{application}/select/{table}", status_code=303)
 
 @app.get("/{application}/delete/{table}/{keys}", response_class=HTMLResponse)
@@ -306,16 +308,10 @@ async def get_table_delete(application : str,
     application_context = client.get(f"applications.{application}", DSSchemas().configuration.empty.items)
 
     with DSSchemas().get_session(user["client"], application) as schema:
-        records = []
-        with schema:
-            clause = [DSCriteriaLogicalAnd.SIGN,
-                      [
-                          [DSCriteriaComparableEqual.SIGN, key, value]
-                          for key, value in zip(schema[table].key, keys.split(","))
-                          ]
-                      ]
-            for record in schema[table].select(lambda t : criteriafactory(clause, t)):
-                records.append(record.to_dict())
+        async with schema:
+            record = await resolve(schema[table].get(*keys.split(",")))
+        if record is None:
+            raise HTTPException(status_code=404, detail="Record not found")
         return templates.TemplateResponse("client/application/delete.html",
                                           {
                                               "request": request,
@@ -326,7 +322,7 @@ async def get_table_delete(application : str,
                                               "application": application_context.to_dict(),
                                               "schema": schema.to_dict(),
                                               "table": schema[table].to_dict(),
-                                              "record": records[0],
+                                              "record": record.to_dict(),
                                               "keys": keys
                                           })
 
@@ -342,9 +338,9 @@ async def post_table_delete(application : str,
         raise HTTPException(status_code=400, detail="Not authenticated")
     record = await request.form()
     with DSSchemas().get_session(user["client"], application) as schema:
-        with schema:
-            schema[table].delete(schema[table].new(dict(record)))
-            schema.commit()
+        async with schema:
+            await resolve(schema[table].delete(schema[table].new(dict(record))))
+            await resolve(schema.commit())
     return RedirectResponse(url=f"/{application}/select/{table}", status_code=303)
 
 @app.get("/chat", response_class=HTMLResponse)
@@ -394,25 +390,30 @@ async def post_admin_table_insert(table : str,
         raise HTTPException(status_code=400, detail="Not authenticated")
     record = await request.form()
     with DSSchemas().get_session() as schema:
-        with schema:
-            schema[table].insert(schema[table].new(dict(record)))
-            schema.commit()
+        async with schema:
+            await resolve(schema[table].insert(schema[table].new(dict(record))))
+            await resolve(schema.commit())
     return RedirectResponse(url=f"/select/{table}", status_code=303)
 
 @app.get("/select/{table}", response_class=HTMLResponse)
 @asyncloggerexecutiontime
 async def get_admin_table_select(table : str,
                            request : Request,
+                           orderby : str = None,
+                           limit : int = Query(None, ge=1),
+                           after : str = None,
                            user = Depends(decrypt_user_web)):
-    """Access to the page showing the list of records"""
+    """Access to the page showing the list of records (a page of 'limit' records following 'after')"""
     if user is None:
         return RedirectResponse(url=f"/login?redirect_to={request.url}", status_code=303)
 
     with DSSchemas().get_session() as schema:
-        records = []
-        with schema:
-            for record in schema[table]:
-                records.append(record.to_dict())
+        async with schema:
+            try:
+                records, token = await select_page(schema[table], orderby, limit, after)
+            except (KeyError, ValueError) as exc:
+                raise HTTPException(status_code=400, detail=str(exc)) from exc
+        nextpage = None if token is None else str(request.url.include_query_params(after=token))
         return templates.TemplateResponse("main/select.html",
                                           {
                                               "request": request,
@@ -421,7 +422,8 @@ async def get_admin_table_select(table : str,
                                               "version": DSSchemas().configuration.version,
                                               "schema": schema.to_dict(),
                                               "table": schema[table].to_dict(),
-                                              "records": records
+                                              "records": records,
+                                              "next": nextpage
                                           })
 
 @app.get("/update/{table}/{keys}", response_class=HTMLResponse)
@@ -435,16 +437,10 @@ async def get_admin_table_update(table : str,
         return RedirectResponse(url=f"/login?redirect_to={request.url}", status_code=303)
 
     with DSSchemas().get_session() as schema:
-        records = []
-        with schema:
-            clause = [DSCriteriaLogicalAnd.SIGN,
-                      [
-                          [DSCriteriaComparableEqual.SIGN, key, value]
-                          for key, value in zip(schema[table].key, keys.split(","))
-                          ]
-                      ]
-            for record in schema[table].select(lambda t : criteriafactory(clause, t)):
-                records.append(record.to_dict())
+        async with schema:
+            record = await resolve(schema[table].get(*keys.split(",")))
+        if record is None:
+            raise HTTPException(status_code=404, detail="Record not found")
         return templates.TemplateResponse("main/update.html",
                                           {
                                               "request": request,
@@ -453,7 +449,7 @@ async def get_admin_table_update(table : str,
                                               "version": DSSchemas().configuration.version,
                                               "schema": schema.to_dict(),
                                               "table": schema[table].to_dict(),
-                                              "record": records[0],
+                                              "record": record.to_dict(),
                                               "keys": keys
                                           })
 
@@ -467,19 +463,13 @@ async def post_admin_table_update(table : str,
     if user is None:
         raise HTTPException(status_code=400, detail="Not authenticated")
     newrecord = await request.form()
-    records = []
     with DSSchemas().get_session() as schema:
-        with schema:
-            clause = [DSCriteriaLogicalAnd.SIGN,
-                      [
-                          [DSCriteriaComparableEqual.SIGN, key, value]
-                          for key, value in zip(schema[table].key, keys.split(","))
-                          ]
-                      ]
-            for oldrecord in schema[table].select(lambda t : criteriafactory(clause, t)):
-                records.append(oldrecord.clone())
-            schema[table].update(records[0], schema[table].new(dict(newrecord)))
-            schema.commit()
+        async with schema:
+            oldrecord = await resolve(schema[table].get(*keys.split(",")))
+            if oldrecord is None:
+                raise HTTPException(status_code=404, detail="Record not found")
+            await resolve(schema[table].update(oldrecord, convert_form(schema[table], newrecord)))
+            await resolve(schema.commit())
     return RedirectResponse(url=f"/select/{table}", status_code=303)
 
 @app.get("/delete/{table}/{keys}", response_class=HTMLResponse)
@@ -493,16 +483,10 @@ async def get_admin_table_delete(table : str,
         return RedirectResponse(url=f"/login?redirect_to={request.url}", status_code=303)
 
     with DSSchemas().get_session() as schema:
-        records = []
-        with schema:
-            clause = [DSCriteriaLogicalAnd.SIGN,
-                      [
-                          [DSCriteriaComparableEqual.SIGN, key, value]
-                          for key, value in zip(schema[table].key, keys.split(","))
-                          ]
-                      ]
-            for record in schema[table].select(lambda t : criteriafactory(clause, t)):
-                records.append(record.to_dict())
+        async with schema:
+            record = await resolve(schema[table].get(*keys.split(",")))
+        if record is None:
+            raise HTTPException(status_code=404, detail="Record not found")
         return templates.TemplateResponse("main/delete.html",
                                           {
                                               "request": request,
@@ -511,7 +495,7 @@ async def get_admin_table_delete(table : str,
                                               "version": DSSchemas().configuration.version,
                                               "schema": schema.to_dict(),
                                               "table": schema[table].to_dict(),
-                                              "record": records[0],
+                                              "record": record.to_dict(),
                                               "keys": keys
                                           })
 
@@ -526,7 +510,7 @@ async def post_admin_table_delete(table : str,
         raise HTTPException(status_code=400, detail="Not authenticated")
     record = await request.form()
     with DSSchemas().get_session() as schema:
-        with schema:
-            schema[table].delete(schema[table].new(dict(record)))
-            schema.commit()
+        async with schema:
+            await resolve(schema[table].delete(schema[table].new(dict(record))))
+            await resolve(schema.commit())
     return RedirectResponse(url=f"/select/{table}", status_code=303)
@@ -13,14 +13,15 @@ from fastapi import FastAPI, Depends, WebSocketDisconnect, Cookie
 from logger.logger import DSLogger
 from logger.loggerobject import asyncloggerexecutiontime
 
-from interface.schemas import DSSchemas
+from interface.schemas import DSSchemas, lifespan, select_page
 from interface.authentication import decrypt_user
 
 # Handle the API routes
 
 app = FastAPI(title=DSLogger.Instance.project,
               description="WebSocket Interface - Permanently connection between server and client application",
-              version=DSLogger.Instance.version)
+              version=DSLogger.Instance.version,
+              lifespan=lifespan)
 
 def decrypt_user_web(access_token = Cookie(None)):
     """
@@ -45,33 +46,33 @@ async def websocket_service_message(websocket, user, message):
                 "message": f"{user['sub']}: {message}"
             }
         }
-        await connection.send_text(json.dumps(data))
+        await connection.send_text(json.dumps(data, default=str))
 
 async def websocket_service_schema(websocket, user, application):
     """Send the current schema"""
-    with DSSchemas().get_session(user["client"], application) as schema:
-        data = {
-            "action": "schema",
-            "parameters" : {
-                "schema": schema.to_dict()
-            }
+    data = {
+        "action": "schema",
+        "parameters" : {
+            "schema": DSSchemas().definition(user["client"], application).to_dict()
         }
-    await websocket.send_text(json.dumps(data))
+    }
+    await websocket.send_text(json.dumps(data, default=str))
 
-async def websocket_service_table(websocket, user, application, table):
-    """Send records from a table"""
+async def websocket_service_table(websocket, user, application, table, orderby = None, limit = None, after = None):
+    """Send records from a table (a page of 'limit' records following 'after' if limit is defined)"""
     with DSSchemas().get_session(user["client"], application) as schema:
-        with schema:
-            records = [record.to_dict() for record in schema[table]]
+        async with schema:
+            records, token = await select_page(schema[table], orderby, limit, after)
 
     data = {
         "action": "table",
         "parameters" : {
             "table": table,
-            "records" : records
+            "records" : records,
+            "next": token
         }
     }
-    await websocket.send_text(json.dumps(data))
+    await websocket.send_text(json.dumps(data, default=str))
 
 # ------------------
 # WebSocket handling
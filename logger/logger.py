@@ -6,6 +6,7 @@ This module handles the logger.
 """
 
 import os
+import atexit
 import glob
 import datetime
 import threading
@@ -16,15 +17,25 @@ import logging
 import logging.config
 
 from .loggertimer import DSLoggerTimer
+from .loggerqueue import DSLoggerQueue
 
 def format_message(user, klass, module, level, message):
     """This function formats the message before writing into the log file"""
+    if '\n' not in message:
+        if message.strip() == '':
+            return []
+        if level is not None:
+            return [f"{user} - {module}.{klass} : ({level}) {message}"]
+        return [f"{user} - {module}.{klass} : {message}"]
     if level is not None:
         return [f"{user} - {module}.{klass} : ({level}) {line}" for line in message.split('\n') if line.strip() != '']
     return [f"{user} - {module}.{klass} : {line}" for line in message.split('\n') if line.strip() != '']
 
 class DSLogger:
-    """This class handles a common logger for the application"""
+    """
+    This class handles a common logger for the application
+    If 'logging.syncytium.queue' is defined, the records are written into the handlers by a thread (see DSLoggerQueue)
+    """
 
     class DSLoggerHandler(logging.Handler):
         """Customerized handler written logs from FastAPI to DSLogger."""
@@ -59,6 +70,41 @@ class DSLogger:
             logger.addHandler(handler)
             logger.setLevel(logging.INFO)
 
+    def __start_queue(self):
+        """Move the handlers of the root logger behind a queue written by a thread (if the queue is configured)"""
+        parameters = self.__configuration.items.get('logging.syncytium.queue', None)
+        if parameters is None or self.__queue is not None:
+            return
+        handlers = list(self.__logger.handlers)
+        self.__queue = DSLoggerQueue(handlers,
+                                     parameters.get('maxsize', DSLoggerQueue.MAXSIZE),
+                                     parameters.get('overflow', DSLoggerQueue.DROP),
+                                     parameters.get('batchsize', DSLoggerQueue.BATCHSIZE)).start()
+        for handler in handlers:
+            self.__logger.removeHandler(handler)
+        self.__logger.addHandler(self.__queue)
+
+    def detach(self):
+        """
+        Write the records waiting into the queue and give back the handlers to the root logger
+        (the logger is replaced or the application exits)
+        """
+        queue = self.__queue
+        if queue is None:
+            return
+        self.__queue = None
+        self.__logger.removeHandler(queue)
+        queue.stop()
+        for handler in queue.handlers:
+            self.__logger.addHandler(handler)
+
+    @property
+    def handlers(self):
+        """List of handlers writing the records (behind the queue if it is configured)"""
+        if self.__queue is not None:
+            return self.__queue.handlers
+        return self.__logger.handlers
+
     def __writeconfiguration(self):
         """This function writes the items of the current configuration into the log file"""
         def writeconfigurationitem(root, items):
@@ -124,7 +170,7 @@ class DSLogger:
             try:
                 change = False
 
-                for handler in self.__logger.handlers:
+                for handler in self.handlers:
                     if isinstance(handler, logging.FileHandler):
                         if not handler.name in self.__files:
                             continue
@@ -140,7 +186,9 @@ class DSLogger:
                 self.__logger.info("Reloading configuration due to a new filename ...")
                 self.__logger.info("----------------------------------------------")
 
+                self.detach()
                 logging.config.dictConfig(self.__configuration.items.logging.to_dict())
+                self.__start_queue()
                 self.__setup_logging()
 
                 self.__logger.info("----------------------------------------------")
@@ -178,75 +226,73 @@ class DSLogger:
             self.__cleanup_timer.stop()
         self.__logger.info("Close the log file")
         self.__logger.info("----------------------------------------------")
+        self.detach()
+
+    def __write(self, write, lines):
+        """Write the lines of a message, the lines of a message aren't mixed with the lines of another one"""
+        if len(lines) <= 1:
+            for line in lines:
+                write(line)
+            return
+        with self.__lock:
+            for line in lines:
+                write(line)
 
     def verbose(self, user, klass, module, message):
         """This function traces a verbose message into the log file"""
         if not self.isverbose:
             return
-        with self.__lock:
-            try:
-                for line in format_message(user, klass, module, "V", message):
-                    self.__logger.debug(line)
-            except:
-                pass
+        try:
+            self.__write(self.__logger.debug, format_message(user, klass, module, "V", message))
+        except:
+            pass
 
     def debug(self, user, klass, module, message):
         """This function traces a debug message into the log file"""
-        with self.__lock:
-            try:
-                for line in format_message(user, klass, module, None, message):
-                    self.__logger.debug(line)
-            except:
-                pass
+        try:
+            self.__write(self.__logger.debug, format_message(user, klass, module, None, message))
+        except:
+            pass
 
     def info(self, user, klass, module, message):
         """This function traces an info message into the log file"""
-        with self.__lock:
-            try:
-                for line in format_message(user, klass, module, None, message):
-                    self.__logger.info(line)
-            except:
-                pass
+        try:
+            self.__write(self.__logger.info, format_message(user, klass, module, None, message))
+        except:
+            pass
 
     def warning(self, user, klass, module, message):
         """This function traces a warning message into the log file"""
-        with self.__lock:
-            try:
-                for line in format_message(user, klass, module, None, message):
-                    self.__logger.warning(line)
-            except:
-                pass
+        try:
+            self.__write(self.__logger.warning, format_message(user, klass, module, None, message))
+        except:
+            pass
 
     def error(self, user, klass, module, message):
         """This function traces an error message into the log file"""
-        with self.__lock:
-            try:
-                for line in format_message(user, klass, module, None, message):
-                    self.__logger.error(line)
-            except:
-                pass
+        try:
+            self.__write(self.__logger.error, format_message(user, klass, module, None, message))
+        except:
+            pass
 
     def critical(self, user, klass, module, message):
         """This function traces a critical message into the log file"""
-        with self.__lock:
-            try:
-                for line in format_message(user, klass, module, None, message):
-                    self.__logger.critical(line)
-            except:
-                pass
+        try:
+            self.__write(self.__logger.critical, format_message(user, klass, module, None, message))
+        except:
+            pass
 
     def exception(self, user, klass, module, message):
         """This function traces the current exception raised into the log file"""
-        with self.__lock:
-            try:
-                for line in format_message(user, klass, module, None, message):
-                    self.__logger.error(line)
-                for line in format_message(user, klass, module, None, traceback.format_exc(chain = False)):
-                    self.__logger.error(line)
-            except:
-                pass
+        try:
+            self.__write(self.__logger.error, format_message(user, klass, module, None, message) +
+                         format_message(user, klass, module, None, traceback.format_exc(chain = False)))
+        except:
+            pass
 
     def __init__(self, configuration):
+        if DSLogger.Instance is not None:
+            DSLogger.Instance.detach()
         logging.config.dictConfig(configuration.items.logging.to_dict())
 
         self.__configuration = configuration
@@ -254,6 +300,7 @@ class DSLogger:
         self.__lock = threading.Lock()
         self.__reload_timer = None
         self.__cleanup_timer = None
+        self.__queue = None
         self.__debug = False
         self.__verbose = self.__configuration.items.get('logging.verbose', False)
         self.__files = {}
@@ -274,4 +321,6 @@ class DSLogger:
 
         self.__class__.Instance = self
 
+        self.__start_queue()
+        atexit.register(self.detach)
         self.__setup_logging()
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+"""
+This module handles the queue of log records written by a thread.
+"""
+
+import logging
+import logging.handlers
+import threading
+import collections
+
+class DSLoggerQueue(logging.handlers.QueueHandler):
+    """
+    This class stores the log records into a bounded queue, written into the handlers by a thread
+    (the callers don't wait for the disk) :
+      * maxsize : maximum number of records waiting
+      * overflow : 'drop' (the oldest record waiting is dropped and the number of dropped records is logged)
+        or 'block' (the caller waits for a free place, the records are never lost)
+      * batchsize : maximum number of records written at once, each stream is flushed once by batch
+    An error raised by a handler is reported by the handler (see logging.Handler.handleError).
+    """
+
+    DROP = "drop"
+    BLOCK = "block"
+
+    MAXSIZE = 10000
+    BATCHSIZE = 100
+
+    @property
+    def handlers(self):
+        """List of handlers writing the records"""
+        return self.__handlers
+
+    def enqueue(self, record):
+        """
+        Store a record into the queue (see 'overflow' if the queue is full)
+        If the queue is full and the thread isn't started, the oldest records are written by the caller ('block')
+        """
+        with self.__condition:
+            if self.__overflow == self.BLOCK:
+                while len(self.queue) >= self.__maxsize and self.__thread is not None:
+                    self.__condition.wait()
+                if len(self.queue) >= self.__maxsize:
+                    self.__write(self.__pop())
+            elif len(self.queue) >= self.__maxsize:
+                self.queue.popleft()
+                self.__dropped += 1
+            self.queue.append(record)
+            self.__condition.notify_all()
+
+    def start(self):
+        """Start the thread writing the records"""
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self.__run, name="DSLoggerQueue", daemon=True)
+            self.__thread.start()
+        return self
+
+    def stop(self):
+        """Write the records waiting and stop the thread"""
+        with self.__condition:
+            thread = self.__thread
+            self.__thread = None
+            self.__condition.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def __pop(self):
+        """Retrieve the next batch of records waiting - the lock has to be acquired"""
+        records = [self.queue.popleft() for _ in range(min(len(self.queue), self.__batchsize))]
+        if self.__dropped > 0:
+            records.insert(0, logging.makeLogRecord({'name': 'DSLoggerQueue', 'levelno': logging.WARNING,
+                                                     'levelname': logging.getLevelName(logging.WARNING),
+                                                     'msg': f"{self.__dropped} log records dropped (queue full)"}))
+            self.__dropped = 0
+        self.__condition.notify_all()
+        return records
+
+    def __batch(self):
+        """Wait and retrieve the next batch of records (None once the queue is stopped and empty)"""
+        with self.__condition:
+            while len(self.queue) == 0 and self.__thread is not None:
+                self.__condition.wait()
+            if len(self.queue) == 0:
+                return None
+            return self.__pop()
+
+    @staticmethod
+    def __isbuffered(handler):
+        """
+        Check if the handler writes the records into an opened stream without any other action
+        (StreamHandler, FileHandler or rotating handlers with 'emit' not overridden)
+        """
+        return type(handler).emit in (logging.StreamHandler.emit, logging.FileHandler.emit,
+                                      logging.handlers.BaseRotatingHandler.emit) and \
+               getattr(handler, 'stream', None) is not None
+
+    @staticmethod
+    def __emit(handler, records):
+        """
+        Write records into the stream of a handler, the stream is flushed once at the end (see StreamHandler.emit)
+        A rotating handler checks the rollover once before the batch (the file may exceed its size by one batch)
+        """
+        with handler.lock:
+            if isinstance(handler, logging.handlers.BaseRotatingHandler):
+                try:
+                    if handler.shouldRollover(records[0]):
+                        handler.doRollover()
+                except Exception:  # pylint: disable=broad-exception-caught
+                    handler.handleError(records[0])
+                if handler.stream is None:
+                    # the file is opened on the next record (delay)
+                    for record in records:
+                        handler.handle(record)
+                    return
+            for record in records:
+                if handler.filter(record):
+                    try:
+                        handler.stream.write(handler.format(record) + handler.terminator)
+                    except Exception:  # pylint: disable=broad-exception-caught
+                        handler.handleError(record)
+            try:
+                handler.flush()
+            except Exception:  # pylint: disable=broad-exception-caught
+                handler.handleError(records[-1])
+
+    def __write(self, records):
+        """Write a batch of records into the handlers"""
+        for handler in self.__handlers:
+            selected = [record for record in records if record.levelno >= handler.level]
+            if len(selected) == 0:
+                continue
+            if self.__isbuffered(handler):
+                self.__emit(handler, selected)
+                continue
+            for record in selected:
+                try:
+                    handler.handle(record)
+                except Exception:  # pylint: disable=broad-exception-caught
+                    handler.handleError(record)
+
+    def __run(self):
+        """Write the records by batch until the queue is stopped"""
+        records = self.__batch()
+        while records is not None:
+            self.__write(records)
+            records = self.__batch()
+
+    def __init__(self, handlers, maxsize = MAXSIZE, overflow = DROP, batchsize = BATCHSIZE):
+        super().__init__(collections.deque())
+        self.__handlers = list(handlers)
+        self.__maxsize = max(1, int(maxsize))
+        self.__overflow = self.BLOCK if overflow == self.BLOCK else self.DROP
+        self.__batchsize = max(1, int(batchsize))
+        self.__condition = threading.Condition()
+        self.__dropped = 0
+        self.__thread = None
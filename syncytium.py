@@ -9,26 +9,141 @@ Main program (Syncytium)
 """
 
 import argparse
+import asyncio
 import hashlib
 import os
+import sys
+import time
 from dotenv import load_dotenv
 from cryptography.fernet import Fernet
 
-from interface.schemas import DSSchemas
+from interface.schemas import DSSchemas, resolve
 
 load_dotenv()
 
+async def execute(command):
+    """Execute a command and close the pools of asynchronous connexions opened into its event loop"""
+    try:
+        return await command
+    finally:
+        await DSSchemas().shutdown()
+
+async def migrate(allowcopy = False):
+    """Create or upgrade the main schema (see DSSchema.migrate for allowcopy)"""
+    with DSSchemas().get_session() as schema:
+        async with schema:
+            await resolve(schema.migrate(allowcopy=allowcopy))
+
+def migrate_client_sync(client, application, allowcopy = False):
+    """Create or upgrade the schema of an application through the main schema (synchronous database)"""
+    with DSSchemas().get_session() as main:
+        with DSSchemas().get_session(client, application) as schema:
+            with main:
+                return main.migrate(schema, allowcopy)
+
+async def migrate_client(client, application, allowcopy = False):
+    """Create or upgrade the schema of an application through the main schema"""
+    with DSSchemas().get_session() as main:
+        isasync = main.database.isasync
+    if not isasync:
+        return await asyncio.to_thread(migrate_client_sync, client, application, allowcopy)
+
+    with DSSchemas().get_session() as main:
+        with DSSchemas().get_session(client, application) as schema:
+            async with main:
+                return await resolve(main.migrate(schema, allowcopy))
+
+def cache_configuration():
+    """
+    Parse all YAML files of the configuration (the clients included) and write their cache (see DSConfigurationCache)
+    Return the number of applications
+    """
+    return len(DSSchemas().tenants())
+
+async def migrate_clients(workers, resume, allowcopy = False):
+    """
+    Create or upgrade the schemas of all applications of all clients (at most 'workers' at the same time)
+    The applications migrated are written into the file 'resume' and skipped on the next call
+    If allowcopy is set, the tables which can't be altered online are copied (see DSSchema.migrate)
+    Return False if the migration of an application has failed
+    """
+    done = set()
+    if resume is not None and os.path.exists(resume):
+        with open(resume, 'r', encoding='utf-8') as file:
+            done = {line.strip() for line in file if line.strip() != ''}
+
+    tenants = [(client, application) for client, application in DSSchemas().tenants()
+               if f"{client}.{application}" not in done]
+    print(f"{len(tenants)} applications to migrate ({len(done)} already migrated)")
+
+    semaphore = asyncio.Semaphore(workers)
+    failures = []
+
+    async def run(client, application):
+        async with semaphore:
+            start = time.monotonic()
+            try:
+                upgraded = await migrate_client(client, application, allowcopy)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                failures.append(f"{client}.{application}")
+                print(f"{client}.{application} : failed in {time.monotonic() - start:.3f}s ({exc})")
+                return
+            print(f"{client}.{application} : {'migrated' if upgraded else 'up to date'} in {time.monotonic() - start:.3f}s")
+            if resume is not None:
+                with open(resume, 'a', encoding='utf-8') as file:
+                    file.write(f"{client}.{application}\n")
+
+    start = time.monotonic()
+    await asyncio.gather(*[run(client, application) for client, application in tenants])
+    print(f"{len(tenants) - len(failures)} applications migrated, {len(failures)} failed in {time.monotonic() - start:.3f}s")
+    for tenant in failures:
+        print(f"Failed : {tenant}")
+    return len(failures) == 0
+
+async def user(client, username, password):
+    """Create or replace a user on the API and the Web interfaces"""
+    with DSSchemas().get_session() as schema:
+        async with schema:
+            h = hashlib.new(DSSchemas().configuration.items.interface.api.password.algorithm)
+            h.update(password.encode('utf-8'))
+
+            user_api = schema.User.new()
+            user_api.Interface = DSSchemas.Interface.API.value
+            user_api.Login = username
+            user_api.Password = h.hexdigest()
+            user_api.ClientId = client
+
+            h = hashlib.new(DSSchemas().configuration.items.interface.web.password.algorithm)
+            h.update(password.encode('utf-8'))
+
+            user_web = schema.User.new()
+            user_web.Interface = DSSchemas.Interface.WEB.value
+            user_web.Login = username
+            user_web.Password = h.hexdigest()
+            user_web.ClientId = client
+
+            await resolve(schema.User.upsert([user_api, user_web]))
+            await resolve(schema.commit())
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Start one of the piece of Syncytium application")
-    parser.add_argument('--name', type=str, required=True, help="api, web or websocket (or migrate)")
+    parser.add_argument('--name', type=str, required=True, help="api, web or websocket (or migrate, migrate.clients, cache.yaml)")
     parser.add_argument('--client', type=int, required=False, help='Client')
     parser.add_argument('--username', type=str, required=False, help='Username')
     parser.add_argument('--password', type=str, required=False, help='Password')
+    parser.add_argument('--workers', type=int, required=False, default=8,
+                        help='Number of applications migrated at the same time (migrate.clients)')
+    parser.add_argument('--resume', type=str, required=False,
+                        help='File listing the applications already migrated, skipped on the next call (migrate.clients)')
+    parser.add_argument('--allow-copy', action='store_true',
+                        help='Alter by copying them the tables which can\'t be altered online (migrate, migrate.clients)')
     args = parser.parse_args()
 
     DSSchemas().load('config.yml')
     DSSchemas().open()
 
+    succeeded = True
+
     if args.name == "api":
         from interface.api.api import app
         import uvicorn
@@ -51,34 +166,13 @@ if __name__ == "__main__":
                     port=DSSchemas().configuration.items.interface.websocket.server.port,
                     log_config=None)
     elif args.name == "migrate":
-        with DSSchemas().get_session() as schema:
-            with schema:
-                schema.migrate()
+        asyncio.run(execute(migrate(args.allow_copy)))
+    elif args.name == "migrate.clients":
+        succeeded = asyncio.run(execute(migrate_clients(max(args.workers, 1), args.resume, args.allow_copy)))
+    elif args.name == "cache.yaml":
+        print(f"YAML files of the configuration cached ({cache_configuration()} applications)")
     elif args.name == "user":
-        with DSSchemas().get_session() as schema:
-            with schema:
-                schema.User.delete(list(schema.User.select(lambda record: record.Login == args.username)))
-
-                h = hashlib.new(DSSchemas().configuration.items.interface.api.password.algorithm)
-                h.update(args.password.encode('utf-8'))
-
-                user_api = schema.User.new()
-                user_api.Interface = DSSchemas.Interface.API.value
-                user_api.Login = args.username
-                user_api.Password = h.hexdigest()
-                user_api.ClientId = args.client
-
-                h = hashlib.new(DSSchemas().configuration.items.interface.web.password.algorithm)
-                h.update(args.password.encode('utf-8'))
-
-                user_web = schema.User.new()
-                user_web.Interface = DSSchemas.Interface.WEB.value
-                user_web.Login = args.username
-                user_web.Password = h.hexdigest()
-                user_web.ClientId = args.client
-
-                schema.User.insert([user_api, user_web])
-                schema.commit()
+        asyncio.run(execute(user(args.client, args.username, args.password)))
     elif args.name == "key.new":
         print("Key generated to encrypt and decrypt database password :")
         print("PSPASSWORD_KEY=", Fernet.generate_key().decode('utf-8'))
@@ -90,3 +184,6 @@ if __name__ == "__main__":
         print("Password encrypted :", cipher_suite.decrypt(bytes(args.password, 'utf-8')).decode('utf-8'))
 
     DSSchemas().close()
+
+    if not succeeded:
+        sys.exit(1)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit test (Columns)
+"""
+
+import datetime
+import unittest
+
+import numpy
+
+from app.schema.columns import DSColumns
+from app.schema.tabledefinition import DSTableDefinition
+
+table = DSTableDefinition("User", {
+    "Description": "List of users",
+    "Key": "Name",
+    "Fields": {
+        "Name": { "Type": "String", "MaxLength": 4 },
+        "Age": { "Type": "Integer" },
+        "Birthday": { "Type": "Date" }
+        }
+    })
+
+class TestDSColumns(unittest.TestCase):
+    """This class tests the conversion of rows into columns"""
+
+    def test_01_types(self):
+        """Checks if each column has the type of its field"""
+        arrays = DSColumns(table, table.fields).append([("Toto", 12, datetime.date(2000, 1, 2))]).arrays
+        self.assertEqual(arrays["Name"].dtype, numpy.dtype("U4"))
+        self.assertEqual(arrays["Age"].dtype, numpy.int64)
+        self.assertEqual(DSColumns.item(arrays["Age"], -1), 12)
+        self.assertIsInstance(DSColumns.item(arrays["Age"], -1), int)
+        self.assertEqual(DSColumns.item(arrays["Birthday"], 0), datetime.date(2000, 1, 2))
+
+    def test_02_null(self):
+        """Checks if the null values are masked"""
+        arrays = DSColumns(table, ["Name", "Age"]).append([("Toto", 12)]).append([("Titi", None)]).arrays
+        self.assertIsInstance(arrays["Age"], numpy.ma.MaskedArray)
+        self.assertEqual(arrays["Age"].tolist(), [12, None])
+        self.assertIsNone(DSColumns.item(arrays["Age"], -1))
+        self.assertNotIsInstance(arrays["Name"], numpy.ma.MaskedArray)
+
+    def test_03_long_string(self):
+        """Checks if a string longer than the length of the field isn't truncated"""
+        arrays = DSColumns(table, ["Name"]).append([("Toto",)]).append([("Tutu et Titi",), (None,)]).arrays
+        self.assertEqual(arrays["Name"].tolist(), ["Toto", "Tutu et Titi", None])
+        self.assertEqual(DSColumns.item(arrays["Name"], 1), "Tutu et Titi")
+
+    def test_04_empty(self):
+        """Checks if an empty selection retrieves empty columns"""
+        arrays = DSColumns(table, ["Name", "Age"]).append([]).arrays
+        self.assertEqual(len(arrays["Name"]), 0)
+        self.assertEqual(arrays["Age"].dtype, numpy.int64)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,11 +4,17 @@
 Unit test (Configuration)
 """
 
+import os
+import tempfile
 import unittest
 import datetime
+from unittest import mock
 from dotenv import load_dotenv
 
 from configuration.configuration import DSConfiguration
+from configuration.configurationcache import DSConfigurationCache
+from configuration.configurationitem import DSConfigurationItem
+from configuration.configurationlazyitems import DSConfigurationLazyItems
 
 class TestDSConfiguration(unittest.TestCase):
     """This class tests the configuration behavior"""
@@ -147,3 +153,59 @@ class TestDSConfiguration(unittest.TestCase):
         self.assertRegex(self.configuration.version, r"^v[0-9]+(\.[0-9]+)*$")
         with self.assertRaises(KeyError):
             _ = self.configuration.items.database.unknown
+
+    def test_memoization(self):
+        """Checks if the evaluated values are kept except the ones depending on the current date"""
+        database = self.configuration.items.database
+        self.assertIs(database.essai, database.essai)
+        self.assertIs(self.configuration.get("database.essai"), self.configuration.get("database.essai"))
+        filename = self.configuration.items.logging.handlers.file.filename
+        self.assertTrue(filename.endswith(datetime.datetime.now().strftime("%Y-%m-%d") + ".log"))
+        self.assertIsNot(filename, self.configuration.items.logging.handlers.file.filename)
+
+    def test_cache(self):
+        """Checks if the cache of a file is written on the first load and ignored once the file has changed"""
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "test.yml")
+            with open(filename, 'w', encoding='utf-8') as file:
+                file.write("name: test\n")
+            self.assertEqual(DSConfigurationCache.load(filename), {"name": "test"})
+            self.assertTrue(os.path.exists(DSConfigurationCache.cachename(filename)))
+            self.assertEqual(DSConfigurationCache.load(filename), {"name": "test"})
+            with open(filename, 'w', encoding='utf-8') as file:
+                file.write("name: changed\n")
+            self.assertEqual(DSConfigurationCache.load(filename), {"name": "changed"})
+
+    def test_cache_directory(self):
+        """Checks if the cache is written into the directory PSCONFIG_CACHE and skipped if it can't be written"""
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "test.yml")
+            with open(filename, 'w', encoding='utf-8') as file:
+                file.write("name: test\n")
+            with mock.patch.dict(os.environ, {"PSCONFIG_CACHE": os.path.join(directory, "cache")}):
+                self.assertEqual(DSConfigurationCache.load(filename), {"name": "test"})
+                self.assertTrue(DSConfigurationCache.cachename(filename).startswith(os.path.join(directory, "cache")))
+                self.assertTrue(os.path.exists(DSConfigurationCache.cachename(filename)))
+            with mock.patch.dict(os.environ, {"PSCONFIG_CACHE": os.path.join(filename, "cache")}):
+                self.assertEqual(DSConfigurationCache.load(filename), {"name": "test"})
+                self.assertFalse(os.path.exists(DSConfigurationCache.cachename(filename)))
+
+    def test_lazy(self):
+        """Checks if the sub items are loaded on first access and the least recently used are forgotten"""
+        loads = []
+        def load(value):
+            loads.append(value)
+            return DSConfigurationItem(self.configuration, {"name": value})
+        clients = DSConfigurationItem(self.configuration,
+                                      DSConfigurationLazyItems({"C1": "c1", "C2": "c2", "C3": "c3"}, load, 2))
+        self.assertEqual(list(clients.keys()), ["C1", "C2", "C3"])
+        self.assertEqual(clients.to_dict(), {"C1": "c1", "C2": "c2", "C3": "c3"})
+        self.assertEqual(loads, [])
+        self.assertEqual(clients.get("C1.name"), "c1")
+        self.assertEqual(clients.C2.name, "c2")
+        self.assertEqual(clients.C1.name, "c1")
+        self.assertEqual(clients.C3.name, "c3")
+        self.assertEqual(clients.items.loaded, ["C1", "C3"])
+        self.assertEqual(clients.get("C2.name"), "c2")
+        self.assertEqual(loads, ["c1", "c2", "c3", "c2"])
+        self.assertIsNone(clients.get("C4.name"))
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit test (Criteria)
+"""
+
+import datetime
+import unittest
+
+from app.schema.table import DSTable
+from app.schema.criteria.criteriafactory import factory as criteriafactory
+from exception.exceptionfieldtypeunknown import DSExceptionFieldTypeUnknown
+
+description = {
+    "Description": "List of users",
+    "Key": "Name",
+    "Fields": {
+        "Name": { "Type": "String", "MaxLength": 32 },
+        "Age": { "Type": "Integer" },
+        "Active": { "Type": "Boolean" },
+        "Birthday": { "Type": "Date" }
+        }
+    }
+
+class TestDSCriteria(unittest.TestCase):
+    """This class tests the conversion of the criteria into SQL requests"""
+
+    def setUp(self):
+        """Initialize a test"""
+        self.table = DSTable(None, "User", description)
+
+    def test_01_comparable(self):
+        """Checks if the values are given as parameters"""
+        self.assertEqual(criteriafactory(["=", "Name", "O'Neil"], self.table).tomysqlquery(),
+                         ("`Name` = %s", ["O'Neil"]))
+        self.assertEqual(criteriafactory(["=", "Name", None], self.table).tomysqlquery(),
+                         ("`Name` is null", []))
+        self.assertEqual(criteriafactory(["in", "Age", [1, 2]], self.table).tomysqlquery(),
+                         ("`Age` in (%s, %s)", [1, 2]))
+
+    def test_02_logical(self):
+        """Checks if the parameters are ordered as the template"""
+        criteria = criteriafactory(["or", [["and", [["=", "Name", "Toto"], [">", "Age", 18]]],
+                                           ["not", [["like", "Name", "T%"]]]]], self.table)
+        self.assertEqual(criteria.tomysqlquery(),
+                         ("((`Name` = %s) and (`Age` > %s)) or (not (`Name` like %s))", ["Toto", 18, "T%"]))
+
+    def test_03_keyset(self):
+        """Checks the order of the records and the position given by a record"""
+        self.assertEqual(self.table.keyset("-Age"), [("Age", True), ("Name", False)])
+        self.assertEqual(self.table.position({"Name": "Toto", "Age": 18}, "-Age"), [18, "Toto"])
+
+    def test_04_metric(self):
+        """Checks the description of the metrics"""
+        self.assertEqual(self.table.metric("count(*)"), ("count", None))
+        self.assertEqual(self.table.metric(" SUM( Age ) "), ("sum", "Age"))
+        self.assertRaises(ValueError, self.table.metric, "sum(*)")
+        self.assertRaises(ValueError, self.table.metric, "median(Age)")
+        self.assertRaises(KeyError, self.table.metric, "max(Unknown)")
+
+    def test_05_fieldtype(self):
+        """Checks the conversion of the values into the type of the fields"""
+        self.assertEqual(self.table["Birthday"].convert("2000-01-31"), datetime.date(2000, 1, 31))
+        self.assertIs(self.table["Active"].convert("false"), False)
+        record = self.table.recordclass().decode(["Toto", 18, 1, datetime.date(2000, 1, 31)])
+        self.assertIs(record.Active, True)
+        self.assertRaises(DSExceptionFieldTypeUnknown, DSTable, None, "User",
+                          {"Description": "", "Key": "Name", "Fields": {"Name": {"Type": "Text"}}})
+
+    def test_06_literal(self):
+        """Checks if the strings of a SQL clause are escaped, within a list of values too"""
+        self.assertEqual(criteriafactory(["=", "Name", "O'Neil\\"], self.table).tomysql(), "`Name` = 'O\\'Neil\\\\'")
+        self.assertEqual(criteriafactory(["in", "Name", ["O'Neil", "Toto"]], self.table).tomysql(),
+                         "`Name` in ('O\\'Neil', 'Toto')")
+        self.assertEqual(criteriafactory(["in", "Age", [1, 2]], self.table).tomysql(), "`Age` in (1, 2)")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit test (Database asynchronous MySQL pool)
+"""
+
+import os
+import asyncio
+import unittest
+from unittest import mock
+from cryptography.fernet import Fernet
+
+import pymysql
+
+from app.schema.database.databaseasyncmysql import DSDatabaseAsyncMySQL
+from app.schema.database.databasemysqlcatalog import DSDatabaseMySQLCatalog
+from exception.exceptiondatabaserequest import DSExceptionDatabaseRequest
+
+class Connection:
+    """This class simulates an asynchronous connexion to the database"""
+
+    closed = False
+    rowcount = 0
+    executed = []
+
+    async def execute(self, query, parameters = None):
+        """Format the request as PyMySQL does"""
+        if parameters is not None:
+            query = query % tuple(pymysql.converters.escape_item(value, 'utf8') for value in parameters)
+        Connection.executed.append(query)
+        if "ALGORITHM=" in query:
+            raise pymysql.err.InternalError(1846, "Not supported")
+
+    async def begin(self):
+        """Start a transaction"""
+
+    async def rollback(self):
+        """Rollback the current transaction"""
+
+    async def cursor(self):
+        """Retrieve a cursor"""
+        return self
+
+    async def close(self):
+        """Close the cursor"""
+
+class Pool:
+    """This class simulates a pool of connexions (aiomysql)"""
+
+    created = []
+
+    async def acquire(self):
+        """Check out a connexion"""
+        await asyncio.sleep(0)
+        return Connection()
+
+    def release(self, connection):
+        """Check in a connexion"""
+        self.released.append(connection)
+
+    def close(self):
+        """Close the pool"""
+        self.closed = True
+
+    async def wait_closed(self):
+        """Wait until the connexions are closed"""
+        self.waited = True
+
+    def __init__(self, **kwargs):
+        self.parameters = kwargs
+        self.released = []
+        self.closed = False
+        self.waited = False
+
+async def create_pool(**kwargs):
+    """Create a pool (slowly, to let the concurrent sessions ask for the same pool)"""
+    await asyncio.sleep(0.01)
+    pool = Pool(**kwargs)
+    Pool.created.append(pool)
+    return pool
+
+class TestDSDatabaseAsyncMySQL(unittest.TestCase):
+    """This class tests the pools of connexions shared by the asynchronous sessions"""
+
+    def setUp(self):
+        key = Fernet.generate_key()
+        self.password = Fernet(key).encrypt(b"secret").decode('utf-8')
+        self.environ = mock.patch.dict(os.environ, {"PSPASSWORD_KEY": key.decode('utf-8')})
+        self.create_pool = mock.patch("aiomysql.create_pool", side_effect=create_pool)
+        self.environ.start()
+        self.create_pool.start()
+        Pool.created = []
+
+    def tearDown(self):
+        self.create_pool.stop()
+        self.environ.stop()
+
+    def database(self, username = "user", pool = None):
+        """Create a new session"""
+        return DSDatabaseAsyncMySQL("localhost", username, self.password, "Test", pool)
+
+    def test_01_shared(self):
+        """Checks if the concurrent sessions on the same target create a single pool"""
+        async def run():
+            databases = [self.database() for _ in range(10)]
+            await asyncio.gather(*[database.connect() for database in databases])
+            for database in databases:
+                self.assertTrue(database.isconnected)
+                await database.disconnect()
+            await DSDatabaseAsyncMySQL.close_all()
+        asyncio.run(run())
+        self.assertEqual(len(Pool.created), 1)
+        self.assertEqual(len(Pool.created[0].released), 10)
+        self.assertEqual(Pool.created[0].parameters['password'], "secret")
+
+    def test_02_keys(self):
+        """Checks if the pools are distinct by user and by settings"""
+        async def run():
+            for database in (self.database(), self.database(), self.database("other"),
+                             self.database(pool={'maxsize': 2}), self.database(pool={'maxsize': 2})):
+                await database.connect()
+                await database.disconnect()
+            await DSDatabaseAsyncMySQL.close_all()
+        asyncio.run(run())
+        self.assertEqual(len(Pool.created), 3)
+        self.assertEqual(Pool.created[2].parameters['maxsize'], 2)
+        self.assertEqual(Pool.created[0].parameters['pool_recycle'], DSDatabaseAsyncMySQL.RECYCLE)
+
+    def test_03_close_all(self):
+        """Checks if the pools are closed and created once again into a new event loop"""
+        async def run():
+            database = self.database()
+            await database.connect()
+            await database.disconnect()
+            await DSDatabaseAsyncMySQL.close_all()
+        asyncio.run(run())
+        asyncio.run(run())
+        self.assertEqual(len(Pool.created), 2)
+        for pool in Pool.created:
+            self.assertTrue(pool.closed)
+            self.assertTrue(pool.waited)
+
+    def test_04_literal(self):
+        """Checks if a SQL clause with a literal '%' is sent as is, with or without parameters"""
+        async def run():
+            database = self.database()
+            await database.connect()
+            await database.delete_where("User", "`Name` like 'A%'")
+            await database.update_where("User", {"Age": 18}, "`Name` like 'A%'")
+            await database.disconnect()
+            await DSDatabaseAsyncMySQL.close_all()
+        Connection.executed = []
+        asyncio.run(run())
+        self.assertEqual(Connection.executed, ["DELETE FROM `Test`.`User` WHERE `Name` like 'A%'",
+                                               "UPDATE `Test`.`User` SET `Age` = 18 WHERE `Name` like 'A%'"])
+
+    def test_05_offline(self):
+        """Checks if a table which can't be altered online is reported, or copied only if it's allowed"""
+        schema = {"Name": "Test", "Tables": {"User": {"Name": "User", "Key": ["Name"], "Fields": {
+            "Name": {"Name": "Name", "Type": "String", "MaxLength": 32}}}}}
+        current = {"Name": "Test", "Tables": {"User": {"Name": "User", "Key": ["Name"], "Indexes": {}, "Fields": {
+            "Name": {"Name": "Name", "Type": "varchar(16)", "DefaultValue": None}}}}}
+        request = "ALTER TABLE `Test`.`User` MODIFY COLUMN `Name` VARCHAR(32)"
+        async def run(allowcopy):
+            DSDatabaseMySQLCatalog.write("localhost", "Test", current)
+            database = self.database()
+            await database.connect()
+            try:
+                return await database.migrate(schema, {}, True, allowcopy)
+            finally:
+                await database.disconnect()
+                await DSDatabaseAsyncMySQL.close_all()
+        Connection.executed = []
+        with self.assertRaises(DSExceptionDatabaseRequest):
+            asyncio.run(run(False))
+        self.assertEqual(Connection.executed, ["USE `Test`", request + ", ALGORITHM=INPLACE, LOCK=NONE"])
+        Connection.executed = []
+        self.assertTrue(asyncio.run(run(True)))
+        self.assertEqual(Connection.executed, ["USE `Test`", request + ", ALGORITHM=INPLACE, LOCK=NONE", request])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit test (Database cursor)
+"""
+
+import unittest
+
+from app.schema.database.databasecursor import DSDatabaseCursor
+
+class Cursor:
+    """This class simulates a cursor streaming the rows from the server"""
+
+    def fetchmany(self, size):
+        """Retrieve the next rows"""
+        if self.closed:
+            raise RuntimeError("Cursor closed")
+        rows = self.rows[:size]
+        self.rows = self.rows[size:]
+        self.fetches += 1
+        return rows
+
+    def close(self):
+        """Close the cursor (the rows have to be read)"""
+        if len(self.rows) > 0:
+            raise RuntimeError("Unread result found")
+        self.closed = True
+
+    def __init__(self, count):
+        self.rows = [(i,) for i in range(count)]
+        self.fetches = 0
+        self.closed = False
+
+class TestDSDatabaseCursor(unittest.TestCase):
+    """This class tests the rows read by a cursor"""
+
+    def test_01_read(self):
+        """Checks if all rows are read and the cursor is closed at the end"""
+        cursor = Cursor(25)
+        self.assertEqual(list(DSDatabaseCursor(cursor, "Table", ["Id"], batchsize=10)), [(i,) for i in range(25)])
+        self.assertTrue(cursor.closed)
+        self.assertEqual(cursor.fetches, 4)
+
+    def test_02_early_close(self):
+        """Checks if the rows not read yet are consumed when the cursor is closed before the end"""
+        cursor = Cursor(25)
+        dscursor = DSDatabaseCursor(cursor, "Table", ["Id"], batchsize=10)
+        self.assertEqual(next(dscursor), (0,))
+        dscursor.close()
+        self.assertTrue(cursor.closed)
+        self.assertEqual(len(cursor.rows), 0)
+        self.assertEqual(list(dscursor), [])
+
+    def test_03_fetch(self):
+        """Checks if the batches are read until the end without reading the cursor once again"""
+        cursor = Cursor(15)
+        dscursor = DSDatabaseCursor(cursor, "Table", ["Id"], batchsize=10)
+        self.assertEqual(len(dscursor.fetch()), 10)
+        self.assertEqual(len(dscursor.fetch()), 5)
+        self.assertEqual(dscursor.fetch(), [])
+        self.assertTrue(cursor.closed)
+        self.assertEqual(cursor.fetches, 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit test (MySQL migration planner)
+"""
+
+import unittest
+
+import pymysql
+import mysql.connector
+
+from app.schema.database.databasemysqlplanner import DSDatabaseMySQLPlanner
+
+schema = {
+    "Name": "PSTest",
+    "Tables": {
+        "User": {
+            "Name": "User",
+            "Key": ["Name"],
+            "Fields": {
+                "Name": { "Name": "Name", "Type": "String", "MaxLength": 80 },
+                "PhoneNumber": { "Name": "PhoneNumber", "Type": "String", "MaxLength": 14 },
+                "Age": { "Name": "Age", "Type": "Integer", "DefaultValue": 0 }
+                },
+            "Indexes": {
+                "IX_User_Phone": { "Fields": ["PhoneNumber"], "Lengths": { "PhoneNumber": 4 } }
+                }
+            }
+        }
+    }
+
+class TestDSDatabaseMySQLPlanner(unittest.TestCase):
+    """This class tests the requests planned to create or upgrade a schema"""
+
+    def setUp(self):
+        """Initialize a test"""
+        self.planner = DSDatabaseMySQLPlanner()
+        self.current = {
+            "Name": "PSTest",
+            "Tables": {
+                "User": {
+                    "Name": "User",
+                    "Key": ["Name"],
+                    "Fields": {
+                        "Name": { "Name": "Name", "Type": "varchar(80)", "DefaultValue": None },
+                        "PhoneNumber": { "Name": "PhoneNumber", "Type": "varchar(14)", "DefaultValue": None },
+                        "Age": { "Name": "Age", "Type": "int(11)", "DefaultValue": "0" }
+                        },
+                    "Indexes": {
+                        "IX_User_Phone": { "Fields": ["PhoneNumber"], "Unique": False, "Lengths": { "PhoneNumber": 4 } }
+                        }
+                    }
+                }
+            }
+
+    def test_01_create(self):
+        """Checks the creation of a schema"""
+        self.assertEqual(self.planner.create(schema), [
+            ["CREATE SCHEMA `PSTest`"],
+            ["CREATE TABLE `PSTest`.`User` (`Name` VARCHAR(80), `PhoneNumber` VARCHAR(14), `Age` INT DEFAULT 0, " +
+             "CONSTRAINT PK_User PRIMARY KEY (`Name`), INDEX `IX_User_Phone` (`PhoneNumber`(4)))"]
+            ])
+
+    def test_02_uptodate(self):
+        """Checks that nothing is planned if the schema is up to date"""
+        self.assertEqual(self.planner.upgrade(schema, self.current), [])
+
+    def test_03_instant(self):
+        """Checks that the fields added and the default values are changed by a single instant request"""
+        del self.current["Tables"]["User"]["Fields"]["PhoneNumber"]
+        self.current["Tables"]["User"]["Fields"]["Age"]["DefaultValue"] = "18"
+        request = "ALTER TABLE `PSTest`.`User` ADD COLUMN `PhoneNumber` VARCHAR(14), ALTER COLUMN `Age` SET DEFAULT 0"
+        self.assertEqual(self.planner.upgrade(schema, self.current), [
+            [request + ", ALGORITHM=INSTANT", request + ", ALGORITHM=INPLACE, LOCK=NONE"]
+            ])
+
+    def test_04_inplace(self):
+        """Checks that the types and the indexes are changed without lock if possible"""
+        self.current["Tables"]["User"]["Fields"]["PhoneNumber"]["Type"] = "varchar(10)"
+        self.current["Tables"]["User"]["Indexes"]["IX_User_Phone"]["Lengths"] = { "PhoneNumber": 8 }
+        request = "ALTER TABLE `PSTest`.`User` MODIFY COLUMN `PhoneNumber` VARCHAR(14), " + \
+                  "DROP INDEX `IX_User_Phone`, ADD INDEX `IX_User_Phone` (`PhoneNumber`(4))"
+        self.assertEqual(self.planner.upgrade(schema, self.current), [
+            [request + ", ALGORITHM=INPLACE, LOCK=NONE"]
+            ])
+
+    def test_05_table(self):
+        """Checks that a missing table is created"""
+        del self.current["Tables"]["User"]
+        self.assertEqual(self.planner.upgrade(schema, self.current), self.planner.create(schema)[1:])
+
+    def test_06_types(self):
+        """Checks the native types of the fields and their default values"""
+        fields = {
+            "Score": { "Name": "Score", "Type": "Float", "DefaultValue": 1 },
+            "Amount": { "Name": "Amount", "Type": "Decimal", "Precision": 12, "Scale": 2, "DefaultValue": "0.5" },
+            "Active": { "Name": "Active", "Type": "Boolean", "DefaultValue": True },
+            "Birthday": { "Name": "Birthday", "Type": "Date", "DefaultValue": "2000-01-01" },
+            "Created": { "Name": "Created", "Type": "DateTime" },
+            "Counter": { "Name": "Counter", "Type": "BigInteger" },
+            "Picture": { "Name": "Picture", "Type": "Blob", "DefaultValue": "" }
+            }
+        self.assertEqual([self.planner.column(field) for field in fields.values()], [
+            "`Score` DOUBLE DEFAULT 1.0", "`Amount` DECIMAL(12,2) DEFAULT 0.5", "`Active` TINYINT(1) DEFAULT 1",
+            "`Birthday` DATE DEFAULT '2000-01-01'", "`Created` DATETIME", "`Counter` BIGINT", "`Picture` LONGBLOB"
+            ])
+        current = {
+            "Score": { "Name": "Score", "Type": "double", "DefaultValue": "1" },
+            "Amount": { "Name": "Amount", "Type": "decimal(12,2)", "DefaultValue": "0.50" },
+            "Active": { "Name": "Active", "Type": "tinyint(1)", "DefaultValue": "1" },
+            "Birthday": { "Name": "Birthday", "Type": "date", "DefaultValue": "2000-01-01" },
+            "Created": { "Name": "Created", "Type": "datetime", "DefaultValue": None },
+            "Counter": { "Name": "Counter", "Type": "bigint(20)", "DefaultValue": None },
+            "Picture": { "Name": "Picture", "Type": "longblob", "DefaultValue": None }
+            }
+        self.assertIsNone(self.planner.altertable("PSTest", { "Name": "User", "Key": ["Name"], "Fields": fields },
+                                                  { "Key": ["Name"], "Fields": current, "Indexes": {} }))
+    def test_07_unsupported(self):
+        """Checks if only the errors of an algorithm not supported let the next request be tried"""
+        self.assertTrue(self.planner.unsupported(mysql.connector.errors.DatabaseError(msg="Not supported", errno=1846)))
+        self.assertTrue(self.planner.unsupported(pymysql.err.InternalError(1845, "Not supported")))
+        self.assertFalse(self.planner.unsupported(mysql.connector.errors.DatabaseError(msg="Lock wait", errno=1205)))
+        self.assertFalse(self.planner.unsupported(pymysql.err.OperationalError(2013, "Lost connection")))
+        self.assertFalse(self.planner.unsupported(ValueError("Error")))
+
+    def test_08_allowcopy(self):
+        """Checks that the default algorithm (copying the table) is tried last only if it's allowed"""
+        self.current["Tables"]["User"]["Fields"]["PhoneNumber"]["Type"] = "varchar(10)"
+        request = "ALTER TABLE `PSTest`.`User` MODIFY COLUMN `PhoneNumber` VARCHAR(14)"
+        steps = self.planner.upgrade(schema, self.current, allowcopy=True)
+        self.assertEqual(steps, [[request + ", ALGORITHM=INPLACE, LOCK=NONE", request]])
+        self.assertEqual([self.planner.copying(request) for request in steps[0]], [False, True])
+        self.assertFalse(self.planner.copying("CREATE TABLE `PSTest`.`User` (`Name` VARCHAR(80))"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit test (Database MySQL pool)
+"""
+
+import os
+import time
+import unittest
+from unittest import mock
+from cryptography.fernet import Fernet
+
+from app.schema.database.databasemysqlpool import DSDatabaseMySQLPool
+
+from exception.exceptiondatabasenotconnected import DSExceptionDatabaseNotConnected
+
+class Connection:
+    """This class simulates a connexion to the database"""
+
+    def is_connected(self):
+        """Retrieve if the connexion is still alive"""
+        return self.alive
+
+    def rollback(self):
+        """Rollback the current transaction"""
+
+    def close(self):
+        """Close the connexion"""
+        self.closed = True
+
+    def __init__(self, **kwargs):
+        self.parameters = kwargs
+        self.alive = True
+        self.closed = False
+
+class TestDSDatabaseMySQLPool(unittest.TestCase):
+    """This class tests the connexions checked out and in the pool"""
+
+    def setUp(self):
+        key = Fernet.generate_key()
+        self.password = Fernet(key).encrypt(b"secret").decode('utf-8')
+        self.environ = mock.patch.dict(os.environ, {"PSPASSWORD_KEY": key.decode('utf-8')})
+        self.connect = mock.patch("mysql.connector.connect", side_effect=Connection)
+        self.environ.start()
+        self.connect.start()
+
+    def tearDown(self):
+        DSDatabaseMySQLPool.close_all()
+        self.connect.stop()
+        self.environ.stop()
+
+    def pool(self, **parameters):
+        """Create a new pool"""
+        return DSDatabaseMySQLPool("localhost", "user", self.password, parameters)
+
+    def test_01_get(self):
+        """Checks if the pool is shared by the same target and the same settings"""
+        pool = DSDatabaseMySQLPool.get("localhost", "user", self.password, {'maxsize': 2})
+        self.assertIs(DSDatabaseMySQLPool.get("localhost", "user", self.password, {'maxsize': 2}), pool)
+        self.assertIsNot(DSDatabaseMySQLPool.get("localhost", "user", self.password, {'maxsize': 3}), pool)
+        self.assertIsNot(DSDatabaseMySQLPool.get("localhost", "other", self.password, {'maxsize': 2}), pool)
+
+    def test_02_acquire(self):
+        """Checks if a connexion released is recycled"""
+        pool = self.pool()
+        connection = pool.acquire()
+        self.assertEqual(connection.database.parameters['password'], "secret")
+        self.assertEqual(pool.size, 1)
+        pool.release(connection)
+        self.assertIs(pool.acquire(), connection)
+        self.assertEqual(pool.size, 1)
+
+    def test_03_dead(self):
+        """Checks if a dead connexion is replaced on acquire"""
+        pool = self.pool(ping=0)
+        connection = pool.acquire()
+        pool.release(connection)
+        connection.database.alive = False
+        other = pool.acquire()
+        self.assertIsNot(other, connection)
+        self.assertTrue(connection.database.closed)
+        self.assertEqual(pool.size, 1)
+
+    def test_04_expired(self):
+        """Checks if the idle connexions above minsize are closed"""
+        pool = self.pool(idle=0, minsize=1)
+        first, second = pool.acquire(), pool.acquire()
+        pool.release(first)
+        time.sleep(0.01)
+        pool.release(second)
+        self.assertTrue(first.database.closed)
+        self.assertFalse(second.database.closed)
+        self.assertEqual(pool.size, 1)
+
+    def test_05_exhausted(self):
+        """Checks if acquire fails once the pool is full and the timeout is reached"""
+        pool = self.pool(maxsize=1, timeout=0.05)
+        connection = pool.acquire()
+        with self.assertRaises(DSExceptionDatabaseNotConnected):
+            pool.acquire()
+        pool.discard(connection)
+        self.assertEqual(pool.size, 0)
+        self.assertIsNot(pool.acquire(), connection)
+
+if __name__ == '__main__':
+    unittest.main()
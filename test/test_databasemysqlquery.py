@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit test (MySQL requests)
+"""
+
+import io
+import datetime
+import decimal
+import unittest
+
+from app.schema.database.databasemysqlquery import DSDatabaseMySQLQuery
+
+class TestDSDatabaseMySQLQuery(unittest.TestCase):
+    """This class tests the SQL requests built for MySQL"""
+
+    def setUp(self):
+        """Initialize a test"""
+        self.query = DSDatabaseMySQLQuery("PSTest")
+        self.fields = ["Name", "PhoneNumber", "Age"]
+
+    def test_01_update(self):
+        """Checks if only the fields changed are updated and grouped by list of fields"""
+        oldvalues = [{"Name": "Toto", "PhoneNumber": None, "Age": 1},
+                     {"Name": "Tata", "PhoneNumber": "06", "Age": 2},
+                     {"Name": "Titi", "PhoneNumber": "07", "Age": 3},
+                     {"Name": "Tutu", "PhoneNumber": "08", "Age": 4}]
+        newvalues = [{"Name": "Toto", "PhoneNumber": None, "Age": 10},
+                     {"Name": "Tata", "PhoneNumber": "06", "Age": 20},
+                     {"Name": "Titi", "PhoneNumber": "07", "Age": 3},
+                     {"Name": "Tutu", "PhoneNumber": "09", "Age": 4}]
+        self.assertEqual(self.query.updateitems("User", self.fields, oldvalues, newvalues, ["Name"]), [
+            ("UPDATE `PSTest`.`User` SET `Age` = %s WHERE `Name` = %s", [(10, "Toto"), (20, "Tata")]),
+            ("UPDATE `PSTest`.`User` SET `PhoneNumber` = %s WHERE `Name` = %s", [("09", "Tutu")])
+            ])
+
+    def test_02_update_version(self):
+        """Checks if the version is incremented and compared with the old one"""
+        oldvalue = {"Name": "Toto", "Age": 1, "Version": 3}
+        newvalue = {"Name": "Toto", "Age": 2, "Version": 3}
+        self.assertEqual(self.query.updateitems("User", ["Name", "Age", "Version"], oldvalue, newvalue, ["Name"], "Version"), [
+            ("UPDATE `PSTest`.`User` SET `Age` = %s, `Version` = COALESCE(`Version`, 0) + 1 " +
+             "WHERE `Name` = %s and `Version` <=> %s", [(2, "Toto", 3)])
+            ])
+        self.query.updateversions(["Name", "Age", "Version"], oldvalue, newvalue, ["Name"], "Version")
+        self.assertEqual(newvalue["Version"], 4)
+
+    def test_03_upsert(self):
+        """Checks if the fields out of the key are updated on a duplicate key"""
+        self.assertEqual(self.query.upsertmany("User", self.fields, ["Name"], 2),
+                         "INSERT INTO `PSTest`.`User`(`Name`, `PhoneNumber`, `Age`) VALUES (%s, %s, %s), (%s, %s, %s) " +
+                         "ON DUPLICATE KEY UPDATE `PhoneNumber` = VALUES(`PhoneNumber`), `Age` = VALUES(`Age`)")
+        self.assertEqual(self.query.upsertmany("User", ["Name"], ["Name"], 1),
+                         "INSERT INTO `PSTest`.`User`(`Name`) VALUES (%s) ON DUPLICATE KEY UPDATE `Name` = `Name`")
+
+    def test_04_where(self):
+        """Checks if the update and the delete by criteria are a single request"""
+        self.assertEqual(self.query.updatewhere("User", {"Age": 18}, ("`Name` like %s", ["T%"]), "Version"),
+                         ("UPDATE `PSTest`.`User` SET `Age` = %s, `Version` = COALESCE(`Version`, 0) + 1 " +
+                          "WHERE `Name` like %s", (18, "T%")))
+        self.assertEqual(self.query.deletewhere("User", ("`Age` > %s", [18]), 1000),
+                         ("DELETE FROM `PSTest`.`User` WHERE `Age` > %s LIMIT 1000", (18,)))
+        self.assertEqual(self.query.deletewhere("User"), ("DELETE FROM `PSTest`.`User`", ()))
+
+    def test_05_aggregate(self):
+        """Checks if the metrics are computed by groups sorted by the fields grouping the records"""
+        self.assertEqual(self.query.aggregate("User", ["Age"], [("count", None), ("max", "Name")], ("`Age` > %s", [18])),
+                         ("SELECT `Age`, COUNT(*), MAX(`Name`) FROM `PSTest`.`User` WHERE `Age` > %s " +
+                          "GROUP BY `Age` ORDER BY `Age`", (18,)))
+        self.assertEqual(self.query.aggregate("User", [], [("count", None)]),
+                         ("SELECT COUNT(*) FROM `PSTest`.`User`", ()))
+
+    def test_06_catalog(self):
+        """Checks the conversion of the catalog into the description of the tables"""
+        rows = [('S', None, '', 0, 'PSTest', None, None, None, None),
+                ('C', 'User', '', 1, 'Name', 'varchar(32)', 'NO', None, None),
+                ('C', 'User', '', 2, 'Age', 'int', 'YES', None, '0'),
+                ('I', 'User', 'IX_User_Name', 1, 'Name', '0', None, '8', None),
+                ('I', 'User', 'PRIMARY', 1, 'Name', '0', None, None, None)]
+        self.assertEqual(self.query.tables(rows), {"User": {
+            "Name": "User",
+            "Fields": {
+                "Name": {"Name": "Name", "Type": "varchar(32)", "DefaultValue": None, "Nullable": "NO"},
+                "Age": {"Name": "Age", "Type": "int", "DefaultValue": "0", "Nullable": "YES"}
+                },
+            "Key": ["Name"],
+            "Indexes": {"IX_User_Name": {"Fields": ["Name"], "Unique": True, "Lengths": {"Name": 8}}}
+            }})
+        self.assertIsNone(self.query.tables([]))
+
+    def test_07_upsert_version(self):
+        """Checks if the versions read after an upsert are reported into the records"""
+        fields = ("Name", "Age", "Version")
+        chunk = [("Toto", 12, 0), ("Titi", 13, 4)]
+        query, parameters = self.query.versions("User", fields, ["Name"], "Version", chunk)
+        self.assertEqual(query, "SELECT `Name`, `Version` FROM `PSTest`.`User` WHERE `Name` IN (%s, %s)")
+        self.assertEqual(parameters, ["Toto", "Titi"])
+        query, parameters = self.query.versions("User", fields, ["Name", "Age"], "Version", chunk)
+        self.assertEqual(query, "SELECT `Name`, `Age`, `Version` FROM `PSTest`.`User` " +
+                                "WHERE (`Name`, `Age`) IN ((%s, %s), (%s, %s))")
+        self.assertEqual(parameters, ["Toto", 12, "Titi", 13])
+        records = [{"Name": "Toto", "Age": 12, "Version": 0}, {"Name": "Titi", "Age": 13, "Version": 4}, ("Tutu", 1, 2)]
+        self.query.upsertversions(fields, records, ["Name"], "Version", [("toto", 0), ("Titi", 5), ("Tutu", 3)])
+        self.assertEqual([record["Version"] for record in records[:2]], [0, 5])
+        self.assertEqual(records[2], ("Tutu", 1, 2))
+
+    def test_08_catalog_bytes(self):
+        """Checks if the unique indexes are read from the rows of both drivers (str or bytes)"""
+        for unique, nonunique in (('0', '1'), (b'0', b'1'), (0, 1)):
+            rows = [('S', None, '', 0, 'PSTest', None, None, None, None),
+                    ('C', 'User', '', 1, 'Name', 'varchar(32)', 'NO', None, None),
+                    ('I', 'User', 'IX_User_Unique', 1, 'Name', unique, None, None, None),
+                    ('I', 'User', 'IX_User_Name', 1, 'Name', nonunique, None, None, None)]
+            indexes = self.query.tables(rows)["User"]["Indexes"]
+            self.assertTrue(indexes["IX_User_Unique"]["Unique"])
+            self.assertFalse(indexes["IX_User_Name"]["Unique"])
+
+    def test_09_chunks(self):
+        """Checks if the records are split on maxbytes and maxrows (each record is 11 bytes into the request)"""
+        fields = ["Name", "Age"]
+        values = [("ab", i) for i in range(5)]
+        def sizes(maxbytes, maxrows = DSDatabaseMySQLQuery.MAXROWS):
+            return [len(chunk) for chunk in self.query.chunks("INSERT", fields, values, maxbytes, maxrows)]
+        self.assertEqual(sizes(22), [2, 2, 1])
+        self.assertEqual(sizes(21), [1, 1, 1, 1, 1])
+        self.assertEqual(sizes(5), [1, 1, 1, 1, 1])
+        self.assertEqual(sizes(1000, 3), [3, 2])
+        self.assertEqual(sizes(1000, 5), [5])
+        self.assertEqual(list(self.query.chunks("INSERT", fields, [], 1000, 5)), [])
+        self.assertEqual(list(self.query.chunks("INSERT", fields, [{"Name": "Toto", "Age": None}], 1000, 5)),
+                         [[("Toto", None)]])
+        self.assertEqual(self.query.insertmany("User", fields, 2),
+                         "INSERT INTO `PSTest`.`User`(`Name`, `Age`) VALUES (%s, %s), (%s, %s)")
+
+    def test_10_tsv(self):
+        """Checks if the values written into the file loaded by 'LOAD DATA' are escaped"""
+        file = io.BytesIO()
+        count = self.query.tsv("LOAD", ["Name", "Age"], [("To\tto", None), ("Ti\n\\té", 3)], file)
+        self.assertEqual(count, 2)
+        self.assertEqual(file.getvalue(), "To\\tto\t\\N\nTi\\n\\\\té\t3\n".encode('utf-8'))
+        self.assertEqual(self.query.loaddata("User", ["Name", "Age"]),
+                         "LOAD DATA LOCAL INFILE %s INTO TABLE `PSTest`.`User` CHARACTER SET binary " +
+                         "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' (`Name`, `Age`)")
+
+    def tsv(self, value):
+        """Retrieve the line written into the file loaded by 'LOAD DATA' for a single value"""
+        file = io.BytesIO()
+        self.query.tsv("LOAD", ["Value"], [(value,)], file)
+        return file.getvalue()
+
+    def test_11_tsv_boolean(self):
+        """Checks if the booleans are written as 1 or 0"""
+        self.assertEqual(self.tsv(True), b"1\n")
+        self.assertEqual(self.tsv(False), b"0\n")
+        self.assertEqual(self.tsv(None), b"\\N\n")
+
+    def test_12_tsv_blob(self):
+        """Checks if the binary values are written as is with the special characters escaped"""
+        self.assertEqual(self.tsv(b"\x00a\tb\\\xff\n"), b"\\0a\\tb\\\\\xff\\n\n")
+        self.assertEqual(self.tsv(bytearray(b"ab")), b"ab\n")
+        chunks = self.query.chunks("INSERT", ["Value"], [(b"\x00" * 10,)] * 3, 64)
+        self.assertEqual([len(chunk) for chunk in chunks], [1, 1, 1])
+
+    def test_13_tsv_date(self):
+        """Checks if the dates are written in the ISO format"""
+        self.assertEqual(self.tsv(datetime.date(2000, 1, 2)), b"2000-01-02\n")
+
+    def test_14_tsv_datetime(self):
+        """Checks if the date times are written in the ISO format"""
+        self.assertEqual(self.tsv(datetime.datetime(2000, 1, 2, 3, 4, 5, 6)), b"2000-01-02 03:04:05.000006\n")
+
+    def test_15_tsv_decimal(self):
+        """Checks if the decimals and the floats are written without loss"""
+        self.assertEqual(self.tsv(decimal.Decimal("12.30")), b"12.30\n")
+        self.assertEqual(self.tsv(0.1), b"0.1\n")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit test (Logger queue)
+"""
+
+import io
+import os
+import logging
+import logging.handlers
+import tempfile
+import unittest
+
+from logger.loggerqueue import DSLoggerQueue
+
+class Handler(logging.Handler):
+    """This class keeps the messages written"""
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+class TestDSLoggerQueue(unittest.TestCase):
+    """This class tests the records written by the thread of the queue"""
+
+    def write(self, overflow):
+        """Write 200 records into a queue of 10 records and retrieve the messages written"""
+        handler = Handler()
+        queue = DSLoggerQueue([handler], maxsize=10, overflow=overflow, batchsize=5)
+        for i in range(100):
+            queue.handle(logging.makeLogRecord({"msg": f"m{i}", "levelno": logging.INFO}))
+        queue.start()
+        for i in range(100, 200):
+            queue.handle(logging.makeLogRecord({"msg": f"m{i}", "levelno": logging.INFO}))
+        queue.stop()
+        return handler.messages
+
+    def test_01_drop(self):
+        """Checks if the oldest records are dropped once the queue is full"""
+        messages = self.write(DSLoggerQueue.DROP)
+        self.assertEqual(messages[0], "90 log records dropped (queue full)")
+        self.assertEqual(messages[1:11], [f"m{i}" for i in range(90, 100)])
+        self.assertEqual(messages[-1], "m199")
+
+    def test_02_block(self):
+        """Checks if no record is lost and if the queue doesn't exceed its size before the thread is started"""
+        handler = Handler()
+        queue = DSLoggerQueue([handler], maxsize=10, overflow=DSLoggerQueue.BLOCK, batchsize=5)
+        for i in range(100):
+            queue.handle(logging.makeLogRecord({"msg": f"m{i}", "levelno": logging.INFO}))
+            self.assertLessEqual(len(queue.queue), 10)
+        queue.start()
+        for i in range(100, 200):
+            queue.handle(logging.makeLogRecord({"msg": f"m{i}", "levelno": logging.INFO}))
+        queue.stop()
+        self.assertEqual(handler.messages, [f"m{i}" for i in range(200)])
+
+    def test_03_error(self):
+        """Checks if an error raised by a handler is reported by the handler and doesn't stop the thread"""
+        class Failing(Handler):
+            """This class fails on writing the message 'm1'"""
+            def emit(self, record):
+                if record.getMessage() == "m1":
+                    raise ValueError("Failure")
+                super().emit(record)
+            def handleError(self, record):
+                self.errors.append(record.getMessage())
+            def __init__(self):
+                super().__init__()
+                self.errors = []
+        handler = Failing()
+        queue = DSLoggerQueue([handler], batchsize=2).start()
+        for i in range(4):
+            queue.handle(logging.makeLogRecord({"msg": f"m{i}", "levelno": logging.INFO}))
+        queue.stop()
+        self.assertEqual(handler.messages, ["m0", "m2", "m3"])
+        self.assertEqual(handler.errors, ["m1"])
+
+    def test_04_stream(self):
+        """Checks if a stream is flushed once by batch and if the handler isn't modified"""
+        class Stream(io.StringIO):
+            """This class counts the flushes"""
+            flushes = 0
+            def flush(self):
+                self.flushes += 1
+                super().flush()
+        stream = Stream()
+        handler = logging.StreamHandler(stream)
+        queue = DSLoggerQueue([handler], batchsize=10)
+        for i in range(20):
+            queue.handle(logging.makeLogRecord({"msg": f"m{i}", "levelno": logging.INFO}))
+        queue.start().stop()
+        self.assertEqual(stream.getvalue().split("\n")[:-1], [f"m{i}" for i in range(20)])
+        self.assertEqual(stream.flushes, 2)
+        self.assertNotIn('flush', vars(handler))
+
+    def test_05_rotating(self):
+        """Checks if a rotating file is written by batch and rolled over once before a batch exceeding its size"""
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "test.log")
+            handler = logging.handlers.RotatingFileHandler(filename, maxBytes=30, backupCount=5, encoding='utf-8')
+            queue = DSLoggerQueue([handler], batchsize=10)
+            for i in range(20):
+                queue.handle(logging.makeLogRecord({"msg": f"m{i:02}", "levelno": logging.INFO}))
+            queue.start().stop()
+            handler.close()
+            with open(filename + ".1", 'r', encoding='utf-8') as file:
+                self.assertEqual(file.read().split(), [f"m{i:02}" for i in range(10)])
+            with open(filename, 'r', encoding='utf-8') as file:
+                self.assertEqual(file.read().split(), [f"m{i:02}" for i in range(10, 20)])
+            self.assertFalse(os.path.exists(filename + ".2"))
+
+if __name__ == '__main__':
+    unittest.main()
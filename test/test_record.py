@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit test (Record)
+"""
+
+import unittest
+
+from app.schema.record import DSRecord
+from app.schema.tabledefinition import DSTableDefinition
+
+table = DSTableDefinition("User", {
+    "Description": "List of users",
+    "Key": "Name",
+    "Fields": {
+        "Name": { "Type": "String", "MaxLength": 32 },
+        "Age": { "Type": "Integer", "DefaultValue": 18 },
+        "Enabled": { "Type": "Boolean" },
+        "table": { "Type": "String" }
+        }
+    })
+
+class TestDSRecord(unittest.TestCase):
+    """This class tests the record class generated for each table"""
+
+    def test_01_generate(self):
+        """Checks if the record class is generated once per projection and has no dict"""
+        self.assertIs(table.recordclass(), table.recordclass())
+        self.assertIs(table.recordclass(["Name"]), table.recordclass(("Name",)))
+        self.assertIsNot(table.recordclass(), table.recordclass(["Name"]))
+        record = DSRecord(table)
+        self.assertIs(type(record), table.recordclass())
+        self.assertFalse(hasattr(record, '__dict__'))
+        with self.assertRaises(AttributeError):
+            setattr(record, "Unknown", 1)
+
+    def test_02_values(self):
+        """Checks if the values are read and written by attribute and by name"""
+        record = table.new({"Name": "Toto", "table": "T1"})
+        self.assertEqual(record.to_dict(), {"Name": "Toto", "Age": 18, "Enabled": None, "table": "T1"})
+        record.Age = 20
+        record["Name"] = "Titi"
+        self.assertEqual(record["Age"], 20)
+        self.assertEqual(record.Name, "Titi")
+        self.assertIs(record.table, table)
+        self.assertEqual(record["table"], "T1")
+        with self.assertRaises(KeyError):
+            record["Unknown"] = 1
+        with self.assertRaises(AttributeError):
+            _ = record.Unknown
+
+    def test_03_decode(self):
+        """Checks if a row read from the database is converted by the fields"""
+        record = table.recordclass().decode(("Toto", 12, 1, None))
+        self.assertEqual(record.to_dict(), {"Name": "Toto", "Age": 12, "Enabled": True, "table": None})
+        self.assertIs(table.recordclass().decode(("Toto", 12, None, None)).Enabled, None)
+
+    def test_04_partial(self):
+        """Checks if a partial record contains only its fields"""
+        record = table.new(["Toto", 12], ["Name", "Age"])
+        self.assertTrue(record.ispartial)
+        self.assertFalse(table.new().ispartial)
+        self.assertEqual(record.fields, ("Name", "Age"))
+        self.assertEqual(str(record), "{Name=Toto, Age=12}")
+        with self.assertRaises(AttributeError):
+            _ = record.Enabled
+
+    def test_05_clone(self):
+        """Checks if a clone is equal to the record and doesn't share its values"""
+        record = table.new({"Name": "Toto"})
+        clone = record.clone()
+        self.assertEqual(clone, record)
+        clone.Age = 30
+        self.assertNotEqual(clone, record)
+        self.assertNotEqual(record, table.new({"Name": "Toto"}, ["Name"]))
+        self.assertNotEqual(record, "Toto")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit test (Schema definition)
+"""
+
+import copy
+import unittest
+
+from app.schema.schemadefinition import DSSchemaDefinition
+from app.schema.table import DSTable
+
+description = {
+    "Name": "PSTest",
+    "Description": "Test",
+    "Tables": {
+        "User": {
+            "Description": "List of users",
+            "Key": "Name",
+            "Fields": {
+                "Name": { "Type": "String", "MaxLength": 32 },
+                "Age": { "Type": "Integer" }
+                }
+            }
+        }
+    }
+
+class TestDSSchemaDefinition(unittest.TestCase):
+    """This class tests the description of a schema shared by the sessions"""
+
+    def test_01_shared(self):
+        """Checks if the identical descriptions share the same definition"""
+        definition = DSSchemaDefinition.get(description)
+        self.assertIs(DSSchemaDefinition.get(copy.deepcopy(description)), definition)
+        self.assertIs(DSSchemaDefinition.get(definition), definition)
+        self.assertIs(definition.to_dict(), definition.to_dict())
+        self.assertEqual(definition.to_dict()["Tables"]["User"]["Key"], ["Name"])
+
+    def test_02_table(self):
+        """Checks if the tables of the sessions share the description and the records"""
+        definition = DSSchemaDefinition.get(description)
+        table1 = DSTable(None, "User", definition["User"])
+        table2 = DSTable(None, "User", definition["User"])
+        self.assertIs(table1.recordclass(), table2.recordclass())
+        record = definition.User.new({"Name": "Toto", "Age": 18})
+        self.assertIs(record.table, table1.definition)
+        self.assertEqual(table2.position(record, "-Age"), [18, "Toto"])
+
+if __name__ == '__main__':
+    unittest.main()
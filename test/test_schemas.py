@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit test (Schemas and sessions of the tenants)
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import yaml
+
+from configuration.configuration import DSConfiguration
+from interface.schemas import DSSchemas
+
+schema = {
+    "Name": "PSTest",
+    "Description": "Test",
+    "Tables": {
+        "User": {
+            "Description": "List of users",
+            "Key": "Name",
+            "Fields": { "Name": { "Type": "String", "MaxLength": 32 } }
+            }
+        }
+    }
+
+class TestDSSchemas(unittest.TestCase):
+    """This class tests the schemas and the sessions kept by tenant"""
+
+    def setUp(self):
+        applications = {"A": {"schema": schema, "database": {"class": "MySQL"}}}
+        with tempfile.TemporaryDirectory(dir=".") as directory:
+            filename = os.path.join(os.path.relpath(directory), "config.yml")
+            with open(filename, 'w', encoding='utf-8') as file:
+                yaml.safe_dump({"lazy": {"clients": {"maxsize": 2}},
+                                "clients": {client: {"applications": applications} for client in ("C1", "C2", "C3")}}, file)
+            configuration = DSConfiguration(filename)
+        self.patches = [mock.patch.object(DSSchemas.Sessions, "configuration", new_callable=mock.PropertyMock,
+                                          return_value=configuration),
+                        mock.patch("interface.schemas.databasefactory", return_value=mock.Mock(isasync=False))]
+        self.sessions = DSSchemas.Sessions()
+        self.patches.append(mock.patch.object(DSSchemas, "_DSSchemas__instance", mock.Mock(_sessions=self.sessions)))
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+
+    def test_01_maxsize(self):
+        """Checks if the least recently used schemas are forgotten beyond 'lazy.clients.maxsize'"""
+        self.assertEqual(self.sessions.maxsize, 2)
+        with mock.patch("interface.schemas.DSSchemaDefinition.get", side_effect=lambda description: object()) as get:
+            definition = self.sessions.definition("C1", "A")
+            self.sessions.definition("C2", "A")
+            self.assertIs(self.sessions.definition("C1", "A"), definition)
+            self.sessions.definition("C3", "A")
+            self.assertIs(self.sessions.definition("C1", "A"), definition)
+            self.sessions.definition("C2", "A")
+            self.assertEqual(get.call_count, 4)
+            self.assertIsNot(self.sessions.definition("C3", "A"), definition)
+            self.assertEqual(get.call_count, 5)
+
+    def test_02_sessions(self):
+        """Checks if the sessions of a schema forgotten aren't recycled"""
+        with self.sessions.get_session("C1", "A") as session:
+            pass
+        with self.sessions.get_session("C1", "A") as recycled:
+            self.assertIs(recycled, session)
+        self.sessions.definition("C2", "A")
+        self.sessions.definition("C3", "A")
+        with self.sessions.get_session("C1", "A") as created:
+            self.assertIsNot(created, session)
+
+if __name__ == '__main__':
+    unittest.main()
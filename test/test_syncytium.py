@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit test (Migration of the clients)
+"""
+
+import io
+import os
+import asyncio
+import tempfile
+import unittest
+from unittest import mock
+
+import syncytium
+
+tenants = [(client, application) for client in (1, 2, 3) for application in ("A", "B")]
+
+class TestMigrateClients(unittest.TestCase):
+    """This class tests the migration of the schemas of all applications of all clients"""
+
+    def setUp(self):
+        self.running = 0
+        self.maximum = 0
+        self.migrated = []
+        self.schemas = mock.patch("syncytium.DSSchemas", return_value=mock.Mock(tenants=lambda: tenants))
+        self.migrate_client = mock.patch("syncytium.migrate_client", side_effect=self.migrate_client_fake)
+        self.schemas.start()
+        self.migrate_client.start()
+        self.stdout = mock.patch("sys.stdout", new=io.StringIO())
+        self.stdout.start()
+
+    def tearDown(self):
+        self.stdout.stop()
+        self.migrate_client.stop()
+        self.schemas.stop()
+
+    async def migrate_client_fake(self, client, application, _allowcopy):
+        """Migrate a schema (the application 'B' of the client 2 fails)"""
+        self.running += 1
+        self.maximum = max(self.maximum, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        if (client, application) == (2, "B"):
+            raise RuntimeError("Migration failed")
+        self.migrated.append(f"{client}.{application}")
+        return client == 1
+
+    def test_01_workers(self):
+        """Checks if all applications are migrated with at most 'workers' at the same time"""
+        self.assertFalse(asyncio.run(syncytium.migrate_clients(2, None)))
+        self.assertEqual(self.maximum, 2)
+        self.assertEqual(sorted(self.migrated), ["1.A", "1.B", "2.A", "3.A", "3.B"])
+
+    def test_02_resume(self):
+        """Checks if the applications migrated are written into the resume file and skipped on the next call"""
+        with tempfile.TemporaryDirectory() as directory:
+            resume = os.path.join(directory, "resume.txt")
+            self.assertFalse(asyncio.run(syncytium.migrate_clients(8, resume)))
+            with open(resume, 'r', encoding='utf-8') as file:
+                self.assertEqual(sorted(file.read().split()), ["1.A", "1.B", "2.A", "3.A", "3.B"])
+            self.migrated = []
+            self.assertFalse(asyncio.run(syncytium.migrate_clients(8, resume)))
+            self.assertEqual(self.migrated, [])
+            with open(resume, 'a', encoding='utf-8') as file:
+                file.write("2.B\n")
+            self.assertTrue(asyncio.run(syncytium.migrate_clients(8, resume)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit test (Table)
+"""
+
+import asyncio
+import unittest
+
+from app.schema.schema import DSSchema
+
+description = {
+    "Name": "PSTest",
+    "Description": "Test",
+    "Tables": {
+        "User": {
+            "Description": "List of users",
+            "Key": "Name",
+            "Fields": {
+                "Name": { "Type": "String", "MaxLength": 32 },
+                "Age": { "Type": "Integer" }
+                }
+            },
+        "Right": {
+            "Description": "Rights of the users by module",
+            "Key": ["Module", "Name"],
+            "Fields": {
+                "Module": { "Type": "Integer" },
+                "Name": { "Type": "String", "MaxLength": 32 }
+                }
+            }
+        }
+    }
+
+class Database:
+    """This class simulates a database session reading the records by key"""
+
+    isasync = False
+
+    rows = {
+        "User": [("Toto", 12), ("Titi", 18), ("Tutu", 20)],
+        "Right": [(1, "Toto"), (2, "Toto"), (1, "Titi")]
+        }
+
+    sizes = { "User": 1, "Right": 2 }
+
+    def to_dict(self):
+        """Description of the database"""
+        return {}
+
+    @staticmethod
+    def normalize(values):
+        """Compare the strings case insensitively (as the default collation of MySQL)"""
+        return tuple(value.lower() if isinstance(value, str) else value for value in values)
+
+    def select(self, tablename, _fields, clause, *_):
+        """Retrieve the rows of the table matching the keys of the clause"""
+        template, parameters = clause.tomysqlquery()
+        self.requests.append((tablename, template, parameters))
+        size = self.sizes[tablename]
+        keys = {self.normalize(parameters[i:i+size]) for i in range(0, len(parameters), size)}
+        return [row for row in self.rows[tablename] if self.normalize(row[:size]) in keys]
+
+    def delete(self, _tablename, _key, values):
+        """Delete records"""
+        return len(values)
+
+    def commit(self):
+        """Commit the current transaction"""
+
+    def __init__(self):
+        self.requests = []
+
+class AsyncDatabase(Database):
+    """This class simulates an asynchronous database session"""
+
+    isasync = True
+
+    def commit(self):
+        """Commit the current transaction (awaitable)"""
+        return asyncio.sleep(0)
+
+class TestDSTable(unittest.TestCase):
+    """This class tests the records read by key through the identity map of the session"""
+
+    def setUp(self):
+        self.database = Database()
+        self.schema = DSSchema(self.database, description)
+
+    def test_01_get(self):
+        """Checks if a record is read once by key and the same record is retrieved"""
+        record = self.schema["User"].get("Toto")
+        self.assertEqual(record.to_dict(), {"Name": "Toto", "Age": 12})
+        self.assertIs(self.schema["User"].get("Toto"), record)
+        self.assertIsNone(self.schema["User"].get("Unknown"))
+        self.assertEqual(self.database.requests, [("User", "`Name` = %s", ["Toto"]),
+                                                  ("User", "`Name` = %s", ["Unknown"])])
+
+    def test_02_get_many(self):
+        """Checks if the missing keys are read by a single request"""
+        table = self.schema["User"]
+        record = table.get("Toto")
+        records = table.get_many(["Titi", "Toto", "Unknown", "Titi"])
+        self.assertIs(records[1], record)
+        self.assertIs(records[0], records[3])
+        self.assertIsNone(records[2])
+        self.assertEqual(self.database.requests[1], ("User", "`Name` in (%s, %s)", ["Titi", "Unknown"]))
+
+    def test_03_composite(self):
+        """Checks if the values of a composite key are converted and read by a single request"""
+        records = self.schema["Right"].get_many([("1", "Toto"), (2, "Toto"), (3, "Toto")])
+        self.assertEqual([record and record.to_dict() for record in records],
+                         [{"Module": 1, "Name": "Toto"}, {"Module": 2, "Name": "Toto"}, None])
+        self.assertEqual(self.database.requests[0][1], "((`Module` = %s) and (`Name` = %s)) or ((`Module` = %s) and (`Name` = %s)) "
+                                                       "or ((`Module` = %s) and (`Name` = %s))")
+        self.assertIs(self.schema["Right"].get(1, "Toto"), records[0])
+        self.assertEqual(len(self.database.requests), 1)
+
+    def test_04_invalidation(self):
+        """Checks if the records are read once again after writing into the table or at the end of the transaction"""
+        table = self.schema["User"]
+        record = table.get("Toto")
+        table.delete([record])
+        self.assertIsNot(table.get("Toto"), record)
+        record = table.get("Toto")
+        self.schema.commit()
+        self.assertIsNot(table.get("Toto"), record)
+        self.assertEqual(len(self.database.requests), 3)
+
+    def test_05_async(self):
+        """Checks if the records are read by key on an asynchronous database"""
+        database = AsyncDatabase()
+        schema = DSSchema(database, description)
+        async def run():
+            record = await schema["User"].get("Titi")
+            self.assertEqual(record.Age, 18)
+            records = await schema["User"].get_many(["Titi", "Tutu"])
+            self.assertIs(records[0], record)
+            self.assertEqual(records[1].Age, 20)
+            await schema.commit()
+            self.assertIsNot(await schema["User"].get("Titi"), record)
+        asyncio.run(run())
+        self.assertEqual(len(database.requests), 3)
+
+    def test_06_case(self):
+        """Checks if a key matching a record case insensitively (as the database does) retrieves the same record"""
+        table = self.schema["User"]
+        records = table.get_many(["toto", "TOTO", "Titi"])
+        self.assertEqual(records[0].Name, "Toto")
+        self.assertIs(records[1], records[0])
+        self.assertIs(table.get("Toto"), records[0])
+        self.assertEqual(self.database.requests, [("User", "`Name` in (%s, %s)", ["toto", "Titi"])])
+
+if __name__ == '__main__':
+    unittest.main()
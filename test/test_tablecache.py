@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit test (Table cache)
+"""
+
+import time
+import unittest
+
+from app.schema.tablecache import DSTableCache
+from app.schema.database.databasecursor import DSDatabaseCursor
+
+class TestDSTableCache(unittest.TestCase):
+    """This class tests the selections kept into the cache of a table"""
+
+    def execute(self, rows):
+        """Retrieve a function opening a cursor on the rows and counting the calls"""
+        def execute():
+            self.calls += 1
+            return DSDatabaseCursor(DSDatabaseCursor.Rows(list(rows)), "User", ["Name"], batchsize=2)
+        return execute
+
+    def setUp(self):
+        self.calls = 0
+
+    def test_01_select(self):
+        """Checks if a selection completely read is stored and read from the cache"""
+        cache = DSTableCache(("Test", "User"), {})
+        request = (("Name",), None)
+        rows = [("Toto",), ("Titi",), ("Tutu",)]
+        self.assertEqual(list(cache.select(request, self.execute(rows))), rows)
+        self.assertEqual(list(cache.select(request, self.execute(rows))), rows)
+        self.assertEqual(self.calls, 1)
+
+    def test_02_partial(self):
+        """Checks if a selection not completely read isn't stored"""
+        cache = DSTableCache(("Test", "User"), {})
+        request = (("Name",), None)
+        cursor = cache.select(request, self.execute([("Toto",), ("Titi",), ("Tutu",)]))
+        next(cursor)
+        cursor.close()
+        self.assertIsNone(cache.read(request))
+
+    def test_03_ttl(self):
+        """Checks if a selection is forgotten after its time to live"""
+        cache = DSTableCache(("Test", "User"), {'TTL': 0.01})
+        cache.write("A", [("Toto",)], cache.version)
+        self.assertEqual(cache.read("A"), [("Toto",)])
+        time.sleep(0.02)
+        self.assertIsNone(cache.read("A"))
+
+    def test_04_lru(self):
+        """Checks if the least recently used selections are forgotten above MaxRows"""
+        cache = DSTableCache(("Test", "User"), {'MaxRows': 4})
+        cache.write("A", [(1,), (2,)], cache.version)
+        cache.write("B", [(3,), (4,)], cache.version)
+        cache.read("A")
+        cache.write("C", [(5,)], cache.version)
+        self.assertIsNotNone(cache.read("A"))
+        self.assertIsNone(cache.read("B"))
+        self.assertIsNotNone(cache.read("C"))
+        cache.write("D", [(i,) for i in range(5)], cache.version)
+        self.assertIsNone(cache.read("D"))
+
+    def test_05_version(self):
+        """Checks if the cache is cleared on writing and ignores the selections started before"""
+        cache = DSTableCache(("Test", "User"), {})
+        request = (("Name",), None)
+        cursor = cache.select(request, self.execute([("Toto",), ("Titi",)]))
+        next(cursor)
+        cache.clear()
+        self.assertEqual(list(cursor), [("Titi",)])
+        self.assertIsNone(cache.read(request))
+        self.assertEqual(cache.version, 1)
+        cache.write("A", [(1,)], 0)
+        self.assertIsNone(cache.read("A"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit test (WebSocket)
+"""
+
+import json
+import asyncio
+import datetime
+import unittest
+from unittest import mock
+
+from logger.logger import DSLogger
+
+with mock.patch.object(DSLogger, "Instance", mock.Mock(project="PSTest", version="1.0")):
+    from interface.websocket import websocket
+
+class WebSocket:
+    """This class simulates a websocket connexion"""
+
+    async def send_text(self, text):
+        """Store the message sent"""
+        self.messages.append(json.loads(text))
+
+    def __init__(self):
+        self.messages = []
+
+class TestWebSocket(unittest.TestCase):
+    """This class tests the messages sent through the websocket"""
+
+    def test_01_date(self):
+        """Checks if the records of a table with a Date column are sent"""
+        records = [{"Name": "Toto", "Birthday": datetime.date(2010, 5, 14)}]
+        client = WebSocket()
+        with mock.patch.object(websocket, "DSSchemas"), \
+             mock.patch.object(websocket, "select_page", mock.AsyncMock(return_value=(records, None))):
+            asyncio.run(websocket.websocket_service_table(client, {"client": 1}, "PSTest", "User"))
+        self.assertEqual(client.messages, [{"action": "table",
+                                            "parameters": {"table": "User",
+                                                           "records": [{"Name": "Toto", "Birthday": "2010-05-14"}],
+                                                           "next": None}}])
+
+if __name__ == '__main__':
+    unittest.main()